@@ -0,0 +1,56 @@
+""" Скорость загрузки, импорта и экспорта CSV: разбор кусками в колонки против построчного csv.DictReader. """
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import EmployeeTable  # noqa: E402
+from database.storage import ColumnStore  # noqa: E402
+from suite import write_tables  # noqa: E402
+
+
+def dict_reader_load(table):
+    """ Прежняя загрузка: словарь на каждую строку и приведение типов по одной записи. """
+    store = ColumnStore(table.ATTRS, table.FIELD_TYPES)
+    with open(table.FILE_PATH, 'r') as f:
+        store.extend(table.entries_from_csv(csv.DictReader(f)))
+    return store
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk", type=int, default=EmployeeTable.CSV_CHUNK, help="символов CSV в одном куске")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_tables(directory, args.rows)
+        table = EmployeeTable()
+        table.FILE_PATH = os.path.join(directory, EmployeeTable.FILE_PATH)
+        table.CSV_CHUNK = args.chunk
+
+        baseline, expected = timed(lambda: dict_reader_load(table))
+        print(f"{'DictReader':>12} {baseline:>8.2f}s {args.rows / baseline:>12,.0f} rows/s")
+        elapsed, store = timed(table.storage.load)
+        assert store.columns == expected.columns
+        print(f"{'chunked':>12} {elapsed:>8.2f}s {args.rows / elapsed:>12,.0f} rows/s  x{baseline / elapsed:.1f}")
+        del expected, store
+
+        report = table.import_csv(table.FILE_PATH)
+        print(f"{'import_csv':>12} {report['seconds']:>8.2f}s {report['rows_per_second']:>12,.0f} rows/s")
+        report = table.export_csv(os.path.join(directory, "export.csv"))
+        print(f"{'export_csv':>12} {report['seconds']:>8.2f}s {report['rows_per_second']:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+""" Ускорение параллельных агрегатов в пуле процессов в зависимости от их числа. """
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database, EmployeeTable  # noqa: E402
+
+
+def write_table(path, rows):
+    """ Пишет CSV-файл таблицы сотрудников напрямую, минуя вставки. """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EmployeeTable.ATTRS)
+        writer.writerows((i, f"Name{i}", 20 + i % 40, 1000 + i % 5000, i % 100) for i in range(rows))
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, os.cpu_count() or 1} & set(range(1, (os.cpu_count() or 1) + 1))))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "employee_table.csv")
+        write_table(path, args.rows)
+        Database._instances.pop(Database, None)
+        db = Database()
+        employee_table = EmployeeTable()
+        employee_table.FILE_PATH = path
+        db.register_table("employees", employee_table)
+
+        def aggregate(**options):
+            return lambda: db.aggregate("employees", "salary", group_by="department_id", **options)
+
+        print(f"{args.rows} rows, {os.cpu_count()} cores")
+        baseline = timed(aggregate(streaming=True))
+        print(f"{'streaming':>10} {baseline:>8.2f}s")
+        for workers in args.workers:
+            elapsed = timed(aggregate(workers=workers))
+            print(f"{workers:>10} {elapsed:>8.2f}s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+""" Время и пиковая память основных операций базы на синтетических таблицах от 10^3 до 10^7 записей. """
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from itertools import count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import BonusTable, Database, DepartmentTable, EmployeeTable  # noqa: E402
+
+DEPARTMENTS = 100
+FIRST_DAY = date(2020, 1, 1).toordinal()
+
+
+def write_tables(directory, rows):
+    """ Пишет CSV-файлы трёх таблиц напрямую, минуя вставки: rows сотрудников и премий, DEPARTMENTS подразделений. """
+    with open(os.path.join(directory, DepartmentTable.FILE_PATH), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(DepartmentTable.ATTRS)
+        writer.writerows((i, f"Department{i}") for i in range(DEPARTMENTS))
+    with open(os.path.join(directory, EmployeeTable.FILE_PATH), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EmployeeTable.ATTRS)
+        writer.writerows((i, f"Name{i}", 20 + i % 40, 1000 + i % 5000, i % DEPARTMENTS) for i in range(rows))
+    with open(os.path.join(directory, BonusTable.FILE_PATH), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(BonusTable.ATTRS)
+        writer.writerows((i, i, date.fromordinal(FIRST_DAY + i % 2000).strftime("%d.%m.%Y"), 100 + i % 900)
+                         for i in range(rows))
+
+
+def make_database(directory):
+    Database._instances.pop(Database, None)
+    db = Database()
+    for table_name, table_class in (("employees", EmployeeTable), ("departments", DepartmentTable),
+                                    ("bonuses", BonusTable)):
+        table = table_class()
+        table.FILE_PATH = os.path.join(directory, table_class.FILE_PATH)
+        table.APPEND_ONLY = True  # Иначе каждая вставка переписывает весь файл
+        table.FSYNC_EVERY = 1000
+        db.register_table(table_name, table)
+    return db
+
+
+def measure(function, repeat, memory):
+    """
+    Лучшее время из repeat запусков и пиковая память ещё одного запуска под tracemalloc
+    (время под tracemalloc не замеряется: он заметно замедляет выделение памяти).
+    """
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - started)
+    result = {"seconds": min(seconds)}
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def operations(db, rows, inserts):
+    """ Замеряемые операции: имя -> функция без аргументов. Кэш запросов сбрасывается, чтобы считать заново. """
+    tables = [db.tables[table_name] for table_name in ("employees", "departments", "bonuses")]
+    next_id = count(rows)
+    middle = rows // 2
+
+    def load():
+        for table in tables:
+            table.load()
+
+    def insert():
+        for _ in range(inserts):
+            entry_id = next(next_id)
+            db.insert("employees", f"{entry_id} Name{entry_id} 30 1000 {entry_id % DEPARTMENTS}")
+
+    def select():
+        db.cache.clear()
+        db.select("employees", middle, middle + 100)
+        db.select("departments", "Department1")
+        db.select("bonuses", middle)
+
+    def join():
+        db.cache.clear()
+        db.join("employees", "departments", "department_id")
+
+    def aggregate():
+        db.cache.clear()
+        db.aggregate("employees", "salary", group_by="department_id")
+        db.aggregate("bonuses", "amount")
+
+    def save():
+        for table in tables:
+            table.save()
+
+    return {"load": load, "insert": insert, "select": select, "join": join, "aggregate": aggregate, "save": save}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """ Печатает отношение времени к прошлому прогону из JSON-файла baseline_path (> 1 - медленнее). """
+    with open(baseline_path) as f:
+        baseline = {(result["rows"], result["operation"]): result for result in json.load(f)["results"]}
+    for result in results:
+        previous = baseline.get((result["rows"], result["operation"]))
+        if previous:
+            print(f"{result['rows']:>10} {result['operation']:>10} x{result['seconds'] / previous['seconds']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** power for power in range(3, 8)])
+    parser.add_argument("--operations", nargs="+", default=["load", "insert", "select", "join", "aggregate", "save"])
+    parser.add_argument("--inserts", type=int, default=1000, help="вставок за один замер insert")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="не замерять пиковую память")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="JSON-файл прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_tables(directory, rows)
+            db = make_database(directory)
+            functions = operations(db, rows, args.inserts)
+            for name in args.operations:
+                result = {"rows": rows, "operation": name, **measure(functions[name], args.repeat, args.memory)}
+                results.append(result)
+                memory = f" {result['peak_memory'] / 2 ** 20:>10.1f} MiB" if args.memory else ""
+                print(f"{rows:>10} {name:>10} {result['seconds']:>10.4f}s{memory}", flush=True)
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "cpu_count": os.cpu_count(),
+              "inserts": args.inserts, "results": results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+""" Нагрузочный тест: пропускная способность select/aggregate/insert в зависимости от числа потоков. """
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database, EmployeeTable  # noqa: E402
+
+
+def make_database(path, rows):
+    Database._instances.pop(Database, None)
+    db = Database()
+    employee_table = EmployeeTable()
+    employee_table.FILE_PATH = path
+    employee_table.APPEND_ONLY = True  # Иначе каждая вставка переписывает весь файл
+    employee_table.FSYNC_EVERY = 1000
+    db.register_table("employees", employee_table)
+    db.insert_many("employees", [f"{i} Name{i} {20 + i % 40} {1000 + i % 5000} {i % 10}" for i in range(rows)])
+    return db
+
+
+def run(db, threads, operations, write_share, rows):
+    """ Выполняет operations операций в threads потоках, доля вставок - write_share. Возвращает операций/с. """
+    next_id = iter(range(rows, rows + operations))
+    id_lock = threading.Lock()
+    per_thread = operations // threads
+
+    def work(seed):
+        for i in range(per_thread):
+            if (i * threads + seed) % 100 < write_share * 100:
+                with id_lock:
+                    entry_id = next(next_id)
+                db.insert("employees", f"{entry_id} Name 30 1000 1")
+            elif i % 2:
+                start = (i * 7919 + seed) % rows
+                db.select("employees", start, start + 10)
+            else:
+                db.aggregate("employees", "salary", group_by="department_id", functions=("SUM",))
+
+    workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--write-share", type=float, nargs="+", default=[0.0, 0.1, 0.5])
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'writes':>7} {'ops/s':>10}")
+    for write_share in args.write_share:
+        for threads in args.threads:
+            with tempfile.TemporaryDirectory() as directory:
+                db = make_database(os.path.join(directory, "employee_table.csv"), args.rows)
+                throughput = run(db, threads, args.operations, write_share, args.rows)
+                db.tables["employees"].log.close()
+            print(f"{threads:>8} {write_share:>7.0%} {throughput:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from operator import itemgetter
+
+AGGREGATES = ("SUM", "COUNT", "MAX", "MIN", "AVG")
+
+
+def check_functions(functions):
+    for name in functions:
+        if name not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {name}.")
+
+
+def to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("Field must contain numbers")
+
+
+def gather(values, positions):
+    """ Выбирает значения по позициям одним вызовом itemgetter, без цикла на Python. """
+    if len(positions) == 1:
+        return [values[positions[0]]]
+    return itemgetter(*positions)(values)
+
+
+def aggregate_values(values, functions=AGGREGATES):
+    """ Агрегаты по колонке чисел: каждая функция - один проход встроенной функцией по массиву. """
+    result = {}
+    total = float(sum(values)) if "SUM" in functions or "AVG" in functions else None
+    for name in functions:
+        if name == "SUM":
+            result[name] = total
+        elif name == "COUNT":
+            result[name] = len(values)
+        elif name == "MAX":
+            result[name] = float(max(values))
+        elif name == "MIN":
+            result[name] = float(min(values))
+        else:
+            result[name] = total / len(values)
+    return result
+
+
+class Accumulator:
+    """ Потоковый аккумулятор SUM/COUNT/MAX/MIN: один проход, значения не хранятся. """
+
+    def __init__(self):
+        self.sum = 0
+        self.count = 0
+        self.max = None
+        self.min = None
+
+    def add(self, value):
+        self.sum += value
+        self.count += 1
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def merge(self, other):
+        """ Добавляет частичный результат другого аккумулятора (например, посчитанный в другом процессе). """
+        if not other.count:
+            return
+        self.sum += other.sum
+        self.count += other.count
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+
+    def result(self, functions=AGGREGATES):
+        values = {"SUM": float(self.sum), "COUNT": self.count, "MAX": float(self.max), "MIN": float(self.min),
+                  "AVG": self.sum / self.count}
+        return {name: values[name] for name in functions}
+
+
+def accumulate(values):
+    accumulator = Accumulator()
+    for value in values:
+        accumulator.add(value)
+    return accumulator
+
+
+def accumulate_groups(rows):
+    """ Аккумуляторы по группам из потока пар (значение группы, число). """
+    accumulators = {}
+    for key, value in rows:
+        accumulator = accumulators.get(key)
+        if accumulator is None:
+            accumulator = accumulators[key] = Accumulator()
+        accumulator.add(value)
+    return accumulators
+
+
+def stream_aggregate(rows, functions=AGGREGATES):
+    """ Агрегаты по потоку значений за один проход. """
+    accumulator = accumulate(rows)
+    return accumulator.result(functions) if accumulator.count else None
+
+
+def stream_group_aggregate(rows, functions=AGGREGATES):
+    """ Агрегаты по группам за один проход по потоку пар (значение группы, число). """
+    return {key: accumulator.result(functions) for key, accumulator in accumulate_groups(rows).items()}
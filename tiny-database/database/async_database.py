@@ -0,0 +1,116 @@
+from functools import partial
+from itertools import islice
+import asyncio
+
+from database.database import Database
+
+
+class AsyncDatabase:
+    """
+    Асинхронный фасад над Database для asyncio: блокирующая работа (разбор CSV, запись файлов, запросы)
+    выполняется в executor (по умолчанию - пул потоков цикла событий), и цикл событий не останавливается.
+    Одновременные вставки в одну таблицу собираются в пачку и сохраняются одной записью (см. insert_many).
+    """
+    SCAN_CHUNK = 1000  # Сколько записей scan читает за один переход в executor
+
+    def __init__(self, database=None, executor=None):
+        self.database = database if database is not None else Database()
+        self.executor = executor
+        self._pending = {}  # Имя таблицы -> ещё не сохранённая пачка вставок [(строки, future)]
+        self._locks = {}  # Имя таблицы -> asyncio.Lock: пачки одной таблицы сохраняются по очереди
+        self._flushes = set()  # Задачи сохранения пачек (ссылки, чтобы их не собрал сборщик мусора)
+
+    async def run(self, function, *args, **kwargs):
+        """ Выполняет блокирующую функцию в executor. """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    def table(self, table_name):
+        table = self.database.tables.get(table_name)
+        if not table:
+            raise ValueError(f"Table {table_name} does not exist.")
+        return table
+
+    async def insert(self, table_name, data):
+        await self.insert_many(table_name, [data])
+
+    async def insert_many(self, table_name, rows):
+        """
+        Вставляет пачку записей целиком или ни одной. Вставки, пришедшие, пока предыдущая пачка таблицы
+        сохраняется, копятся и сохраняются следующей пачкой за одну транзакцию (см. Database.transaction);
+        ошибка одной вставки не мешает остальным.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.get(table_name)
+        if batch is None:
+            batch = self._pending[table_name] = []
+            flush = loop.create_task(self._flush(table_name, batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        batch.append((list(rows), future))
+        await future
+
+    async def _flush(self, table_name, batch):
+        lock = self._locks.setdefault(table_name, asyncio.Lock())
+        async with lock:
+            # Пока ждали предыдущую пачку, в эту добавлялись новые вставки; дальше она закрыта
+            del self._pending[table_name]
+            try:
+                errors = await self.run(self._write, table_name, [rows for rows, _ in batch])
+            except Exception as error:
+                errors = [error] * len(batch)
+        for (_, future), failure in zip(batch, errors):
+            if future.cancelled():
+                continue
+            if failure is None:
+                future.set_result(None)
+            else:
+                future.set_exception(failure)
+
+    def _write(self, table_name, requests):
+        """ Вставляет пачку в одной транзакции; возвращает ошибку (или None) для каждой вставки. """
+        errors = []
+        with self.database.transaction():
+            for rows in requests:
+                try:
+                    self.database.insert_many(table_name, rows)
+                    errors.append(None)
+                except ValueError as error:
+                    errors.append(error)
+        return errors
+
+    async def select(self, table_name, *args):
+        return await self.run(self.database.select, table_name, *args)
+
+    async def join(self, table1_name, table2_name, join_attr="id", **options):
+        return await self.run(self.database.join, table1_name, table2_name, join_attr, **options)
+
+    async def aggregate(self, table_name, field_name, group_by=None, **options):
+        return await self.run(self.database.aggregate, table_name, field_name, group_by, **options)
+
+    async def sql(self, text):
+        """ Записи результата запроса мини-SQL (см. Database.sql). """
+        return await self.run(lambda: self.database.sql(text).fetch())
+
+    async def scan(self, table_name, from_file=False):
+        """ Асинхронно перебирает записи таблицы, читая их в executor кусками по SCAN_CHUNK. """
+        cursor = await self.run(self.database.scan, table_name, from_file)
+        while True:
+            rows = await self.run(list, islice(cursor, self.SCAN_CHUNK))
+            if not rows:
+                return
+            for entry in rows:
+                yield entry
+
+    async def load(self, table_name):
+        table = self.table(table_name)
+        await self.run(self._locked, table, table.load)
+
+    async def save(self, table_name):
+        table = self.table(table_name)
+        await self.run(self._locked, table, table.save)
+
+    @staticmethod
+    def _locked(table, function):
+        with table.writing():
+            function()
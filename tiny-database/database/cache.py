@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from itertools import count
+import threading
+
+_generations = count(1)
+
+
+def new_generation():
+    """
+    Новый номер версии данных таблицы. Номера уникальны среди всех таблиц процесса,
+    поэтому новая таблица с тем же именем не совпадёт по версии со старой.
+    """
+    return next(_generations)
+
+
+def copy_result(result):
+    """ Копия результата запроса: новый список или словарь с новыми записями (словарями) в нём. """
+    if isinstance(result, list):
+        return [dict(row) for row in result]
+    if isinstance(result, dict):
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in result.items()}
+    return result
+
+
+class QueryCache:
+    """
+    LRU-кэш результатов запросов с ограничением по числу записей.
+    Результат хранится вместе с версиями таблиц, по которым он посчитан, и перестаёт быть действительным,
+    как только версия любой из них изменится. Каждый вызов получает свою копию результата (см. copy_result),
+    поэтому изменения результата вызывающим не попадают в кэш.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # Ключ запроса -> (версии таблиц, результат)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, tables, compute):
+        """ Результат запроса key по таблицам tables из кэша или, если его нет или он устарел, от compute(). """
+        generations = tuple(table.generation for table in tables)
+        try:
+            hash(key)
+        except TypeError:
+            return compute()  # Аргументы запроса нельзя использовать как ключ
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached is not None and cached[0] == generations:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return copy_result(cached[1])
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            self.entries[key] = (generations, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return copy_result(result)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self.entries), "max_size": self.max_size}
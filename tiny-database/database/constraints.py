@@ -0,0 +1,63 @@
+from database.index import HashIndex
+from database.schema import STR
+
+
+class UniqueConstraint:
+    """
+    Ограничение PRIMARY KEY или UNIQUE на поле или сочетание полей.
+    Проверяется по уникальному хеш-индексу ключей за O(1) на запись - и при вставке, и при загрузке.
+    """
+
+    def __init__(self, field_names, field_types=None, primary=False):
+        self.field_names = (field_names,) if isinstance(field_names, str) else tuple(field_names)
+        self.primary = primary
+        field_types = field_types or {}
+        self.formats = [field_types.get(field_name, STR).format for field_name in self.field_names]
+        self.index = HashIndex(self.name, unique=True)
+
+    @property
+    def name(self):
+        if len(self.field_names) == 1:
+            return self.field_names[0]
+        return f"({', '.join(self.field_names)})"
+
+    def key(self, entry):
+        """ Ключ записи: значение поля или кортеж значений полей. """
+        if len(self.field_names) == 1:
+            return entry[self.field_names[0]]
+        return tuple(entry[field_name] for field_name in self.field_names)
+
+    def error(self, key):
+        values = (key,) if len(self.field_names) == 1 else key
+        text = ", ".join(format_value(value) for format_value, value in zip(self.formats, values))
+        text = text if len(self.field_names) == 1 else f"({text})"
+        return ValueError(f"Entry with {self.name} = {text} already exists.")
+
+    def build(self, columns, strict=True):
+        """
+        Строит индекс по колонкам полей ограничения; повтор ключа в данных - ошибка.
+        Без strict повторы в данных допустимы: индекс тогда неуникальный и находит все их записи,
+        а новые записи с этими ключами всё равно не вставятся.
+        """
+        keys = columns[0] if len(columns) == 1 else list(zip(*columns))
+        self.index = HashIndex(self.name, unique=strict)
+        for position, key in enumerate(keys):
+            if strict and key in self.index:
+                raise self.error(key)
+            self.index.add(key, position)
+
+    def check(self, entries, taken=()):
+        """
+        Проверяет, что ключи новых записей не встречаются ни в таблице, ни среди самих записей,
+        ни в taken (ключах ещё не добавленных записей транзакции). Возвращает ключи записей.
+        """
+        batch_keys = set()
+        for entry in entries:
+            key = self.key(entry)
+            if key in self.index or key in batch_keys or key in taken:
+                raise self.error(key)
+            batch_keys.add(key)
+        return batch_keys
+
+    def add(self, entry, position):
+        self.index.add(self.key(entry), position)
@@ -0,0 +1,68 @@
+from itertools import islice
+
+from database.aggregate import AGGREGATES, check_functions, stream_aggregate, stream_group_aggregate, to_number
+from database.join import JOIN_TYPES, combine
+
+
+class Cursor:
+    """
+    Ленивый курсор по записям. Операторы (filter, project, join, ...) возвращают новый курсор,
+    а записи читаются из источника только по мере обхода, поэтому память не зависит от размера таблицы.
+    Курсор, как и генератор, можно обойти только один раз.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+
+    def __iter__(self):
+        return self.rows
+
+    def filter(self, predicate):
+        return Cursor(entry for entry in self.rows if predicate(entry))
+
+    def where(self, **conditions):
+        """ Оставляет записи, у которых поля равны заданным значениям. """
+        items = list(conditions.items())
+        return self.filter(lambda entry: all(entry[field_name] == value for field_name, value in items))
+
+    def project(self, *field_names):
+        return Cursor({field_name: entry[field_name] for field_name in field_names} for entry in self.rows)
+
+    def limit(self, count):
+        return Cursor(islice(self.rows, count))
+
+    def join(self, right_rows, left_attr, right_attr="id", how="inner", right_attrs=()):
+        """
+        Потоковое хеш-соединение: правая сторона загружается в хеш-таблицу,
+        левая читается по одной записи.
+        """
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Unknown join type {how}.")
+        buckets = {}
+        for entry in right_rows:
+            buckets.setdefault(entry[right_attr], []).append(entry)
+
+        def rows():
+            for left_entry in self.rows:
+                matches = buckets.get(left_entry[left_attr])
+                if matches:
+                    for right_entry in matches:
+                        yield combine(left_entry, right_entry, right_attr, right_attrs)
+                elif how == "left":
+                    yield combine(left_entry, None, right_attr, right_attrs)
+        return Cursor(rows())
+
+    def aggregate(self, field_name, group_by=None, functions=AGGREGATES):
+        """ Агрегаты по полю за один проход; значения не накапливаются в памяти. """
+        check_functions(functions)
+        if group_by is None:
+            return stream_aggregate((to_number(entry[field_name]) for entry in self.rows), functions)
+        return stream_group_aggregate(((entry[group_by], to_number(entry[field_name])) for entry in self.rows),
+                                      functions)
+
+    def first(self):
+        return next(self.rows, None)
+
+    def fetch(self):
+        """ Дочитывает оставшиеся записи в список. """
+        return list(self.rows)
@@ -1,85 +1,679 @@
 from abc import ABC, abstractmethod
-import csv
-import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import ClassVar, Optional
+import threading
+
+from database.aggregate import (AGGREGATES, aggregate_values, check_functions, gather, stream_aggregate,
+                                stream_group_aggregate, to_number)
+from database.cache import QueryCache, new_generation
+from database.constraints import UniqueConstraint
+from database.cursor import Cursor
+from database.index import INDEX_KINDS, HashIndex, SortedIndex
+from database.join import JOIN_ALGORITHMS
+from database.locks import ReadWriteLock, file_lock, read_locked
+from database.metrics import Metrics, timed
+from database.partition import DatePartitioning, PartitionIndex, Partitioning
+from database.parallel import parallel_aggregate, parallel_join
+from database.query import Query, SqlParser
+from database.schema import ANY, DATE, FLOAT, INT, STR
+from database.storage import STORAGES, ColumnStore, gc_paused, read_csv, throughput, write_csv
+from database.transaction import Transaction
+from database.views import AggregateView, JoinView
 
 
 class SingletonMeta(type):
-    """ Синглтон метакласс для Database. """
+    """ Потокобезопасный синглтон метакласс для Database. """
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
+        with cls._lock:
+            if cls not in cls._instances:
+                cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
 
 class Database(metaclass=SingletonMeta):
-    """ Класс-синглтон базы данных с таблицами, хранящимися в файлах. """
+    """
+    Класс-синглтон базы данных с таблицами, хранящимися в файлах.
+    Операции берут блокировку таблицы (см. Table.reading и Table.writing): чтения (select, join, aggregate)
+    идут параллельно, вставки и создание индексов выполняются по одной.
+    Результаты select, join и aggregate кэшируются до изменения таблиц, по которым они посчитаны.
+    Метрики операций (см. enable_metrics и stats) по умолчанию выключены и тогда почти ничего не стоят.
+    """
+    CACHE_SIZE = 128  # Сколько последних результатов запросов хранить; 0 - не кэшировать
 
     def __init__(self):
         self.tables = {}
+        self.views = {}
+        self.cache = QueryCache(self.CACHE_SIZE)
+        self.metrics = None  # database.metrics.Metrics, пока метрики включены
+        self._local = threading.local()  # Открытая в потоке транзакция (см. transaction)
 
     def register_table(self, table_name, table):
         self.tables[table_name] = table
+        table.metrics = None if self.metrics is None else self.metrics.table(table_name)
+
+    def enable_metrics(self, *callbacks):
+        """
+        Включает метрики: задержки операций, просмотренные и возвращённые записи, байты чтения и записи,
+        попадания в индексы. Каждый замер операции передаётся в callbacks: callback(operation, table_name, seconds).
+        """
+        if self.metrics is None:
+            self.metrics = Metrics()
+            for table_name, table in self.tables.items():
+                table.metrics = self.metrics.table(table_name)
+        for callback in callbacks:
+            self.metrics.subscribe(callback)
+        return self.metrics
+
+    def disable_metrics(self):
+        self.metrics = None
+        for table in self.tables.values():
+            table.metrics = None
+
+    def stats(self):
+        """ Снимок метрик: кэш запросов и, если метрики включены, задержки операций и счётчики таблиц. """
+        stats = {"cache": self.cache.stats()}
+        if self.metrics is not None:
+            stats.update(self.metrics.snapshot())
+        return stats
+
+    @contextmanager
+    def transaction(self):
+        """
+        Транзакция вставок текущего потока: insert и insert_many внутри блока with сразу проверяются,
+        но попадают в таблицы только при выходе из блока, и каждая затронутая таблица сохраняется один раз.
+        Исключение в блоке отменяет все его вставки. Вложенный блок входит во внешнюю транзакцию.
+        """
+        transaction = getattr(self._local, 'transaction', None)
+        if transaction is not None:
+            yield transaction
+            return
+        transaction = self._local.transaction = Transaction()
+        try:
+            yield transaction
+        except BaseException:
+            transaction.rollback()
+            raise
+        else:
+            transaction.commit()
+        finally:
+            self._local.transaction = None
 
+    @timed("insert")
     def insert(self, table_name, data):
         table = self.tables.get(table_name)
-        if table:
-            table.insert(data)
-        else:
+        if not table:
             raise ValueError(f"Table {table_name} does not exist.")
+        transaction = getattr(self._local, 'transaction', None)
+        if transaction is not None:
+            with table.reading():
+                transaction.add(table, [table.make_entry(data)])
+        else:
+            with table.writing():
+                table.insert(data)
 
-    def select(self, table_name, *args):
+    @timed("insert_many")
+    def insert_many(self, table_name, rows):
         table = self.tables.get(table_name)
-        return table.select(*args) if table else None
-
-    def join(self, table1_name, table2_name, join_attr="id"):
-        return_data = []
-
-        for table1_entry in self.tables.get(table1_name).data:
-            return_data.append(table1_entry)
-            if join_attr not in table1_entry.keys():
-                raise ValueError(f"invalid join_attr")
-
-            table2_entry = self.tables.get(table2_name).find_id(table1_entry[join_attr])
-            if not table2_entry:
-                raise ValueError(f"{join_attr} = {table1_entry[join_attr]} does not exist.")
-            for key, value in table2_entry.items():
-                if key != "id":
-                    return_data[-1][key] = value
-        return return_data
+        if not table:
+            raise ValueError(f"Table {table_name} does not exist.")
+        transaction = getattr(self._local, 'transaction', None)
+        if transaction is not None:
+            with table.reading():
+                transaction.add(table, [table.make_entry(row) for row in rows])
+        else:
+            with table.writing():
+                table.insert_many(rows)
 
-    def aggregate(self, table_name, field_name):
+    def create_index(self, table_name, field_name, kind="hash"):
         table = self.tables.get(table_name)
         if table:
-            if not table.data:
-                raise ValueError(f"No data in table {table_name}.")
-            try:
-                return_value = {"SUM": 0, "COUNT": 0, "MAX": float(table.data[0][field_name]),
-                                "MIN": float(table.data[0][field_name]), }
-            except:
-                raise ValueError("Field must contain numbers")
-            for entry in table.data:
-                try:
-                    n = float(entry[field_name])
-                except:
-                    raise ValueError("Field must contain numbers")
-                return_value["SUM"] += n
-                return_value['COUNT'] += 1
-                return_value['MAX'] = max(return_value['MAX'], n)
-                return_value["MIN"] = min(return_value["MIN"], n)
-            return_value["AVG"] = return_value['SUM'] / return_value['COUNT']
-            return return_value
+            with table.writing():
+                return table.create_index(field_name, kind)
+        raise ValueError(f"Table {table_name} does not exist.")
+
+    def create_aggregate_view(self, view_name, table_name, field_name, group_by=None):
+        """
+        Регистрирует агрегаты по полю, обновляемые при каждой вставке (см. AggregateView).
+        Database.aggregate по этому полю и группировке дальше берёт результат из них.
+        """
+        table = self.tables.get(table_name)
+        if not table:
+            raise ValueError(f"Table {table_name} does not exist.")
+        if group_by is not None and group_by not in table.ATTRS:
+            raise ValueError(f"Field {group_by} does not exist.")
+        with table.writing():
+            self.views[view_name] = AggregateView(table, field_name, group_by)
+        return self.views[view_name]
+
+    def create_join_view(self, view_name, table1_name, table2_name, join_attr="id", right_attr="id", how="inner"):
+        """ Регистрирует материализованное соединение таблиц, дополняемое при вставках (см. JoinView). """
+        table1 = self.tables.get(table1_name)
+        table2 = self.tables.get(table2_name)
+        if not table1 or not table2:
+            raise ValueError(f"Table {table1_name if not table1 else table2_name} does not exist.")
+        with read_locked(table1, table2):
+            self.views[view_name] = JoinView(table1, table2, join_attr, right_attr, how)
+        return self.views[view_name]
+
+    @timed("select")
+    def select(self, table_name, *args):
+        table = self.tables.get(table_name)
+        if not table:
+            return None
+        with table.reading():
+            return self.cache.get_or_compute(("select", table_name) + args, (table,), lambda: table.select(*args))
+
+    def query(self, table_name):
+        """ Построитель декларативного запроса к таблице (см. database.query.Query). """
+        return Query(self, table_name)
+
+    def sql(self, text):
+        """
+        Разбирает запрос мини-SQL, например
+        SELECT name, department_name FROM employees JOIN departments ON department_id = id WHERE salary > 1000.
+        Возвращает Query: записи - query.fetch(), план - query.explain().
+        """
+        return SqlParser(text).parse(self)
+
+    def scan(self, table_name, from_file=False):
+        """ Ленивый курсор по записям таблицы (см. Table.scan). """
+        table = self.tables.get(table_name)
+        if not table:
+            raise ValueError(f"Table {table_name} does not exist.")
+        return table.scan(from_file)
+
+    @timed("join")
+    def join(self, table1_name, table2_name, join_attr="id", right_attr="id", how="inner", strict=True,
+             algorithm="hash", workers=None):
+        """
+        Соединяет записи table1 с записями table2, у которых right_attr равен join_attr.
+        how - "inner" или "left", algorithm - "hash" или "merge" (для отсортированных входов).
+        strict - для inner требовать пару для каждой записи table1.
+        workers - соединять части table1 параллельно в пуле из стольких процессов.
+        Возвращает новые записи, хранимые данные не изменяются.
+        """
+        join_rows = JOIN_ALGORITHMS.get(algorithm)
+        if join_rows is None:
+            raise ValueError(f"Unknown join algorithm {algorithm}.")
+        table1 = self.tables.get(table1_name)
+        table2 = self.tables.get(table2_name)
+        with read_locked(table1, table2):
+            key = ("join", table1_name, table2_name, join_attr, right_attr, how, strict, algorithm, workers)
+            return self.cache.get_or_compute(key, (table1, table2), lambda: self._join(
+                join_rows, table1, table2, join_attr, right_attr, how, strict, workers))
+
+    def _join(self, join_rows, table1, table2, join_attr, right_attr, how, strict, workers):
+        if workers:
+            result = parallel_join(join_rows, table1.data, table2.data, join_attr, right_attr, workers, how=how,
+                                   strict=strict, right_attrs=tuple(table2.ATTRS))
         else:
+            right_lookup = None
+            if table2.get_index(right_attr) is not None:
+                right_lookup = lambda value: table2.select_equal(right_attr, value)  # noqa: E731
+            result = join_rows(table1.data, table2.data, join_attr, right_attr, how=how, strict=strict,
+                               right_attrs=table2.ATTRS, right_lookup=right_lookup)
+        if table1.metrics is not None:
+            table1.metrics.count(rows_scanned=len(table1.data), rows_returned=len(result))
+        return result
+
+    @timed("aggregate")
+    def aggregate(self, table_name, field_name, group_by=None, functions=AGGREGATES, streaming=False,
+                  workers=None):
+        """
+        Считает агрегаты functions (SUM, COUNT, MAX, MIN, AVG) по числовому полю.
+        group_by - поле группировки, тогда результат - словарь: значение группы -> агрегаты.
+        streaming - посчитать за один проход по файлу таблицы, не используя данные в памяти.
+        workers - посчитать по файлу таблицы, поделённому на части между стольким числом процессов.
+        """
+        table = self.tables.get(table_name)
+        if not table:
             raise ValueError(f"Table {table_name} does not exist.")
+        check_functions(functions)
+        if group_by is not None and group_by not in table.ATTRS:
+            raise ValueError(f"Field {group_by} does not exist.")
+        with table.reading():
+            # Режим выполнения входит в ключ: потоковый и параллельный подсчёт читают файл, а не память
+            key = ("aggregate", table_name, field_name, group_by, tuple(functions), streaming, workers)
+            return self.cache.get_or_compute(key, (table,), lambda: self._aggregate(
+                table, table_name, field_name, group_by, functions, streaming, workers))
+
+    def _aggregate(self, table, table_name, field_name, group_by, functions, streaming, workers):
+        if workers:
+            result = parallel_aggregate(table, field_name, group_by, functions, workers)
+            if not result:
+                raise ValueError(f"No data in table {table_name}.")
+        elif streaming:
+            to_value = table.number_converter(field_name) or float
+            if group_by is None:
+                rows = table.scan_file((field_name,))
+                result = stream_aggregate((to_value(value) for value, in rows), functions)
+            else:
+                rows = table.scan_file((group_by, field_name))
+                result = stream_group_aggregate(((key, to_value(value)) for key, value in rows), functions)
+            if not result:
+                raise ValueError(f"No data in table {table_name}.")
+        else:
+            if not len(table.data):
+                raise ValueError(f"No data in table {table_name}.")
+            view = table.aggregate_view(field_name, group_by)
+            if view is not None:
+                return view.result(functions)
+            if table.metrics is not None:
+                table.metrics.count(rows_scanned=len(table.data))
+            values = table.numeric_column(field_name)
+            if group_by is None:
+                return aggregate_values(values, functions)
+            result = {key: aggregate_values(gather(values, positions), functions)
+                      for key, positions in table.group_positions(group_by).items()}
+
+        if group_by is None:
+            return result
+        return {table.from_key(group_by, key): value for key, value in result.items()}
 
 
 class Table(ABC):
-    """ Абстрактный бaзовый класс для таблиц с вводом/выводом файлов CSV. """
+    """ Абстрактный бaзовый класс для таблиц, хранящихся в файлах (CSV или двоичные страницы). """
+    PRIMARY_KEY = "id"  # Поле или кортеж полей первичного ключа
+    UNIQUE: ClassVar[tuple] = ()  # Ограничения уникальности: поля или кортежи полей (составные ключи)
+    APPEND_ONLY = False  # Дописывать вставки в журнал вместо перезаписи всего файла
+    FSYNC_EVERY = 1  # Делать fsync журнала после каждых N вставок
+    LOG_SUFFIX = ".log"
+    SNAPSHOT = False  # Кэшировать разобранные колонки в двоичном снимке рядом с CSV-файлом
+    SNAPSHOT_SUFFIX = ".snapshot"
+    CSV_CHUNK = 1 << 22  # По сколько символов CSV-файла разбирать за раз при загрузке и импорте
+    STORAGE = "csv"  # Формат хранения: "csv", "pages" (двоичные страницы) или "partitioned" (файл на раздел)
+    SHARED = False  # Файл таблицы общий для нескольких процессов (см. reading и writing)
+    LOCK_SUFFIX = ".lock"
+
+    COLUMNS: ClassVar[dict] = {}  # Схема таблицы: поле -> тип из database.schema, в порядке полей в файле
+    ATTRS = ()  # Имена полей (выводятся из COLUMNS)
+    FIELD_TYPES: dict = {}  # Типы полей (выводятся из COLUMNS; TemporaryTable задаёт их экземпляру)
+    INDEXES: ClassVar[dict] = {}  # Вторичные индексы таблицы: поле -> вид индекса ("hash" или "sorted")
+    # Разбиение записей на разделы по полю (см. database.partition): поиск без индекса по этому полю
+    # просматривает только подходящие разделы, а с STORAGE = "partitioned" у раздела свой файл
+    PARTITIONS: ClassVar[Optional[Partitioning]] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'COLUMNS' in cls.__dict__:
+            cls.ATTRS = tuple(cls.COLUMNS)
+            cls.FIELD_TYPES = dict(cls.COLUMNS)
+
+    def __init__(self):
+        # Данные не читаются здесь: таблица загружается при первом обращении к data (см. __getattr__)
+        self.index_kinds = dict(self.INDEXES)
+        self.lock = ReadWriteLock()
+        self._load_lock = threading.Lock()
+        self.version = None  # Версия файла, с которой совпадают данные в памяти
+        self.generation = new_generation()  # Версия данных в памяти: меняется при каждом их изменении
+        self.views = []  # Поддерживаемые при вставках представления (см. database.views)
+        self.metrics = None  # database.metrics.TableMetrics, пока у базы включены метрики
+
+    def __getattr__(self, name):
+        # Вызывается, только если атрибута ещё нет: данные и индексы подгружаются лениво
+        if name in ('data', 'pk_index', 'indexes', 'constraints', 'partitions'):
+            with self._load_lock:
+                # Другой читатель мог загрузить таблицу, пока мы ждали
+                if name not in self.__dict__:
+                    self.load()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    @property
+    def loaded(self):
+        return 'data' in self.__dict__
+
+    @property
+    def storage(self):
+        """ Хранилище таблицы, выбранное атрибутом STORAGE. """
+        if getattr(self, '_storage', None) is None or self._storage.NAME != self.STORAGE:
+            self._storage = STORAGES[self.STORAGE](self)
+        return self._storage
+
+    @timed("save")
+    def save(self):
+        self.storage.save()
+        self.version = self.storage.version()
+        if self.metrics is not None:
+            self.metrics.count(bytes_written=self.storage.size())
+
+    @timed("load")
+    def load(self):
+        """ Читает таблицу из хранилища. """
+        # Версия берётся до чтения: если файл изменится во время него, следующий refresh перечитает таблицу
+        self.version = self.storage.version()
+        self.data = self.storage.load()
+        self.build_indexes()
+        if self.metrics is not None:
+            self.metrics.count(bytes_read=self.storage.size())
+
+    def changed(self):
+        """ Изменился ли файл таблицы (например, другим процессом) после того, как она была прочитана. """
+        return not self.loaded or self.storage.version() != self.version
+
+    def refresh(self):
+        """ Перечитывает таблицу, только если её файл изменился. Возвращает True, если перечитала. """
+        if not self.changed():
+            return False
+        self.load()
+        return True
+
+    def file_lock(self, shared=False):
+        return file_lock(self.FILE_PATH + self.LOCK_SUFFIX, shared)
+
+    @contextmanager
+    def reading(self):
+        """
+        Блокировка чтения таблицы. Общая (SHARED) таблица перед этим перечитывается под файловой блокировкой,
+        если её файл изменил другой процесс; если файл не менялся, он не читается.
+        """
+        if self.SHARED and self.changed():
+            with self.lock.write(), self.file_lock(shared=True):
+                self.refresh()
+        with self.lock.read():
+            yield
+
+    @contextmanager
+    def writing(self):
+        """
+        Монопольная блокировка таблицы для вставки. Для общей (SHARED) таблицы также берётся
+        файловая блокировка, и таблица дочитывается, чтобы не потерять записи других процессов.
+        """
+        with self.lock.write():
+            if not self.SHARED:
+                yield
+                return
+            with self.file_lock():
+                self.refresh()
+                yield
+
+    def import_csv(self, path, chunk_size=None):
+        """
+        Заменяет данные таблицы записями из CSV-файла, разбирая его кусками по chunk_size символов (см. read_csv),
+        и сохраняет их в хранилище таблицы. Возвращает число записей, время и записей в секунду.
+        """
+        started = perf_counter()
+        # Данные разбираются отдельно и заменяют данные таблицы, только если и разбор, и индексы удались
+        store = ColumnStore(self.ATTRS, self.FIELD_TYPES)
+        with open(path, 'r') as f, gc_paused():
+            rows = read_csv(store, f, self.make_entry, chunk_size or self.CSV_CHUNK)
+        self.build_indexes(store)
+        self.compact()
+        return throughput(rows, perf_counter() - started)
+
+    def export_csv(self, path):
+        """ Записывает данные таблицы в CSV-файл. Возвращает число записей, время и записей в секунду. """
+        started = perf_counter()
+        write_csv(path, self.ATTRS, self.data.formatted_rows())
+        return throughput(len(self.data), perf_counter() - started)
+
+    def build_indexes(self, data=None, strict=True):
+        """
+        Перестраивает индексы ограничений (первичного ключа и UNIQUE) и вторичные индексы по текущим данным таблицы
+        или по новым данным data, которые заменяют данные таблицы, только если индексы по ним построились.
+        Повтор ключа в данных - ошибка (без strict ограничения проверяются только для новых вставок).
+        """
+        data = self.data if data is None else data
+        primary = UniqueConstraint(self.PRIMARY_KEY, self.FIELD_TYPES, primary=True)
+        # У временной таблицы из произвольных записей (например, проекции запроса) поля ключа может не быть
+        constraints = [primary] if set(primary.field_names) <= set(self.ATTRS) else []
+        constraints.extend(UniqueConstraint(field_names, self.FIELD_TYPES) for field_names in self.UNIQUE)
+        for constraint in constraints:
+            constraint.build([data.column(field_name) for field_name in constraint.field_names], strict)
+        indexes = {}
+        for field_name, kind in self.index_kinds.items():
+            indexes[field_name] = INDEX_KINDS[kind](field_name)
+            indexes[field_name].build(data.column(field_name))
+        partitions = None
+        if self.PARTITIONS is not None:
+            partitions = PartitionIndex(self.PARTITIONS)
+            partitions.build(data.column(self.PARTITIONS.field_name))
+        self.data = data
+        self.generation = new_generation()
+        self.constraints, self.indexes, self.partitions = constraints, indexes, partitions
+        self.pk_index = primary.index if constraints[:1] == [primary] else None
+        for view in self.views:
+            view.rebuild()
+
+    def column(self, field_name):
+        """ Колонка значений поля в порядке записей. """
+        return self.data.column(field_name)
+
+    def number_converter(self, field_name):
+        """
+        Функция приведения значений поля к числу для агрегатов;
+        None - поле уже числовое и приводить ничего не нужно.
+        """
+        field_type = self.FIELD_TYPES.get(field_name, STR)
+        if field_name not in self.ATTRS or not (field_type.numeric or field_type in (STR, ANY)):
+            raise ValueError("Field must contain numbers")
+        return None if field_type.numeric else to_number
+
+    def aggregate_view(self, field_name, group_by=None):
+        """ Поддерживаемые агрегаты по полю и группировке, если они зарегистрированы. """
+        for view in self.views:
+            if isinstance(view, AggregateView) and (view.field_name, view.group_by) == (field_name, group_by):
+                return view
+        return None
+
+    def numeric_column(self, field_name):
+        """ Значения поля для агрегатов: числовая колонка как есть, строки - с приведением к float. """
+        to_value = self.number_converter(field_name)
+        column = self.column(field_name)
+        return column if to_value is None else [to_value(value) for value in column]
+
+    def group_positions(self, field_name):
+        """ Позиции записей по значениям поля: из хеш-индекса, если он есть. """
+        index = self.get_index(field_name)
+        if isinstance(index, HashIndex):
+            return index.groups()
+        groups = {}
+        for position, value in enumerate(self.column(field_name)):
+            groups.setdefault(value, []).append(position)
+        return groups
+
+    def scan(self, from_file=False):
+        """ Ленивый курсор по записям: из памяти или потоково из CSV-файла и журнала таблицы. """
+        if not from_file:
+            return Cursor(self.data)
+        decoders = [self.FIELD_TYPES[field_name].decode for field_name in self.ATTRS]
+        return Cursor(dict(zip(self.ATTRS, [decode(value) for decode, value in zip(decoders, values)]))
+                      for values in self.scan_file(self.ATTRS))
+
+    def scan_file(self, field_names):
+        """ Потоково читает значения полей из хранилища таблицы, не загружая их в память. """
+        return self.storage.scan(field_names)
+
+    def to_key(self, field_name, value):
+        """ Приводит значение к виду, в котором поле хранится в колонке и индексах. """
+        field_type = self.FIELD_TYPES.get(field_name)
+        return value if field_type is None else field_type.encode(value)
+
+    def from_key(self, field_name, value):
+        field_type = self.FIELD_TYPES.get(field_name)
+        return value if field_type is None else field_type.decode(value)
+
+    def create_index(self, field_name, kind="hash"):
+        """ Создаёт вторичный индекс по полю, поддерживаемый при вставках. """
+        if field_name not in self.ATTRS:
+            raise ValueError(f"Field {field_name} does not exist.")
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind {kind}.")
+        column = self.column(field_name)
+        index = INDEX_KINDS[kind](field_name)
+        index.build(column)
+        self.indexes[field_name] = index
+        self.index_kinds[field_name] = kind
+        return index
+
+    def get_index(self, field_name):
+        """ Возвращает индекс по полю или None, если поле не проиндексировано. """
+        if field_name == self.PRIMARY_KEY:
+            return self.pk_index
+        if field_name in self.indexes:
+            return self.indexes[field_name]
+        # Уникальные индексы ограничений на одно поле тоже годятся для поиска
+        for constraint in self.constraints:
+            if constraint.field_names == (field_name,):
+                return constraint.index
+        return None
+
+    def select_equal(self, field_name, value):
+        """ Записи, у которых поле равно value: через индекс, если он есть, иначе полным просмотром. """
+        try:
+            value = self.to_key(field_name, value)
+        except (TypeError, ValueError):
+            return []  # Значение не приводится к типу поля - совпадений быть не может
+        index = self.get_index(field_name)
+        if index is not None:
+            positions = candidates = index.lookup(value)
+        else:
+            candidates = self.partition_positions(field_name, value, value)
+            column = self.column(field_name)
+            positions = [position for position in candidates if column[position] == value]
+        if self.metrics is not None:
+            self.count_lookup(index is not None, len(candidates), len(positions))
+        return [self.data[position] for position in positions]
+
+    def select_range(self, field_name, low, high):
+        """ Записи с low <= значение поля <= high: через упорядоченный индекс, если он есть. """
+        low, high = self.to_key(field_name, low), self.to_key(field_name, high)
+        index = self.indexes.get(field_name)
+        if isinstance(index, SortedIndex):
+            positions = candidates = index.range(low, high)
+        else:
+            candidates = self.partition_positions(field_name, low, high)
+            column = self.column(field_name)
+            positions = [position for position in candidates if low <= column[position] <= high]
+        if self.metrics is not None:
+            self.count_lookup(isinstance(index, SortedIndex), len(candidates), len(positions))
+        return [self.data[position] for position in positions]
+
+    def partition_positions(self, field_name, low, high):
+        """
+        Позиции записей, среди которых может быть значение поля от low до high:
+        для поля разбиения - только из подходящих разделов, для остальных полей - все.
+        """
+        if self.partitions is not None and field_name == self.PARTITIONS.field_name:
+            return self.partitions.positions(low, high)
+        return range(len(self.data))
+
+    def count_lookup(self, indexed, scanned, returned):
+        """ Счётчики поиска для метрик: попадание в индекс или просмотр, число просмотренных и найденных записей. """
+        self.metrics.count(index_hits=int(indexed), index_misses=int(not indexed), rows_scanned=scanned,
+                           rows_returned=returned)
+
+    def sorted_by(self, field_name):
+        """ Записи в порядке значения поля; с упорядоченным индексом - без отдельной сортировки. """
+        index = self.indexes.get(field_name)
+        if isinstance(index, SortedIndex):
+            positions = index
+        else:
+            column = self.column(field_name)
+            positions = sorted(range(len(column)), key=column.__getitem__)
+        return [self.data[position] for position in positions]
+
+    def index_entry(self, entry, position):
+        self.generation = new_generation()
+        for index in self.indexes.values():
+            index.add(entry[index.field_name], position)
+        for constraint in self.constraints:
+            constraint.add(entry, position)
+        if self.partitions is not None:
+            self.partitions.add(entry[self.PARTITIONS.field_name], position)
+
+    def make_entry(self, row):
+        """ Собирает запись из строки с пробелами или из кортежа значений, приводя значения к типам полей. """
+        values = row.split() if isinstance(row, str) else list(row)
+        if len(values) != len(self.ATTRS):
+            raise ValueError(f"Expected {len(self.ATTRS)} values, got {len(values)}.")
+        entry = {}
+        for field_name, value in zip(self.ATTRS, values):
+            field_type = self.FIELD_TYPES[field_name]
+            try:
+                entry[field_name] = field_type.encode(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Field {field_name} must be {field_type.name}.")
+        return entry
+
+    def entries_from_csv(self, rows):
+        """ Записи из строк CSV-файла или журнала (словарей строковых значений). """
+        return (self.make_entry([row[field_name] for field_name in self.ATTRS]) for row in rows)
+
+    def format_entry(self, entry):
+        return {field_name: self.FIELD_TYPES[field_name].format(entry[field_name]) for field_name in self.ATTRS}
+
+    def add_entry(self, entry):
+        """ Добавляет запись в память, проверяя ограничения уникальности. """
+        self.check_constraints([entry])
+        self.append_entry(entry)
+
+    def check_constraints(self, entries):
+        for constraint in self.constraints:
+            constraint.check(entries)
+
+    def append_entry(self, entry):
+        """ Добавляет уже проверенную запись в данные, индексы и представления таблицы. """
+        position = len(self.data)
+        self.index_entry(entry, position)
+        self.data.append(entry)
+        for view in self.views:
+            view.add(self, entry, position)
+
+    def insert_many(self, rows):
+        """ Вставляет пачку записей целиком или не вставляет ни одной, сохраняя их за одну запись. """
+        self.write_entries(self.add_entries(rows))
+
+    def add_entries(self, rows):
+        """ Добавляет пачку записей в память целиком или ни одной, не сохраняя их. Возвращает записи. """
+        entries = [self.make_entry(row) for row in rows]
+        self.check_constraints(entries)
+        for entry in entries:
+            self.append_entry(entry)
+        return entries
+
+    def find_id(self, id):
+        """ Запись по первичному ключу; для составного ключа id - кортеж значений его полей. """
+        if isinstance(self.PRIMARY_KEY, str):
+            entries = self.select_equal(self.PRIMARY_KEY, id)
+            return entries[0] if entries else None
+        try:
+            key = tuple(self.to_key(field_name, value) for field_name, value in zip(self.PRIMARY_KEY, id))
+        except (TypeError, ValueError):
+            return None
+        position = self.pk_index.get(key)
+        return None if position is None else self.data[position]
+
+    @property
+    def log(self):
+        """ Журнал дописываемых записей CSV-хранилища. """
+        return self.storage.log
+
+    def write_entries(self, entries):
+        self.storage.write(entries)
+        self.version = self.storage.version()
+
+    def sync(self):
+        """ Принудительно сбрасывает на диск накопленные вставки. """
+        self.storage.sync()
+
+    @timed("compact")
+    def compact(self):
+        """ Переписывает файл таблицы со всеми данными. """
+        self.storage.compact()
+        self.version = self.storage.version()
+        if self.metrics is not None:
+            self.metrics.count(bytes_written=self.storage.size())
 
-    @abstractmethod
     def insert(self, data):
-        pass # pragma: no cover
+        """ Вставляет одну запись: приводит значения к типам полей, проверяет ограничения и сохраняет её. """
+        entry = self.make_entry(data)
+        self.add_entry(entry)
+        self.write_entries([entry])
 
     @abstractmethod
     def select(self, *args):
@@ -88,151 +682,73 @@ class Table(ABC):
 
 class EmployeeTable(Table):
     """ Таблица сотрудников с методами ввода-вывода из файла CSV. """
-    ATTRS = ('id', 'name', 'age', 'salary', "department_id")
     FILE_PATH = 'employee_table.csv'
-
-    def __init__(self):
-        self.data = []
-        self.load()  # Подгружаем из CSV-файла сразу при инициализации
-
-    def insert(self, data):
-        entry = dict(zip(self.ATTRS, data.split()))
-        if not self.find_id(entry["id"]):
-            self.data.append(entry)
-            self.save()
-        else:
-            raise ValueError(f"Entry with id = {entry['id']} already exists.")
+    COLUMNS = {'id': INT, 'name': STR, 'age': INT, 'salary': FLOAT, "department_id": INT}
+    UNIQUE = (("id", "department_id"),)
+    INDEXES = {"department_id": "hash", "id": "sorted"}
 
     def select(self, start_id, end_id):
-        return [entry for entry in self.data if start_id <= int(entry['id']) <= end_id]
-
-    def save(self):
-        with open(self.FILE_PATH, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=self.ATTRS)
-            writer.writeheader()
-            writer.writerows(self.data)
-
-    def load(self):
-        if os.path.exists(self.FILE_PATH):
-            with open(self.FILE_PATH, 'r') as f:
-                reader = csv.DictReader(f)
-                self.data = [row for row in reader]
-        else:
-            self.data = []
-
-    def find_id(self, id):
-        for entry in self.data:
-            if entry["id"] == id:
-                return entry
-        return None
+        return self.select_range('id', start_id, end_id)
 
 
 class DepartmentTable(Table):
     """ Таблица подразделенией с вводлм-выводом в/из CSV файла. """
-    ATTRS = ('id', 'department_name')
     FILE_PATH = 'department_table.csv'
+    COLUMNS = {'id': INT, 'department_name': STR}
+    INDEXES = {"department_name": "hash"}
 
-    def __init__(self):
-        self.data = []
-        self.load()
-
-    # TODO: Реализовать
     def select(self, department_name):
-        return [entry for entry in self.data if entry['department_name'] == department_name]
-
-    def insert(self, data):
-        entry = dict(zip(self.ATTRS, data.split()))
-        if not self.find_id(entry["id"]):
-            self.data.append(entry)
-            self.save()
-        else:
-            raise ValueError(f"Entry with id = {entry['id']} already exists.")
-
-    def save(self):
-        with open(self.FILE_PATH, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=self.ATTRS)
-            writer.writeheader()
-            writer.writerows(self.data)
-
-    def load(self):
-        if os.path.exists(self.FILE_PATH):
-            with open(self.FILE_PATH, 'r') as f:
-                reader = csv.DictReader(f)
-                self.data = [row for row in reader]
-        else:
-            self.data = []
-
-    def find_id(self, id):
-        for entry in self.data:
-            if entry["id"] == id:
-                return entry
-        return None
+        return self.select_equal('department_name', department_name)
 
 
 class TemporaryTable(Table):
-    def __init__(self, data):
-        self.data = data
-        self.ATTRS = []
-        if len(self.data):
-            self.ATTRS = self.data[0].keys()
+    """
+    Временная таблица в памяти (например, результат join) без файла.
+    Схема - все поля исходных записей в порядке их появления (недостающие поля записи - None),
+    значения хранятся как есть (тип ANY).
+    Исходные записи могут повторять id (соединение "один ко многим"): ключ проверяется только у вставок.
+    """
 
-    def insert(self, data):
+    def __init__(self, data):
+        super().__init__()
+        rows = list(data)
+        self.set_fields(list(dict.fromkeys(field_name for row in rows for field_name in row)))
+        self.data.extend({field_name: row.get(field_name) for field_name in self.ATTRS} for row in rows)
+        self.build_indexes(strict=False)
+
+    def set_fields(self, field_names):
+        self.ATTRS = field_names
+        self.FIELD_TYPES = dict.fromkeys(field_names, ANY)
+        self.data = ColumnStore(self.ATTRS, self.FIELD_TYPES)
+
+    def column(self, field_name):
+        # У пустой таблицы схема появляется только с первой вставкой
+        return self.data.column(field_name) if self.ATTRS else []
+
+    def make_entry(self, row):
+        values = row.split() if isinstance(row, str) else [str(value) for value in row]
         if not self.ATTRS:
-            self.ATTRS.append("id")
-            for i in range(1, len(data.split())):
-                self.ATTRS.append(f"field{i}")
-        entry = dict(zip(self.ATTRS, data.split()))
-        if not self.find_id(entry["id"]):
-            self.data.append(entry)
-        else:
-            raise ValueError(f"Entry with id = {entry['id']} already exists.")
+            self.set_fields(["id"] + [f"field{i}" for i in range(1, len(values))])
+            self.build_indexes()  # Теперь у таблицы есть поле первичного ключа
+        return dict(zip(self.ATTRS, values))
 
-    def find_id(self, id):
-        for entry in self.data:
-            if entry["id"] == id:
-                return entry
-        return None
+    def write_entries(self, entries):
+        pass  # Временная таблица живёт только в памяти
+
+    def sync(self):
+        pass
 
     def select(self, field_name, field_value):
-        return [entry for entry in self.data if entry[field_name] == field_value]
+        return self.select_equal(field_name, field_value)
 
 
 class BonusTable(Table):
     """ Таблица подразделенией с вводлм-выводом в/из CSV файла. """
-    ATTRS = ('id', 'employee_id', "date", 'amount')
     FILE_PATH = 'bonus_table.csv'
-
-    def __init__(self):
-        self.data = []
-        self.load()
-
-    def insert(self, data):
-        entry = dict(zip(self.ATTRS, data.split()))
-        if not self.find_id(entry["id"]):
-            self.data.append(entry)
-            self.save()
-        else:
-            raise ValueError(f"Entry with id = {entry['id']} already exists.")
-
-    def save(self):
-        with open(self.FILE_PATH, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=self.ATTRS)
-            writer.writeheader()
-            writer.writerows(self.data)
-
-    def load(self):
-        if os.path.exists(self.FILE_PATH):
-            with open(self.FILE_PATH, 'r') as f:
-                reader = csv.DictReader(f)
-                self.data = [row for row in reader]
-        else:
-            self.data = []
-
-    def find_id(self, id):
-        for entry in self.data:
-            if entry["id"] == id:
-                return entry
-        return None
+    COLUMNS = {'id': INT, 'employee_id': INT, "date": DATE, 'amount': FLOAT}
+    INDEXES = {"employee_id": "hash"}
+    PARTITIONS = DatePartitioning("date", "month")
+    STORAGE = "partitioned"  # Вставка дописывает только файл месяца премии (см. PartitionedStorage)
 
     def select(self, employee_id):
-        return [entry for entry in self.data if int(entry['employee_id']) == employee_id]
+        return self.select_equal('employee_id', employee_id)
@@ -0,0 +1,89 @@
+from bisect import bisect_left, bisect_right
+
+
+class HashIndex:
+    """ Хеш-индекс по одному полю: значение поля -> позиции записей в таблице. """
+
+    def __init__(self, field_name, unique=False):
+        self.field_name = field_name
+        self.unique = unique
+        self.entries = {}
+
+    def build(self, values):
+        """ Перестраивает индекс по колонке значений поля. """
+        self.entries = {}
+        for position, value in enumerate(values):
+            self.add(value, position)
+
+    def add(self, value, position):
+        if self.unique:
+            # При повторах в файле остаётся первая запись, как и при линейном поиске
+            self.entries.setdefault(value, position)
+        else:
+            self.entries.setdefault(value, []).append(position)
+
+    def lookup(self, value):
+        """ Возвращает позиции всех записей с данным значением поля. """
+        if self.unique:
+            position = self.entries.get(value)
+            return [] if position is None else [position]
+        return self.entries.get(value, [])
+
+    def get(self, value):
+        positions = self.lookup(value)
+        return positions[0] if positions else None
+
+    def groups(self):
+        """ Словарь значение поля -> позиции записей (не изменять). """
+        if self.unique:
+            return {value: [position] for value, position in self.entries.items()}
+        return self.entries
+
+    def __contains__(self, value):
+        return value in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SortedIndex:
+    """ Упорядоченный индекс: отсортированный массив значений поля, поддерживаемый через bisect. """
+
+    def __init__(self, field_name):
+        self.field_name = field_name
+        self.keys = []
+        self.positions = []
+
+    def build(self, values):
+        """ Перестраивает индекс по колонке значений поля. """
+        self.positions = sorted(range(len(values)), key=values.__getitem__)
+        self.keys = [values[position] for position in self.positions]
+
+    def add(self, value, position):
+        # bisect_right сохраняет порядок вставки для равных значений
+        insert_at = bisect_right(self.keys, value)
+        self.keys.insert(insert_at, value)
+        self.positions.insert(insert_at, position)
+
+    def lookup(self, value):
+        """ Возвращает позиции всех записей с данным значением поля. """
+        return self.positions[bisect_left(self.keys, value):bisect_right(self.keys, value)]
+
+    def range(self, low=None, high=None):
+        """ Позиции записей с low <= значение <= high в порядке значения за O(log N + k); None - без границы. """
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return self.positions[start:end]
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __contains__(self, value):
+        position = bisect_left(self.keys, value)
+        return position < len(self.keys) and self.keys[position] == value
+
+    def __len__(self):
+        return len(self.keys)
+
+
+INDEX_KINDS = {"hash": HashIndex, "sorted": SortedIndex}
@@ -0,0 +1,110 @@
+JOIN_TYPES = ("inner", "left")
+
+
+def combine(left_entry, right_entry, right_attr, right_attrs):
+    """ Собирает новую запись результата из пары записей, не изменяя исходные. """
+    result = dict(left_entry)
+    if right_entry is None:
+        right_entry = dict.fromkeys(right_attrs)
+    for key, value in right_entry.items():
+        # При совпадении имён полей остаётся значение из левой таблицы
+        if key != right_attr and key not in result:
+            result[key] = value
+    return result
+
+
+def check_join_args(left, right, left_attr, right_attr, how):
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unknown join type {how}.")
+    if (left and left_attr not in left[0]) or (right and right_attr not in right[0]):
+        raise ValueError("invalid join_attr")
+
+
+def hash_join(left, right, left_attr, right_attr="id", how="inner", strict=False, right_attrs=(),
+              right_lookup=None, combine=combine):
+    """
+    Хеш-соединение: хеш-таблица строится по меньшей из сторон.
+    Если правая таблица умеет искать записи по right_attr через индекс (right_lookup),
+    хеш-таблица не строится и правая сторона не перебирается.
+    Порядок результата совпадает с порядком записей левой таблицы.
+    strict - для inner требовать пару для каждой левой записи.
+    combine - сборка записи результата из пары (по умолчанию - см. combine).
+    """
+    left = list(left)
+    right = list(right) if right_lookup is None else ()
+    check_join_args(left, right, left_attr, right_attr, how)
+
+    if right_lookup is not None:
+        probe = right_lookup
+    elif how == "inner" and len(left) < len(right):
+        # Левая сторона меньше: хешируем её и проходим по правой
+        buckets = {}
+        for position, entry in enumerate(left):
+            buckets.setdefault(entry[left_attr], []).append(position)
+        pairs = []
+        for right_entry in right:
+            for position in buckets.get(right_entry[right_attr], ()):
+                pairs.append((position, right_entry))
+        pairs.sort(key=lambda pair: pair[0])
+        if strict:
+            # Первая по порядку левая запись без пары - та же ошибка, что и при проходе по левой стороне
+            matched = {position for position, _ in pairs}
+            for position, entry in enumerate(left):
+                if position not in matched:
+                    raise ValueError(f"{left_attr} = {entry[left_attr]} does not exist.")
+        return [combine(left[position], right_entry, right_attr, right_attrs) for position, right_entry in pairs]
+    else:
+        buckets = {}
+        for entry in right:
+            buckets.setdefault(entry[right_attr], []).append(entry)
+        probe = buckets.get
+    result = []
+    for left_entry in left:
+        matches = probe(left_entry[left_attr])
+        if matches:
+            for right_entry in matches:
+                result.append(combine(left_entry, right_entry, right_attr, right_attrs))
+        elif how == "left":
+            result.append(combine(left_entry, None, right_attr, right_attrs))
+        elif strict:
+            raise ValueError(f"{left_attr} = {left_entry[left_attr]} does not exist.")
+    return result
+
+
+def merge_join(left, right, left_attr, right_attr="id", how="inner", strict=False, right_attrs=(),
+               right_lookup=None, combine=combine):
+    """
+    Соединение слиянием отсортированных по ключу входов.
+    Неотсортированные входы предварительно сортируются, результат упорядочен по ключу.
+    """
+    left, right = list(left), list(right)
+    check_join_args(left, right, left_attr, right_attr, how)
+    left = sort_by(left, left_attr)
+    right = sort_by(right, right_attr)
+
+    result = []
+    j = 0
+    for left_entry in left:
+        key = left_entry[left_attr]
+        while j < len(right) and right[j][right_attr] < key:
+            j += 1
+        k = j
+        while k < len(right) and right[k][right_attr] == key:
+            result.append(combine(left_entry, right[k], right_attr, right_attrs))
+            k += 1
+        if k == j:
+            if how == "left":
+                result.append(combine(left_entry, None, right_attr, right_attrs))
+            elif strict:
+                raise ValueError(f"{left_attr} = {key} does not exist.")
+    return result
+
+
+def sort_by(rows, attr):
+    """ Возвращает записи, упорядоченные по attr, не сортируя уже упорядоченный вход. """
+    if all(rows[i][attr] <= rows[i + 1][attr] for i in range(len(rows) - 1)):
+        return rows
+    return sorted(rows, key=lambda entry: entry[attr])
+
+
+JOIN_ALGORITHMS = {"hash": hash_join, "merge": merge_join}
@@ -0,0 +1,90 @@
+from contextlib import ExitStack, contextmanager
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]  # Нет на Windows: блокировка между процессами там не выполняется
+
+
+class ReadWriteLock:
+    """
+    Блокировка читатели-писатель: читатели работают параллельно, писатель - монопольно.
+    Ожидающий писатель не пропускает вперёд новых читателей, поэтому поток чтений его не "заморит".
+    Блокировка не реентерабельна.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """ Рекомендательная блокировка fcntl на файле path: общая для чтения или монопольная для записи. """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def lock_order(tables):
+    """
+    Таблицы без повторов в едином для всех потоков порядке (по id): поток, ждущий вторую таблицу,
+    никогда не держит таблицу, которую в это время ждёт другой поток, поэтому взаимной блокировки нет.
+    """
+    return [table for _, table in sorted({id(table): table for table in tables}.items())]
+
+
+@contextmanager
+def read_locked(*tables):
+    """ Берёт блокировки чтения нескольких таблиц: каждую один раз, в порядке lock_order. """
+    with ExitStack() as stack:
+        for table in lock_order(tables):
+            stack.enter_context(table.reading())
+        yield
+
+
+@contextmanager
+def write_locked(*tables):
+    """ Берёт блокировки записи нескольких таблиц: каждую один раз, в порядке lock_order. """
+    with ExitStack() as stack:
+        for table in lock_order(tables):
+            stack.enter_context(table.writing())
+        yield
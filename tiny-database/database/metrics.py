@@ -0,0 +1,127 @@
+from bisect import bisect_left
+from collections import Counter
+from functools import wraps
+from time import perf_counter
+import threading
+
+
+class Histogram:
+    """ Гистограмма задержек: число замеров по корзинам с верхними границами BOUNDS (в секундах). """
+    BOUNDS = tuple(10 ** (power / 2) for power in range(-12, 3))  # От 1 мкс до 10 с через полпорядка
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)  # Последняя корзина - дольше 10 с
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds):
+        self.counts[bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """ Оценка квантиля сверху: граница корзины, в которую он попал, но не больше максимума. """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {"count": self.count, "total": self.total, "mean": self.total / self.count,
+                "min": self.min, "max": self.max,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+                # Корзины с замерами: верхняя граница (None - без границы) -> число замеров
+                "buckets": [(self.BOUNDS[i] if i < len(self.BOUNDS) else None, count)
+                            for i, count in enumerate(self.counts) if count]}
+
+
+class Metrics:
+    """
+    Метрики базы: гистограммы задержек операций и счётчики по таблицам
+    (просмотренные и возвращённые записи, прочитанные и записанные байты, попадания в индексы).
+    Подписчики (callbacks) получают каждый замер операции: callback(operation, table_name, seconds).
+    """
+
+    def __init__(self):
+        self.latencies = {}  # Операция -> Histogram
+        self.counters = {}  # Имя таблицы -> Counter
+        self.callbacks = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        self.callbacks.remove(callback)
+
+    def table(self, table_name):
+        """ Метрики, привязанные к таблице (см. Table.metrics). """
+        return TableMetrics(self, table_name)
+
+    def observe(self, operation, seconds, table_name=None):
+        with self._lock:
+            histogram = self.latencies.get(operation)
+            if histogram is None:
+                histogram = self.latencies[operation] = Histogram()
+            histogram.add(seconds)
+        for callback in self.callbacks:
+            callback(operation, table_name, seconds)
+
+    def count(self, table_name, amounts):
+        with self._lock:
+            self.counters.setdefault(table_name, Counter()).update(amounts)
+
+    def snapshot(self):
+        with self._lock:
+            tables = {}
+            for table_name, counter in self.counters.items():
+                stats = dict(counter)
+                lookups = counter["index_hits"] + counter["index_misses"]
+                if lookups:
+                    stats["index_hit_rate"] = counter["index_hits"] / lookups
+                tables[table_name] = stats
+            return {"operations": {operation: histogram.snapshot() for operation, histogram in self.latencies.items()},
+                    "tables": tables}
+
+
+class TableMetrics:
+    """ Метрики одной таблицы: замеры и счётчики записываются в общие метрики базы под её именем. """
+
+    def __init__(self, metrics, table_name):
+        self.metrics = metrics
+        self.table_name = table_name
+
+    def observe(self, operation, seconds, table_name=None):
+        self.metrics.observe(operation, seconds, self.table_name)
+
+    def count(self, **amounts):
+        self.metrics.count(self.table_name, amounts)
+
+
+def timed(operation):
+    """
+    Декоратор метода Database или Table: замеряет время вызова, если у объекта включены метрики (self.metrics).
+    Без метрик остаётся одна проверка атрибута. Первый аргумент метода Database - имя таблицы.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            started = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                metrics.observe(operation, perf_counter() - started, args[0] if args else None)
+        return wrapper
+    return decorator
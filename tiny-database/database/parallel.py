@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+
+from database.aggregate import Accumulator, accumulate, accumulate_groups
+from database.join import check_join_args, merge_join, sort_by
+
+
+def aggregate_partition(scan, to_value, grouped):
+    """ Частичные агрегаты по одной части таблицы (выполняется в процессе пула). """
+    if grouped:
+        return accumulate_groups((key, to_value(value)) for key, value in scan())
+    return accumulate(to_value(value) for value, in scan())
+
+
+def parallel_aggregate(table, field_name, group_by, functions, workers):
+    """
+    Агрегаты по файлу таблицы, поделённому на части между workers процессами.
+    Каждый процесс считает частичные SUM/COUNT/MAX/MIN по своей части, затем они объединяются.
+    Результат - как у stream_aggregate/stream_group_aggregate.
+    """
+    to_value = table.number_converter(field_name) or float
+    field_names = (field_name,) if group_by is None else (group_by, field_name)
+    scans = table.storage.split(field_names, workers)
+    with ProcessPoolExecutor(workers) as executor:
+        partials = list(executor.map(aggregate_partition, scans, repeat(to_value), repeat(group_by is not None)))
+
+    if group_by is None:
+        total = Accumulator()
+        for accumulator in partials:
+            total.merge(accumulator)
+        return total.result(functions) if total.count else None
+    groups = {}
+    for accumulators in partials:
+        for key, accumulator in accumulators.items():
+            groups.setdefault(key, Accumulator()).merge(accumulator)
+    return {key: accumulator.result(functions) for key, accumulator in groups.items()}
+
+
+def parallel_join(join_rows, left, right, left_attr, right_attr, workers, **options):
+    """
+    Соединение, при котором левая таблица делится на части между workers процессами,
+    а каждая часть соединяется со всей правой таблицей. Результаты частей склеиваются по порядку,
+    поэтому порядок записей тот же, что и у join_rows.
+    """
+    left, right = list(left), list(right)
+    check_join_args(left, right, left_attr, right_attr, options.get("how", "inner"))
+    if join_rows is merge_join:
+        left = sort_by(left, left_attr)  # Склеенные части слияния тогда упорядочены по ключу
+    step = -(-len(left) // workers) or 1
+    chunks = [left[i:i + step] for i in range(0, len(left), step)]
+    join_chunk = partial(join_rows, right=right, left_attr=left_attr, right_attr=right_attr, **options)
+    with ProcessPoolExecutor(workers) as executor:
+        return [entry for rows in executor.map(join_chunk, chunks) for entry in rows]
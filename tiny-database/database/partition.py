@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from itertools import chain
+
+
+class Partitioning(ABC):
+    """
+    Разбиение записей таблицы на разделы по значению поля (в том виде, в котором оно хранится в колонке).
+    Раздел называется строкой-ключом (она же - имя его файла) и покрывает полуинтервал значений [start, end).
+    """
+
+    def __init__(self, field_name):
+        self.field_name = field_name
+
+    @abstractmethod
+    def key(self, value):
+        pass # pragma: no cover
+
+    @abstractmethod
+    def bounds(self, key):
+        pass # pragma: no cover
+
+    def overlaps(self, key, low=None, high=None):
+        """ Могут ли в разделе быть значения с low <= значение <= high; None - без границы. """
+        start, end = self.bounds(key)
+        return (low is None or low < end) and (high is None or start <= high)
+
+    def order(self, keys):
+        """ Ключи разделов в порядке их значений. """
+        return sorted(keys, key=lambda key: self.bounds(key)[0])
+
+
+class RangePartitioning(Partitioning):
+    """ Разделы по диапазонам ширины width: [0, width), [width, 2 * width), ... """
+
+    def __init__(self, field_name, width):
+        super().__init__(field_name)
+        self.width = width
+
+    def key(self, value):
+        return str(int(value // self.width))
+
+    def bounds(self, key):
+        start = int(key) * self.width
+        return start, start + self.width
+
+
+class DatePartitioning(Partitioning):
+    """ Разделы по месяцам ("2025-02") или годам ("2025") поля-даты. """
+    PERIODS = ("month", "year")
+
+    def __init__(self, field_name, period="month"):
+        if period not in self.PERIODS:
+            raise ValueError(f"Unknown partition period {period}.")
+        super().__init__(field_name)
+        self.period = period
+
+    def key(self, value):
+        value = date.fromordinal(value)
+        return f"{value.year:04d}-{value.month:02d}" if self.period == "month" else f"{value.year:04d}"
+
+    def bounds(self, key):
+        if self.period == "year":
+            year = int(key)
+            return date(year, 1, 1).toordinal(), date(year + 1, 1, 1).toordinal()
+        year, month = map(int, key.split("-"))
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return date(year, month, 1).toordinal(), end.toordinal()
+
+
+class PartitionIndex:
+    """ Позиции записей таблицы по разделам: ключ раздела -> позиции в порядке вставки. """
+
+    def __init__(self, partitioning):
+        self.partitioning = partitioning
+        self.entries = {}
+
+    def build(self, values):
+        self.entries = {}
+        for position, value in enumerate(values):
+            self.add(value, position)
+
+    def add(self, value, position):
+        self.entries.setdefault(self.partitioning.key(value), []).append(position)
+
+    def keys(self, low=None, high=None):
+        """ Разделы, в которых могут быть значения с low <= значение <= high (остальные отсекаются). """
+        return [key for key in self.entries if self.partitioning.overlaps(key, low, high)]
+
+    def positions(self, low=None, high=None):
+        """ Позиции записей только из подходящих разделов, по возрастанию. """
+        return sorted(chain.from_iterable(self.entries[key] for key in self.keys(low, high)))
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,548 @@
+from itertools import islice
+import operator
+import re
+
+from database.aggregate import AGGREGATES, Accumulator, to_number
+from database.index import SortedIndex
+from database.join import hash_join, merge_join
+from database.locks import read_locked
+
+OPERATORS = {"=": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt,
+             ">=": operator.ge}
+AGGREGATE_ITEM = re.compile(r"^(\w+)\((\w+(?:\.\w+)?)\)$")
+
+
+class Predicate:
+    """ Условие "поле оператор значение" над записью; key - имя поля в записи, если оно другое (см. Join). """
+
+    def __init__(self, field_name, op, value, key=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op}.")
+        self.field_name = field_name
+        self.op = op
+        self.value = value
+        self.key = field_name if key is None else key
+
+    def __call__(self, entry):
+        value = entry[self.key]
+        # Поля правой таблицы LEFT JOIN без пары - None: как NULL в SQL, они не удовлетворяют условиям
+        return value is not None and OPERATORS[self.op](value, self.value)
+
+    def __str__(self):
+        return f"{self.field_name} {self.op} {self.value!r}"
+
+
+class PlanNode:
+    """ Узел плана запроса: выдаёт записи через rows(), описывает себя через describe(). """
+    children = ()
+    ordered_by = None  # Поле, по которому упорядочены выдаваемые записи, если порядок известен
+
+    def explain(self, depth=0):
+        lines = ["  " * depth + self.describe()]
+        for child in self.children:
+            lines.append(child.explain(depth + 1))
+        return "\n".join(lines)
+
+
+class Scan(PlanNode):
+    def __init__(self, table_name, table):
+        self.table_name = table_name
+        self.table = table
+
+    def rows(self):
+        return iter(self.table.data)
+
+    def describe(self):
+        return f"Scan({self.table_name})"
+
+
+class IndexScan(PlanNode):
+    """ Выборка по индексу: равенство - по любому индексу, сравнение - по упорядоченному. """
+
+    def __init__(self, table_name, table, predicate, index):
+        self.table_name = table_name
+        self.table = table
+        self.predicate = predicate
+        self.index = index
+        if isinstance(index, SortedIndex):
+            self.ordered_by = predicate.field_name
+
+    def rows(self):
+        field_name, op, value = self.predicate.field_name, self.predicate.op, self.predicate.value
+        if op == "=":
+            return iter(self.table.select_equal(field_name, value))
+        key = self.table.to_key(field_name, value)
+        low, high = (key, None) if op in (">", ">=") else (None, key)
+        rows = (self.table.data[position] for position in self.index.range(low, high))
+        # Строгие границы: диапазон индекса включает само значение
+        return rows if op in (">=", "<=") else filter(self.predicate, rows)
+
+    def describe(self):
+        kind = "sorted" if isinstance(self.index, SortedIndex) else "hash"
+        return f"IndexScan({self.table_name}.{self.predicate} via {kind})"
+
+
+class PartitionScan(PlanNode):
+    """
+    Чтение только тех разделов таблицы, в которых могут быть записи с условиями на поле разбиения
+    (см. Table.PARTITIONS); сами условия проверяет Filter над этим узлом.
+    """
+
+    def __init__(self, table_name, table, predicates):
+        self.table_name = table_name
+        self.table = table
+        self.predicates = predicates
+        low = high = None
+        for predicate in predicates:
+            key = table.to_key(predicate.field_name, predicate.value)
+            if predicate.op in ("=", ">", ">=") and (low is None or key > low):
+                low = key
+            if predicate.op in ("=", "<", "<=") and (high is None or key < high):
+                high = key
+        self.low, self.high = low, high
+
+    def rows(self):
+        return (self.table.data[position] for position in self.table.partitions.positions(self.low, self.high))
+
+    def describe(self):
+        partitions = self.table.partitions
+        return (f"PartitionScan({self.table_name}.{' AND '.join(map(str, self.predicates))}, "
+                f"{len(partitions.keys(self.low, self.high))} of {len(partitions)} partitions)")
+
+
+class Filter(PlanNode):
+    def __init__(self, child, predicates):
+        self.children = (child,)
+        self.predicates = predicates
+        self.ordered_by = child.ordered_by
+
+    def rows(self):
+        predicates = self.predicates
+        return (entry for entry in self.children[0].rows() if all(predicate(entry) for predicate in predicates))
+
+    def describe(self):
+        return f"Filter({' AND '.join(map(str, self.predicates))})"
+
+
+def qualify(table_name, rows):
+    """ Записи таблицы с полными именами полей "таблица.поле". """
+    for entry in rows:
+        yield {f"{table_name}.{field_name}": value for field_name, value in entry.items()}
+
+
+def merge_rows(left_entry, right_entry, right_attr, right_attrs):
+    """ Запись результата соединения записей с полными именами полей: сохраняются все поля обеих сторон. """
+    result = dict(left_entry)
+    result.update(dict.fromkeys(right_attrs) if right_entry is None else right_entry)
+    return result
+
+
+class Join(PlanNode):
+    """
+    Соединение: "index" - поиск пар по индексу правой таблицы (правая сторона не читается целиком),
+    "merge" - слияние упорядоченных по ключу входов, "hash" - хеш-соединение.
+    Записи результата - с полными именами полей "таблица.поле": поле соединения правой таблицы
+    и одноимённые поля разных таблиц остаются доступны условиям и проекции над соединением.
+    left_name - имя таблицы, если слева её собственные записи (а не результат другого соединения).
+    """
+
+    def __init__(self, left, right, left_name, left_key, right_name, right_table, left_attr, right_attr, how,
+                 algorithm):
+        self.left = left
+        self.right = right
+        self.left_name = left_name
+        self.left_key = left_key
+        self.right_name = right_name
+        self.right_table = right_table
+        self.left_attr = left_attr
+        self.right_attr = right_attr
+        self.how = how
+        self.algorithm = algorithm
+        self.children = (left,) if algorithm == "index" else (left, right)
+        if algorithm == "merge":
+            self.ordered_by = left_key
+
+    def rows(self):
+        right_name, right_attr = self.right_name, self.right_attr
+        right_key = f"{right_name}.{right_attr}"
+        right_attrs = [f"{right_name}.{field_name}" for field_name in self.right_table.ATTRS]
+        options = dict(how=self.how, right_attrs=right_attrs, combine=merge_rows)
+        left = self.left.rows()
+        left = list(left if self.left_name is None else qualify(self.left_name, left))
+        if self.algorithm == "index":
+            table = self.right_table
+            return iter(hash_join(left, [], self.left_key, right_key, right_lookup=lambda value: list(
+                qualify(right_name, table.select_equal(right_attr, value))), **options))
+        join_rows = merge_join if self.algorithm == "merge" else hash_join
+        return iter(join_rows(left, list(qualify(right_name, self.right.rows())), self.left_key, right_key,
+                              **options))
+
+    def describe(self):
+        return (f"{self.algorithm.capitalize()}Join({self.left_attr} = {self.right_name}.{self.right_attr}, "
+                f"{self.how})")
+
+
+class Aggregate(PlanNode):
+    """
+    Агрегаты за один проход; items - список (имя столбца результата, функция, поле).
+    group_key - имя поля группировки в записи, если оно другое (см. Join).
+    """
+
+    def __init__(self, child, group_by, items, group_key=None):
+        self.children = (child,)
+        self.group_by = group_by
+        self.items = items
+        self.group_key = group_by if group_key is None else group_key
+
+    def rows(self):
+        fields = {field_name for _, _, field_name in self.items}
+        groups = {}
+        for entry in self.children[0].rows():
+            key = None if self.group_by is None else entry[self.group_key]
+            accumulators = groups.get(key)
+            if accumulators is None:
+                accumulators = groups[key] = {field_name: Accumulator() for field_name in fields}
+            for field_name, accumulator in accumulators.items():
+                value = entry[field_name]
+                if value is not None:  # Как в SQL, агрегаты пропускают NULL (поля без пары в LEFT JOIN)
+                    accumulator.add(to_number(value))
+        if self.group_by is None and not groups:
+            groups[None] = {field_name: Accumulator() for field_name in fields}
+        for key, accumulators in groups.items():
+            row = {} if self.group_by is None else {self.group_by: key}
+            for name, function, field_name in self.items:
+                accumulator = accumulators[field_name]
+                if accumulator.count:
+                    row[name] = accumulator.result((function,))[function]
+                else:
+                    row[name] = 0 if function == "COUNT" else None  # Агрегаты пустой таблицы
+            yield row
+
+    def describe(self):
+        names = ", ".join(name for name, _, _ in self.items)
+        return f"Aggregate({names}" + ("" if self.group_by is None else f" GROUP BY {self.group_by}") + ")"
+
+
+class Project(PlanNode):
+    """ Поля результата field_names из полей записи keys (по умолчанию - тех же); label - подпись в плане. """
+
+    def __init__(self, child, field_names, keys=None, label=None):
+        self.children = (child,)
+        self.field_names = field_names
+        self.keys = field_names if keys is None else keys
+        self.label = label
+        self.ordered_by = child.ordered_by
+
+    def rows(self):
+        fields = list(zip(self.field_names, self.keys))
+        return ({field_name: entry[key] for field_name, key in fields} for entry in self.children[0].rows())
+
+    def describe(self):
+        return f"Project({self.label or ', '.join(self.field_names)})"
+
+
+class Limit(PlanNode):
+    def __init__(self, child, count):
+        self.children = (child,)
+        self.count = count
+
+    def rows(self):
+        return islice(self.children[0].rows(), self.count)
+
+    def describe(self):
+        return f"Limit({self.count})"
+
+
+class Query:
+    """
+    Декларативный запрос к Database: FROM, JOIN, WHERE, GROUP BY, SELECT, LIMIT.
+    plan() строит план: условия на одну таблицу опускаются под соединения к её чтению,
+    для чтения выбирается подходящий индекс, для соединения - алгоритм.
+    Поля можно указывать как "поле" (ищется в таблицах по порядку) или "таблица.поле".
+    """
+
+    def __init__(self, database, table_name):
+        self.database = database
+        self.table_name = table_name
+        self.joins = []
+        self.conditions = []
+        self.items = []
+        self.group_field = None
+        self.limit_count = None
+
+    def join(self, table_name, left_attr, right_attr="id", how="inner"):
+        self.joins.append((table_name, left_attr, right_attr, how))
+        return self
+
+    def where(self, field_name, op, value):
+        self.conditions.append((field_name, op, value))
+        return self
+
+    def select(self, *items):
+        """ Поля результата и агрегаты вида "SUM(salary)"; без аргументов - записи целиком. """
+        self.items.extend(items)
+        return self
+
+    def group_by(self, field_name):
+        self.group_field = field_name
+        return self
+
+    def limit(self, count):
+        if not isinstance(count, int) or count < 0:
+            raise ValueError(f"LIMIT must be a non-negative integer, got {count!r}.")
+        self.limit_count = count
+        return self
+
+    def table(self, table_name):
+        table = self.database.tables.get(table_name)
+        if not table:
+            raise ValueError(f"Table {table_name} does not exist.")
+        return table
+
+    def resolve(self, field_ref, table_names):
+        """ Таблица и имя поля по ссылке "поле" или "таблица.поле". """
+        if "." in field_ref:
+            table_name, field_name = field_ref.split(".", 1)
+            if table_name in table_names and field_name in self.table(table_name).ATTRS:
+                return table_name, field_name
+        else:
+            for table_name in table_names:
+                if field_ref in self.table(table_name).ATTRS:
+                    return table_name, field_ref
+        raise ValueError(f"Field {field_ref} does not exist.")
+
+    def predicate(self, table_name, field_name, op, value, key=None):
+        """ Условие со значением, приведённым к типу поля. """
+        table = self.table(table_name)
+        try:
+            value = table.from_key(field_name, table.to_key(field_name, value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Field {field_name} must be {table.FIELD_TYPES[field_name].name}.")
+        return Predicate(field_name, op, value, key)
+
+    def row_key(self, table_name, field_name):
+        """ Имя поля в записях над соединениями: с именем таблицы (см. Join), без соединений - само поле. """
+        return f"{table_name}.{field_name}" if self.joins else field_name
+
+    def access(self, table_name, predicates):
+        """
+        Чтение таблицы: по индексу для самого избирательного условия, остальные условия - фильтром.
+        Без подходящего индекса условия на поле разбиения отсекают разделы, которые не нужно читать.
+        """
+        table = self.table(table_name)
+        best = None
+        for predicate in predicates:
+            if predicate.op == "=":
+                index = table.get_index(predicate.field_name)
+            elif predicate.op != "!=":
+                index = table.indexes.get(predicate.field_name)
+                index = index if isinstance(index, SortedIndex) else None
+            else:
+                index = None
+            if index is None:
+                continue
+            # Равенство по первичному ключу лучше равенства, равенство лучше диапазона
+            rank = (predicate.op == "=") + (predicate.op == "=" and predicate.field_name == table.PRIMARY_KEY)
+            if best is None or rank > best[0]:
+                best = (rank, predicate, index)
+        partitioning = table.PARTITIONS
+        pruning = [predicate for predicate in predicates
+                   if partitioning is not None and predicate.field_name == partitioning.field_name
+                   and predicate.op != "!="]
+        if best is None and pruning:
+            node = PartitionScan(table_name, table, pruning)
+        elif best is None:
+            node = Scan(table_name, table)
+        else:
+            node = IndexScan(table_name, table, best[1], best[2])
+            predicates = [predicate for predicate in predicates if predicate is not best[1]]
+        return Filter(node, predicates) if predicates else node
+
+    def plan(self):
+        table_names = [self.table_name] + [table_name for table_name, _, _, _ in self.joins]
+        # Условие на правую таблицу LEFT JOIN нельзя опустить под соединение: оно отбрасывает строки без пары
+        outer = {table_name for table_name, _, _, how in self.joins if how == "left"}
+        pushed = {table_name: [] for table_name in table_names}
+        residual = []
+        for field_ref, op, value in self.conditions:
+            table_name, field_name = self.resolve(field_ref, table_names)
+            if table_name in outer:
+                residual.append(self.predicate(table_name, field_name, op, value, self.row_key(table_name, field_name)))
+            else:
+                pushed[table_name].append(self.predicate(table_name, field_name, op, value))
+
+        node = self.access(self.table_name, pushed[self.table_name])
+        right_attrs = []
+        for i, (table_name, left_ref, right_attr, how) in enumerate(self.joins, 1):
+            left_name, left_attr = self.resolve(left_ref, table_names[:i])
+            left_key = f"{left_name}.{left_attr}"
+            right_attr = self.resolve(f"{table_name}.{right_attr}", [table_name])[1]
+            right_attrs.append(right_attr)
+            right = self.access(table_name, pushed[table_name])
+            right_table = self.table(table_name)
+            ordered_by = node.ordered_by
+            if i == 1 and ordered_by is not None:
+                ordered_by = f"{self.table_name}.{ordered_by}"  # Записи первой таблицы ещё без полных имён полей
+            if isinstance(right, Scan) and right_table.get_index(right_attr) is not None:
+                algorithm = "index"
+            elif ordered_by == left_key and right.ordered_by == right_attr:
+                algorithm = "merge"
+            else:
+                algorithm = "hash"
+            node = Join(node, right, self.table_name if i == 1 else None, left_key, table_name, right_table,
+                        left_attr, right_attr, how, algorithm)
+        if residual:
+            node = Filter(node, residual)
+
+        fields, aggregates = [], []
+        for item in self.items:
+            match = AGGREGATE_ITEM.match(item)
+            if match:
+                function = match.group(1).upper()
+                if function not in AGGREGATES:
+                    raise ValueError(f"Unknown aggregate {function}.")
+                aggregates.append((item, function, self.row_key(*self.resolve(match.group(2), table_names))))
+            elif item != "*":
+                fields.append(self.resolve(item, table_names))
+        group = None if self.group_field is None else self.resolve(self.group_field, table_names)
+        if aggregates or group is not None:
+            for field in fields:
+                if field != group:
+                    raise ValueError(f"Field {field[1]} must be in GROUP BY.")
+            node = (Aggregate(node, None, aggregates) if group is None else
+                    Aggregate(node, group[1], aggregates, self.row_key(*group)))
+        elif fields:
+            # Одноимённые поля разных таблиц в результате называются полными именами
+            names = [field_name for _, field_name in fields]
+            names = [field_name if names.count(field_name) == 1 else f"{table_name}.{field_name}"
+                     for table_name, field_name in fields]
+            node = Project(node, names, [self.row_key(*field) for field in fields])
+        elif self.joins:
+            # Все поля - как у Database.join: без поля соединения правой таблицы, при совпадении имён - из левой
+            names, keys = [], []
+            for i, table_name in enumerate(table_names):
+                for field_name in self.table(table_name).ATTRS:
+                    if field_name not in names and (i == 0 or field_name != right_attrs[i - 1]):
+                        names.append(field_name)
+                        keys.append(f"{table_name}.{field_name}")
+            node = Project(node, names, keys, "*")
+        if self.limit_count is not None:
+            node = Limit(node, self.limit_count)
+        return node
+
+    def explain(self):
+        """ План запроса в виде дерева операторов, по одному на строку. """
+        return self.plan().explain()
+
+    def fetch(self):
+        plan = self.plan()
+        tables = [self.table(self.table_name)] + [self.table(table_name) for table_name, _, _, _ in self.joins]
+        with read_locked(*tables):
+            return list(plan.rows())
+
+
+TOKEN = re.compile(r"\s*(?:(?P<number>-?\d+(?:\.\d+)?)|'(?P<string>[^']*)'|(?P<op><=|>=|!=|[=<>(),*])"
+                   r"|(?P<name>[A-Za-z_][\w.]*))")
+
+
+class SqlParser:
+    """
+    Разбор мини-SQL в Query:
+    SELECT поля|агрегаты|* FROM таблица [[LEFT|INNER] JOIN таблица ON поле = поле]...
+    [WHERE поле оп значение [AND ...]] [GROUP BY поле] [LIMIT n]
+    """
+
+    def __init__(self, text):
+        self.tokens = []
+        position = 0
+        text = text.strip().rstrip(";")
+        while position < len(text):
+            match = TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Invalid query near {text[position:]!r}.")
+            kind = match.lastgroup
+            value = match.group(kind)
+            self.tokens.append((kind, float(value) if kind == "number" and "." in value else
+                                int(value) if kind == "number" else value))
+            position = match.end()
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def accept(self, *words):
+        """ Пропускает ключевые слова words, если запрос продолжается ими. """
+        tokens = self.tokens[self.position:self.position + len(words)]
+        if [(kind, str(value).upper()) for kind, value in tokens] != [("name", word) for word in words]:
+            return False
+        self.position += len(words)
+        return True
+
+    def expect(self, *words):
+        if not self.accept(*words):
+            raise ValueError(f"Invalid query: expected {' '.join(words)}.")
+
+    def take(self, kind):
+        token_kind, value = self.peek()
+        if token_kind != kind:
+            raise ValueError(f"Invalid query: expected {kind}, got {value!r}.")
+        self.position += 1
+        return value
+
+    def item(self):
+        if self.peek() == ("op", "*"):
+            self.position += 1
+            return "*"
+        name = self.take("name")
+        if self.peek() == ("op", "("):
+            self.position += 1
+            field_ref = self.take("name")
+            if self.take("op") != ")":
+                raise ValueError("Invalid query: expected ).")
+            return f"{name.upper()}({field_ref})"
+        return name
+
+    def parse(self, database):
+        self.expect("SELECT")
+        items = [self.item()]
+        while self.peek() == ("op", ","):
+            self.position += 1
+            items.append(self.item())
+        self.expect("FROM")
+        query = Query(database, self.take("name")).select(*items)
+        while True:
+            how = "left" if self.accept("LEFT") else "inner"
+            if how == "inner":
+                self.accept("INNER")
+            if not self.accept("JOIN"):
+                if how == "left":
+                    raise ValueError("Invalid query: expected JOIN.")
+                break
+            table_name = self.take("name")
+            self.expect("ON")
+            left_ref = self.take("name")
+            if self.take("op") != "=":
+                raise ValueError("Invalid query: expected =.")
+            right_ref = self.take("name")
+            # В ON поле присоединяемой таблицы может стоять с любой стороны от =
+            if right_ref.split(".")[0] != table_name and left_ref.split(".")[0] == table_name:
+                left_ref, right_ref = right_ref, left_ref
+            query.join(table_name, left_ref, right_ref.split(".")[-1], how)
+        if self.accept("WHERE"):
+            while True:
+                field_ref = self.take("name")
+                op = self.take("op")
+                kind, value = self.peek()
+                if kind not in ("number", "string"):
+                    raise ValueError(f"Invalid query: expected value, got {value!r}.")
+                self.position += 1
+                query.where(field_ref, op, value)
+                if not self.accept("AND"):
+                    break
+        if self.accept("GROUP", "BY"):
+            query.group_by(self.take("name"))
+        if self.accept("LIMIT"):
+            query.limit(self.take("number"))
+        if self.peek()[0] is not None:
+            raise ValueError(f"Invalid query: unexpected {self.peek()[1]!r}.")
+        return query
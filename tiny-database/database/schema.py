@@ -0,0 +1,115 @@
+from abc import ABC, abstractmethod
+from array import array
+from datetime import date
+from operator import index
+from typing import Optional
+
+
+class FieldType(ABC):
+    """
+    Тип поля таблицы: разбор значения из CSV, запись обратно и представление в колонке.
+    Значения хранятся в колонках в "сыром" виде (например, дата - как порядковый номер дня):
+    encode приводит к нему строку из CSV или значение Python, decode - превращает обратно в значение Python.
+    """
+    name: Optional[str] = None
+    typecode: Optional[str] = None  # Код array.array для компактной колонки; None - обычный список
+    numeric = False
+
+    @abstractmethod
+    def encode(self, value):
+        pass # pragma: no cover
+
+    def format(self, value):
+        return str(value)
+
+    def decode(self, value):
+        return value
+
+    def parse_column(self, values):
+        """ Значения колонки из строк CSV, приведённые к типу поля одним проходом (без записи на строку). """
+        return map(self.encode, values)
+
+    def new_column(self):
+        return array(self.typecode) if self.typecode else []
+
+
+class IntType(FieldType):
+    name = "int"
+    typecode = 'q'
+    numeric = True
+
+    def encode(self, value):
+        return int(value) if isinstance(value, str) else index(value)
+
+    def parse_column(self, values):
+        return map(int, values)
+
+
+class FloatType(FieldType):
+    name = "float"
+    typecode = 'd'
+    numeric = True
+
+    def encode(self, value):
+        return float(value)
+
+    def parse_column(self, values):
+        return map(float, values)
+
+    def format(self, value):
+        text = repr(value)
+        return text[:-2] if text.endswith(".0") else text
+
+
+class DateType(FieldType):
+    """ Дата в формате дд.мм.гггг, хранится как порядковый номер дня. """
+    name = "date"
+    typecode = 'i'
+
+    def parse(self, text):
+        day, month, year = text.split('.')
+        return date(int(year), int(month), int(day)).toordinal()
+
+    def format(self, value):
+        value = date.fromordinal(value)
+        return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
+
+    def encode(self, value):
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, date):
+            return value.toordinal()
+        raise TypeError(f"Cannot convert {type(value).__name__} to date.")
+
+    def decode(self, value):
+        return date.fromordinal(value)
+
+    def parse_column(self, values):
+        # Дат в колонке обычно намного меньше, чем записей: каждая разбирается один раз
+        parsed = {text: self.parse(text) for text in set(values)}
+        return map(parsed.__getitem__, values)
+
+
+class StrType(FieldType):
+    name = "str"
+
+    def encode(self, value):
+        return value if isinstance(value, str) else str(value)
+
+    def parse_column(self, values):
+        return values
+
+
+class AnyType(FieldType):
+    """ Значение любого типа как есть (например, в записях временной таблицы с результатом join). """
+    name = "any"
+
+    def encode(self, value):
+        return value
+
+
+INT = IntType()
+FLOAT = FloatType()
+DATE = DateType()
+STR = StrType()
+ANY = AnyType()
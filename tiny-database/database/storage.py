@@ -0,0 +1,740 @@
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain, islice, repeat
+import csv
+import gc
+import io
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+
+WRITE_BUFFER = 1 << 20  # Буфер записи CSV-файлов в байтах
+CSV_ROWS = 65536  # По сколько строк приводить к типам за раз при разборе модулем csv
+
+
+class AppendLog:
+    """ Журнал дописываемых записей таблицы (строки CSV без заголовка). """
+
+    def __init__(self, path, fieldnames):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.pending = 0  # Сколько записей ещё не сброшено на диск через fsync
+        self._file = None
+        self._writer = None
+
+    def append(self, entry):
+        if self._file is None:
+            self._file = open(self.path, 'a', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        self._writer.writerow(entry)
+        self._file.flush()
+        self.pending += 1
+
+    def sync(self):
+        """ Сбрасывает дописанные записи на диск. """
+        if self._file is not None and self.pending:
+            os.fsync(self._file.fileno())
+        self.pending = 0
+
+    def replay(self):
+        """ Возвращает записи журнала в порядке их добавления. """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb+') as f:
+            content = f.read()
+            if not content.endswith(b'\n'):
+                # Последняя строка недописана из-за сбоя - отрезаем её
+                content = content[:content.rfind(b'\n') + 1]
+                f.truncate(len(content))
+        return list(csv.DictReader(io.StringIO(content.decode(), newline=''), fieldnames=self.fieldnames))
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def clear(self):
+        """ Удаляет журнал после того, как его записи попали в основной файл. """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ColumnStore:
+    """
+    Колоночное хранилище записей таблицы: по компактной типизированной колонке на поле.
+    Записи-словари собираются только при обращении к ним.
+    """
+
+    def __init__(self, fieldnames, field_types):
+        self.field_types = {name: field_types[name] for name in fieldnames}
+        self.columns = {name: field_type.new_column() for name, field_type in self.field_types.items()}
+
+    def append(self, entry):
+        """ Добавляет запись из уже приведённых к типам колонок значений. """
+        for name, column in self.columns.items():
+            column.append(entry[name])
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def column(self, field_name):
+        return self.columns[field_name]
+
+    def row(self, position):
+        return {name: self.field_types[name].decode(column[position]) for name, column in self.columns.items()}
+
+    def raw_rows(self):
+        """ Строки значений в том виде, в котором они хранятся в колонках. """
+        return zip(*self.columns.values())
+
+    def formatted_rows(self):
+        """ Строки значений, отформатированных для записи в CSV. """
+        return zip(*(map(self.field_types[name].format, column) for name, column in self.columns.items()))
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.row(i) for i in range(len(self))[position]]
+        return self.row(range(len(self))[position])
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.row(position)
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+
+def write_snapshot(path, source_path, columns):
+    """
+    Сохраняет колонки таблицы в двоичный снимок рядом с CSV-файлом.
+    В снимок записываются время изменения и размер CSV, по которым потом проверяется его актуальность.
+    """
+    stat = os.stat(source_path)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump((stat.st_mtime_ns, stat.st_size, columns), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path, source_path, fieldnames):
+    """ Колонки из снимка или None, если снимка нет, он от другой схемы или CSV изменился после него. """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(source_path)
+    with open(path, 'rb') as f:
+        mtime_ns, size, columns = pickle.load(f)
+    if (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size) or list(columns) != list(fieldnames):
+        return None
+    return columns
+
+
+def file_version(path):
+    """ Отметка версии файла: меняется при любой записи в него или подмене через os.replace. """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def write_csv(path, fieldnames, rows):
+    """
+    Записывает CSV-файл: заголовок из имён полей и строки значений.
+    Файл пишется во временный, сбрасывается на диск и подменяется целиком,
+    поэтому ни читатель, ни сбой посреди записи не оставят его недописанным.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', newline='', buffering=WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+@contextmanager
+def gc_paused():
+    """
+    Отключает циклический сборщик мусора на время пакетного разбора: иначе он раз за разом
+    обходит миллионы ещё живых списков строк, и это дольше самого разбора.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_csv(store, f, make_entry, chunk_size):
+    """
+    Дописывает в колоночное хранилище записи CSV-файла f с заголовком, читая его кусками по chunk_size символов.
+    Кусок без кавычек разбирается сразу в колонки: текст режется на поля одним split, колонка поля - срез
+    каждого n-го из них, и она приводится к типу поля одним проходом; строк и словарей на запись не создаётся.
+    С первой кавычки файл дочитывается модулем csv. Кусок с пустыми или неполными строками
+    или с неверными значениями разбирается построчно через make_entry, как раньше через csv.DictReader, -
+    с теми же ошибками. Возвращает число прочитанных записей.
+    """
+    header = next(csv.reader([f.readline()]), None)
+    if not header:
+        return 0
+    width = len(header)
+    positions = [header.index(name) if name in header else width for name in store.columns]
+    count = 0
+    tail = ""
+    while True:
+        block = f.read(chunk_size)
+        text = tail + block
+        if '"' in text:
+            # В полях в кавычках могут быть запятые и переводы строк - дальше разбор модулем csv
+            text += f.readline()
+            reader = csv.reader(chain(io.StringIO(text), f))
+            while True:
+                rows = list(islice(reader, CSV_ROWS))
+                if not rows:
+                    return count
+                count += extend_rows(store, rows, width, positions, make_entry)
+        cut = text.rfind('\n') + 1 if block else len(text)
+        text, tail = text[:cut], text[cut:]
+        if text:
+            if text.endswith('\n'):
+                text = text[:-1]
+            lines = text.split('\n')
+            if width not in positions and set(map(str.count, lines, repeat(','))) == {width - 1}:
+                fields = text.replace('\n', ',').split(',')
+                columns = [fields[position::width] for position in positions]
+                if parse_columns(store, columns):
+                    count += len(lines)
+                    continue
+            count += extend_rows(store, list(csv.reader(lines)), width, positions, make_entry)
+        elif not block:
+            return count
+
+
+def extend_rows(store, rows, width, positions, make_entry):
+    """ Дописывает строки CSV (списки значений) в хранилище; возвращает число записей. """
+    if width not in positions and set(map(len, rows)) == {width} and parse_columns(store, list(zip(*rows)), positions):
+        return len(rows)
+    entries = [make_entry([row[position] if position < len(row) else None for position in positions])
+               for row in rows if row]
+    store.extend(entries)
+    return len(entries)
+
+
+def parse_columns(store, values, positions=None):
+    """
+    Приводит колонки строк values к типам полей и дописывает их в хранилище; positions - номера колонок полей
+    в values (по умолчанию - по порядку). Если значение не приводится к типу, хранилище не меняется и возвращается False.
+    """
+    if positions is not None:
+        values = [values[position] for position in positions]
+    try:
+        columns = []
+        for field_type, column_values in zip(store.field_types.values(), values):
+            column = field_type.new_column()
+            column.extend(field_type.parse_column(column_values))
+            columns.append(column)
+    except (TypeError, ValueError, OverflowError):
+        return False
+    for column, parsed in zip(store.columns.values(), columns):
+        column.extend(parsed)
+    return True
+
+
+def throughput(rows, seconds):
+    """ Отчёт о пакетном импорте или экспорте: записей, секунд и записей в секунду. """
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else None}
+
+
+class CsvStorage:
+    """ Хранение таблицы в CSV-файле: вставки перезаписывают файл или дописываются в журнал. """
+    NAME = "csv"
+
+    def __init__(self, table):
+        self.table = table
+        self._log = None
+
+    @property
+    def log(self):
+        """ Журнал дописываемых записей, лежащий рядом с CSV-файлом таблицы. """
+        log_path = self.table.FILE_PATH + self.table.LOG_SUFFIX
+        if self._log is None or self._log.path != log_path:
+            self._log = AppendLog(log_path, self.table.ATTRS)
+        return self._log
+
+    def version(self):
+        return file_version(self.table.FILE_PATH), file_version(self.log.path)
+
+    def size(self):
+        """ Размер CSV-файла и журнала в байтах. """
+        return sum(version[2] for version in self.version() if version is not None)
+
+    def load(self):
+        """ Читает таблицу из CSV-файла (или его актуального снимка) и дописанного журнала. """
+        table = self.table
+        self.log.close()  # Журнал мог быть удалён другим процессом при сжатии
+        store = ColumnStore(table.ATTRS, table.FIELD_TYPES)
+        if os.path.exists(table.FILE_PATH):
+            snapshot_path = table.FILE_PATH + table.SNAPSHOT_SUFFIX
+            columns = read_snapshot(snapshot_path, table.FILE_PATH, table.ATTRS) if table.SNAPSHOT else None
+            if columns is not None:
+                store.columns = columns
+            else:
+                with open(table.FILE_PATH, 'r') as f, gc_paused():
+                    read_csv(store, f, table.make_entry, table.CSV_CHUNK)
+                if table.SNAPSHOT:
+                    write_snapshot(snapshot_path, table.FILE_PATH, store.columns)
+        store.extend(table.entries_from_csv(self.log.replay()))
+        return store
+
+    def save(self):
+        """ Переписывает основной CSV-файл со всеми данными и очищает журнал: его записи теперь в файле. """
+        write_csv(self.table.FILE_PATH, self.table.ATTRS, self.table.data.formatted_rows())
+        self.log.clear()
+
+    def write(self, entries):
+        """ Сохраняет вставленные записи: дописывает их в журнал или перезаписывает файл. """
+        if self.table.APPEND_ONLY:
+            for entry in entries:
+                self.log.append(self.table.format_entry(entry))
+            if self.log.pending >= self.table.FSYNC_EVERY:
+                self.log.sync()
+        else:
+            self.compact()
+
+    def sync(self):
+        """ Принудительно сбрасывает на диск накопленные записи журнала. """
+        self.log.sync()
+
+    def compact(self):
+        self.save()
+
+    def scan(self, field_names):
+        """ Потоково читает значения полей из CSV-файла и журнала, не загружая их в память. """
+        for scan in self.split(field_names, 1):
+            yield from scan()
+
+    def split(self, field_names, parts):
+        """
+        Делит CSV-файл и журнал на части примерно по parts кусков по границам строк.
+        Каждая часть - функция без аргументов (её можно передать в другой процесс),
+        потоково возвращающая значения полей field_names из своих строк.
+        """
+        table = self.table
+        field_types = [table.FIELD_TYPES[field_name] for field_name in field_names]
+        return (csv_scans(table.FILE_PATH, None, field_names, field_types, parts)
+                + csv_scans(self.log.path, list(table.ATTRS), field_names, field_types, parts))
+
+
+def csv_scans(path, fieldnames, field_names, field_types, parts):
+    """
+    Части CSV-файла для split: функции, потоково возвращающие значения полей field_names из своих строк.
+    fieldnames - поля строк файла без заголовка (журнала); None - поля берутся из заголовка в первой строке.
+    """
+    if not os.path.exists(path):
+        return []
+    start = 0
+    if fieldnames is None:
+        with open(path, 'rb') as f:
+            fieldnames = next(csv.reader([f.readline().decode()]), None)
+            start = f.tell()
+        if not fieldnames:
+            return []  # Пустой файл без заголовка
+    columns = [fieldnames.index(field_name) for field_name in field_names]
+    return [partial(scan_csv_range, path, begin, end, len(fieldnames), columns, field_types)
+            for begin, end in byte_ranges(path, start, parts)]
+
+
+def cut_torn_line(path):
+    """ Отрезает последнюю строку файла, если она недописана из-за сбоя посреди дописывания. """
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - io.DEFAULT_BUFFER_SIZE)
+            f.seek(start)
+            block = f.read(position - start)
+            if position == end and block.endswith(b'\n'):
+                return
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def byte_ranges(path, start, parts):
+    """ Делит файл от смещения start до конца на parts кусков, сдвигая границы к началу следующей строки. """
+    size = os.path.getsize(path)
+    bounds = [start]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(start + (size - start) * i // parts - 1)
+            f.readline()
+            if bounds[-1] < f.tell() < size:
+                bounds.append(f.tell())
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def scan_csv_range(path, start, end, width, columns, field_types):
+    """ Значения полей из строк CSV-файла, начинающихся в байтах [start, end). """
+    def lines(f):
+        position = start
+        for line in f:
+            if position >= end:
+                break
+            position += len(line)
+            yield line.decode()
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for row in csv.reader(lines(f)):
+            if len(row) == width:  # Пропускаем недописанную строку журнала
+                yield tuple(field_type.encode(row[column]) for field_type, column in zip(field_types, columns))
+
+
+class PageLayout:
+    """
+    Расположение записей фиксированной ширины в файле: страница 0 - заголовок,
+    дальше страницы по page_size байт с целым числом записей в каждой.
+    Смещение записи вычисляется по её номеру, поэтому доступ к ней - O(1).
+    """
+
+    def __init__(self, fieldnames, field_types, widths, page_size):
+        self.fieldnames = list(fieldnames)
+        self.widths = widths  # Ширина строковых полей в байтах UTF-8
+        # Числа и даты - в формате колонки (typecode), строки - дополненные нулями байты фиксированной ширины
+        codes = [f"{widths[name]}s" if field_types[name].typecode is None else field_types[name].typecode
+                 for name in self.fieldnames]
+        self.record = struct.Struct('<' + ''.join(codes))
+        self.text_fields = [i for i, name in enumerate(self.fieldnames) if name in widths]
+        self.page_size = max(page_size, self.record.size)
+        self.per_page = self.page_size // self.record.size
+
+    def offset(self, position):
+        page, slot = divmod(position, self.per_page)
+        return self.page_size * (page + 1) + slot * self.record.size
+
+    def fits(self, values):
+        return all(len(values[i].encode()) <= self.widths[self.fieldnames[i]] for i in self.text_fields)
+
+    def pack(self, values):
+        values = list(values)
+        for i in self.text_fields:
+            values[i] = values[i].encode()
+        return self.record.pack(*values)
+
+    def unpack(self, buffer, offset):
+        values = list(self.record.unpack_from(buffer, offset))
+        for i in self.text_fields:
+            values[i] = values[i].rstrip(b'\0').decode()
+        return tuple(values)
+
+
+class PageStorage:
+    """
+    Двоичное постраничное хранение: типизированные записи фиксированной ширины, чтение через mmap.
+    Вставки дописываются в конец последней страницы без перезаписи файла.
+    """
+    NAME = "pages"
+    SUFFIX = ".pages"
+    PAGE_SIZE = 4096
+    MIN_STR_WIDTH = 16  # Запас ширины строковых полей, чтобы вставки реже приводили к перезаписи файла
+    MAGIC = b"TDBPAGES"
+    HEADER = struct.Struct('<8sQI')  # Сигнатура, число записей, длина описания схемы в JSON
+
+    def __init__(self, table):
+        self.table = table
+        self.pending = 0  # Сколько записей ещё не сброшено на диск через fsync
+        self._mapping = None
+
+    @property
+    def path(self):
+        return self.table.FILE_PATH + self.SUFFIX
+
+    def read_header(self, header):
+        return read_page_header(self.path, header, self.table.ATTRS, self.table.FIELD_TYPES)
+
+    def header(self, layout, count):
+        meta = json.dumps({"fields": layout.fieldnames, "widths": layout.widths,
+                           "page_size": layout.page_size}).encode()
+        return self.HEADER.pack(self.MAGIC, count, len(meta)) + meta
+
+    def map(self):
+        """ Отображение файла в память, его расположение и число записей (кэшируются до следующей записи). """
+        if self._mapping is None:
+            with open(self.path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapping = (buffer,) + self.read_header(buffer)
+        return self._mapping
+
+    def close(self):
+        if self._mapping is not None:
+            self._mapping[0].close()
+            self._mapping = None
+
+    def records(self):
+        """ Значения записей в том виде, в котором они хранятся в колонках. """
+        return self.scan(self.table.ATTRS)
+
+    def read(self, position):
+        """ Запись по номеру: значения читаются прямо из отображённого файла по вычисленному смещению. """
+        buffer, layout, count = self.map()
+        position = range(count)[position]
+        values = layout.unpack(buffer, layout.offset(position))
+        return {name: self.table.FIELD_TYPES[name].decode(value) for name, value in zip(layout.fieldnames, values)}
+
+    def version(self):
+        return file_version(self.path)
+
+    def size(self):
+        version = self.version()
+        return 0 if version is None else version[2]
+
+    def load(self):
+        self.close()
+        store = ColumnStore(self.table.ATTRS, self.table.FIELD_TYPES)
+        columns = list(store.columns.values())
+        for values in self.records():
+            for column, value in zip(columns, values):
+                column.append(value)
+        return store
+
+    def save(self):
+        """ Переписывает файл целиком; ширина строковых полей подбирается по самому длинному значению. """
+        table = self.table
+        store = table.data
+        widths = {name: max([self.MIN_STR_WIDTH] + [len(value.encode()) for value in store.column(name)])
+                  for name in table.ATTRS if table.FIELD_TYPES[name].typecode is None}
+        layout = PageLayout(table.ATTRS, table.FIELD_TYPES, widths, self.PAGE_SIZE)
+        header = self.header(layout, len(store))
+        if len(header) > layout.page_size:
+            raise ValueError("Table schema does not fit in a page.")
+        self.close()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header.ljust(layout.page_size, b'\0'))
+            page = bytearray(layout.page_size)
+            for position, values in enumerate(store.raw_rows()):
+                slot = position % layout.per_page
+                if slot == 0 and position:
+                    f.write(page)
+                    page = bytearray(layout.page_size)
+                page[slot * layout.record.size:(slot + 1) * layout.record.size] = layout.pack(values)
+            if len(store):
+                f.write(page)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.pending = 0
+
+    def write(self, entries):
+        """ Дописывает записи на их места в страницах и обновляет число записей в заголовке. """
+        if not os.path.exists(self.path):
+            self.save()
+            return
+        table = self.table
+        rows = [tuple(entry[name] for name in table.ATTRS) for entry in entries]
+        self.close()
+        with open(self.path, 'r+b') as f:
+            layout, count = self.read_header(f.read(self.PAGE_SIZE))
+            if not all(layout.fits(values) for values in rows):
+                f.close()
+                self.save()
+                return
+            for position, values in enumerate(rows, count):
+                f.seek(layout.offset(position))
+                f.write(layout.pack(values))
+            # Число записей обновляется последним: при сбое до этого момента новые записи просто не видны
+            f.seek(len(self.MAGIC))
+            f.write(struct.pack('<Q', count + len(rows)))
+            f.flush()
+            self.pending += len(rows)
+            if self.pending >= table.FSYNC_EVERY:
+                os.fsync(f.fileno())
+                self.pending = 0
+
+    def sync(self):
+        if self.pending and os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                os.fsync(f.fileno())
+        self.pending = 0
+
+    def compact(self):
+        self.save()
+
+    def scan(self, field_names):
+        """ Потоково читает значения полей из отображённого в память файла. """
+        for scan in self.split(field_names, 1):
+            yield from scan()
+
+    def split(self, field_names, parts):
+        """ Делит записи на parts частей по номерам (см. CsvStorage.split). """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            count = self.read_header(f.read(self.PAGE_SIZE))[1]
+        bounds = [count * i // parts for i in range(parts + 1)]
+        return [partial(scan_pages, self.path, self.table.ATTRS, self.table.FIELD_TYPES, field_names, start, end)
+                for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def read_page_header(path, header, fieldnames, field_types):
+    """ Расположение записей и их число из заголовка страничного файла. """
+    magic, count, size = PageStorage.HEADER.unpack_from(header)
+    if magic != PageStorage.MAGIC:
+        raise ValueError(f"{path} is not a page file.")
+    meta = json.loads(bytes(header[PageStorage.HEADER.size:PageStorage.HEADER.size + size]))
+    if meta["fields"] != list(fieldnames):
+        raise ValueError(f"{path} does not match table fields.")
+    return PageLayout(fieldnames, field_types, meta["widths"], meta["page_size"]), count
+
+
+def scan_pages(path, fieldnames, field_types, field_names, start, end):
+    """ Значения полей field_names записей с номерами [start, end) страничного файла. """
+    columns = [list(fieldnames).index(field_name) for field_name in field_names]
+    # Своё отображение файла: вставки во время обхода не закрывают его
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        layout, count = read_page_header(path, buffer, fieldnames, field_types)
+        for position in range(start, min(end, count)):
+            values = layout.unpack(buffer, layout.offset(position))
+            yield tuple(values[column] for column in columns)
+
+
+class PartitionedStorage:
+    """
+    Хранение таблицы в каталоге CSV-файлов, по файлу на раздел (см. Table.PARTITIONS и database.partition).
+    Вставка дописывает записи только в файлы своих разделов: остальная история не читается и не переписывается.
+    Таблица, хранившаяся прежде одним CSV-файлом, при первой загрузке переносится в файлы разделов.
+    """
+    NAME = "partitioned"
+    SUFFIX = ".parts"
+
+    def __init__(self, table):
+        if table.PARTITIONS is None:
+            raise ValueError("Table has no partitioning.")
+        self.table = table
+
+    @property
+    def path(self):
+        return self.table.FILE_PATH + self.SUFFIX
+
+    @property
+    def partitioning(self):
+        return self.table.PARTITIONS
+
+    def partition_path(self, key, directory=None):
+        return os.path.join(directory or self.path, key + ".csv")
+
+    def keys(self, low=None, high=None):
+        """ Ключи разделов, файлы которых есть на диске, по порядку; low, high - отсечь не подходящие по значению. """
+        if not os.path.isdir(self.path):
+            return []
+        keys = [name[:-len(".csv")] for name in os.listdir(self.path) if name.endswith(".csv")]
+        return self.partitioning.order(key for key in keys if self.partitioning.overlaps(key, low, high))
+
+    def version(self):
+        return tuple((key, file_version(self.partition_path(key))) for key in self.keys())
+
+    def size(self):
+        return sum(version[2] for _, version in self.version())
+
+    def load(self):
+        table = self.table
+        store = ColumnStore(table.ATTRS, table.FIELD_TYPES)
+        if not os.path.isdir(self.path) and os.path.exists(table.FILE_PATH):
+            return self.migrate(store)
+        for key in self.keys():
+            path = self.partition_path(key)
+            cut_torn_line(path)
+            with open(path, 'r') as f, gc_paused():
+                read_csv(store, f, table.make_entry, table.CSV_CHUNK)
+        return store
+
+    def migrate(self, store):
+        """
+        Читает в store записи из CSV-файла таблицы прежнего формата и раскладывает их по файлам разделов.
+        Каталог разделов собирается рядом и появляется целиком: прерванный сбоем перенос повторится
+        при следующей загрузке. Сам CSV-файл не удаляется.
+        """
+        table = self.table
+        with open(table.FILE_PATH, 'r') as f, gc_paused():
+            read_csv(store, f, table.make_entry, table.CSV_CHUNK)
+        temp_path = self.path + ".tmp"
+        shutil.rmtree(temp_path, ignore_errors=True)
+        self.write_partitions(store, temp_path)
+        os.replace(temp_path, self.path)
+        return store
+
+    def save(self):
+        """ Переписывает файлы всех разделов; файлы разделов, в которых не осталось записей, удаляются. """
+        stale = set(self.keys()) - self.write_partitions(self.table.data, self.path)
+        for key in stale:
+            os.remove(self.partition_path(key))
+
+    def write_partitions(self, store, directory):
+        """ Записывает записи store в файлы разделов в каталоге directory. Возвращает ключи записанных разделов. """
+        groups = {}
+        keys = map(self.partitioning.key, store.column(self.partitioning.field_name))
+        for key, row in zip(keys, store.formatted_rows()):
+            groups.setdefault(key, []).append(row)
+        os.makedirs(directory, exist_ok=True)
+        for key, rows in groups.items():
+            write_csv(self.partition_path(key, directory), self.table.ATTRS, rows)
+        return set(groups)
+
+    def write(self, entries):
+        """ Дописывает записи в файлы их разделов, сбрасывая каждый на диск. """
+        table = self.table
+        groups = {}
+        for entry in entries:
+            groups.setdefault(self.partitioning.key(entry[self.partitioning.field_name]), []).append(entry)
+        os.makedirs(self.path, exist_ok=True)
+        for key, group in groups.items():
+            path = self.partition_path(key)
+            # Пустой файл остаётся и после отрезания недописанного заголовка (см. cut_torn_line)
+            new = not os.path.exists(path) or not os.path.getsize(path)
+            with open(path, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if new:
+                    writer.writerow(table.ATTRS)
+                writer.writerows(table.format_entry(entry).values() for entry in group)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def sync(self):
+        pass  # write сбрасывает файлы разделов сразу
+
+    def compact(self):
+        self.save()
+
+    def scan(self, field_names, low=None, high=None):
+        """ Потоково читает значения полей из файлов разделов; low, high - читать только подходящие разделы. """
+        for scan in self.split(field_names, 1, low, high):
+            yield from scan()
+
+    def split(self, field_names, parts, low=None, high=None):
+        """ Части файлов подходящих разделов (см. CsvStorage.split), каждый файл - примерно на parts кусков. """
+        field_types = [self.table.FIELD_TYPES[field_name] for field_name in field_names]
+        return [scan for key in self.keys(low, high)
+                for scan in csv_scans(self.partition_path(key), None, field_names, field_types, parts)]
+
+
+STORAGES = {"csv": CsvStorage, "pages": PageStorage, "partitioned": PartitionedStorage}
@@ -0,0 +1,51 @@
+from database.locks import write_locked
+
+
+class Transaction:
+    """
+    Транзакция вставок в несколько таблиц (см. Database.transaction).
+    Записи проверяются ограничениями сразу - по данным таблицы и по уже отложенным записям транзакции, -
+    но попадают в таблицы только при фиксации: до неё их не видят другие потоки, и при отмене
+    в таблицах нечего убирать.
+    Фиксация блокирует на запись все затронутые таблицы, проверяет записи ещё раз (таблицы могли измениться
+    в других потоках или процессах) и сохраняет каждую таблицу одной записью в хранилище.
+    Фиксация атомарна для каждой таблицы, но не для нескольких таблиц сразу:
+    при сбое между их сохранениями часть таблиц окажется сохранённой.
+    """
+
+    def __init__(self):
+        self.tables = {}  # id таблицы -> (таблица, отложенные записи, ключи их ограничений)
+
+    def add(self, table, entries):
+        """ Откладывает записи таблицы до фиксации, если ключи не повторяют ни её данные, ни отложенные записи. """
+        if id(table) not in self.tables:
+            self.tables[id(table)] = (table, [], [set() for _ in table.constraints])
+        _, pending, taken = self.tables[id(table)]
+        keys = [constraint.check(entries, claimed) for constraint, claimed in zip(table.constraints, taken)]
+        pending.extend(entries)
+        for claimed, new_keys in zip(taken, keys):
+            claimed.update(new_keys)
+
+    def commit(self):
+        """ Добавляет отложенные записи в таблицы и сохраняет их со сбросом на диск. """
+        tables = list(self.tables.values())
+        self.tables = {}
+        with write_locked(*(table for table, _, _ in tables)):
+            for table, entries, _ in tables:
+                table.check_constraints(entries)
+            for table, entries, _ in tables:
+                for entry in entries:
+                    table.append_entry(entry)
+                try:
+                    table.write_entries(entries)
+                    table.sync()
+                except BaseException:
+                    # Таблица, которую не удалось сохранить, перечитывается, чтобы память не расходилась с хранилищем;
+                    # у таблицы в памяти (без FILE_PATH) хранилища нет, и её данные остаются как есть
+                    if hasattr(table, "FILE_PATH"):
+                        table.load()
+                    raise
+
+    def rollback(self):
+        """ Отбрасывает отложенные записи. """
+        self.tables = {}
@@ -0,0 +1,127 @@
+import threading
+
+from database.aggregate import AGGREGATES, Accumulator, accumulate, accumulate_groups
+from database.join import JOIN_TYPES, combine
+
+
+class AggregateView:
+    """
+    Постоянно поддерживаемые агрегаты SUM/COUNT/MAX/MIN/AVG по полю таблицы (по группам group_by).
+    Каждая вставка обновляет аккумулятор своей группы за O(1), поэтому таблица не пересматривается.
+    """
+
+    def __init__(self, table, field_name, group_by=None):
+        self.table = table
+        self.field_name = field_name
+        self.group_by = group_by
+        self.to_value = table.number_converter(field_name) or float
+        self.rebuild()
+        table.views.append(self)
+
+    def rebuild(self):
+        """ Пересчитывает агрегаты по всем данным таблицы (после её загрузки). """
+        values = map(self.to_value, self.table.column(self.field_name))
+        if self.group_by is None:
+            self.total = accumulate(values)
+        else:
+            self.groups = accumulate_groups(zip(self.table.column(self.group_by), values))
+
+    def add(self, table, entry, position):
+        value = self.to_value(entry[self.field_name])
+        if self.group_by is None:
+            self.total.add(value)
+        else:
+            self.groups.setdefault(entry[self.group_by], Accumulator()).add(value)
+
+    def get(self, key, functions=AGGREGATES):
+        """ Агрегаты одной группы или None, если в ней нет записей. """
+        accumulator = self.groups.get(self.table.to_key(self.group_by, key))
+        return accumulator.result(functions) if accumulator else None
+
+    def result(self, functions=AGGREGATES):
+        """ Агрегаты в том же виде, что и у Database.aggregate. """
+        if self.group_by is None:
+            return self.total.result(functions) if self.total.count else None
+        return {self.table.from_key(self.group_by, key): accumulator.result(functions)
+                for key, accumulator in self.groups.items()}
+
+
+class JoinView:
+    """
+    Материализованное соединение двух таблиц, дополняемое при вставках в любую из них.
+    Записи результата хранятся по значению ключа соединения: выбор по ключу и размер - O(1).
+    Внутри ключа записи идут в порядке добавления, а не в порядке Database.join.
+    """
+
+    def __init__(self, left, right, left_attr, right_attr="id", how="inner"):
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Unknown join type {how}.")
+        if left_attr not in left.ATTRS or right_attr not in right.ATTRS:
+            raise ValueError("invalid join_attr")
+        self.left = left
+        self.right = right
+        self.left_attr = left_attr
+        self.right_attr = right_attr
+        self.how = how
+        # Вставки в левую и правую таблицы идут под разными блокировками таблиц.
+        # Блокировка реентерабельна: перестройка может загрузить таблицу, а загрузка - снова вызвать перестройку
+        self._lock = threading.RLock()
+        self.rebuild()
+        left.views.append(self)
+        if right is not left:
+            right.views.append(self)
+
+    def rebuild(self):
+        """ Строит соединение заново по всем данным обеих таблиц (после загрузки любой из них). """
+        with self._lock:
+            self.left_rows = {}
+            self.right_rows = {}
+            for entry in self.left.data:
+                self.left_rows.setdefault(entry[self.left_attr], []).append(entry)
+            for entry in self.right.data:
+                self.right_rows.setdefault(entry[self.right_attr], []).append(entry)
+            self.rows = {key: self.combine(entries, self.right_rows.get(key)) for key, entries in self.left_rows.items()}
+            self.size = sum(map(len, self.rows.values()))
+
+    def combine(self, left_entries, right_entries):
+        if right_entries:
+            return [combine(left_entry, right_entry, self.right_attr, self.right.ATTRS)
+                    for left_entry in left_entries for right_entry in right_entries]
+        if self.how == "left":
+            return [combine(left_entry, None, self.right_attr, self.right.ATTRS) for left_entry in left_entries]
+        return []
+
+    def add(self, table, entry, position):
+        with self._lock:
+            if table is self.left:
+                row = table.data[position]
+                key = row[self.left_attr]
+                self.left_rows.setdefault(key, []).append(row)
+                self.extend(key, self.combine([row], self.right_rows.get(key)))
+            if table is self.right:
+                row = table.data[position]
+                key = row[self.right_attr]
+                right_entries = self.right_rows.setdefault(key, [])
+                right_entries.append(row)
+                left_entries = self.left_rows.get(key)
+                if left_entries and len(right_entries) == 1 and self.how == "left":
+                    # Первая пара для ключа заменяет записи левого соединения, дополненные None
+                    self.size -= len(self.rows[key])
+                    self.rows[key] = []
+                if left_entries:
+                    self.extend(key, self.combine(left_entries, [row]))
+
+    def extend(self, key, rows):
+        self.rows.setdefault(key, []).extend(rows)
+        self.size += len(rows)
+
+    def lookup(self, key):
+        """ Записи соединения со значением ключа key (не изменять). """
+        return self.rows.get(key, [])
+
+    def __iter__(self):
+        for rows in self.rows.values():
+            yield from rows
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,60 @@
+import glob
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from database.database import BonusTable, Database, DepartmentTable, EmployeeTable
+
+
+def remove_table_files(path):
+    """ Удаляет файл таблицы и файлы рядом с ним: журнал, страницы, снимок, блокировку, каталог разделов. """
+    for name in [path] + glob.glob(glob.escape(path) + ".*"):
+        try:
+            shutil.rmtree(name) if os.path.isdir(name) else os.remove(name)
+        except Exception as e:
+            print(f"Ошибка при удалении файла: {e}")
+
+
+@pytest.fixture
+def temp_employee_file():
+    """ Создаем временный файл для таблицы рабочих """
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
+    yield temp_file.name
+    remove_table_files(temp_file.name)  # Удаляем временный файл после завершения теста
+
+
+@pytest.fixture
+def temp_department_file():
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
+    yield temp_file.name
+    remove_table_files(temp_file.name)  # Удаляем временный файл после завершения теста
+
+
+@pytest.fixture
+def temp_bonus_file():
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
+    yield temp_file.name
+    remove_table_files(temp_file.name)  # Удаляем временный файл после завершения теста
+
+
+# Пример, как используются фикстуры
+@pytest.fixture
+def database(temp_employee_file, temp_department_file, temp_bonus_file):
+    """ Данная фикстура задает БД и определяет таблицы. """
+    db = Database()
+
+    # Используем временные файлы для тестирования файлового ввода-вывода в EmployeeTable и DepartmentTable
+    employee_table = EmployeeTable()
+    employee_table.FILE_PATH = temp_employee_file
+    department_table = DepartmentTable()
+    department_table.FILE_PATH = temp_department_file
+    bonus_table = BonusTable()
+    bonus_table.FILE_PATH = temp_bonus_file
+
+    db.register_table("employees", employee_table)
+    db.register_table("departments", department_table)
+    db.register_table("bonuses", bonus_table)
+
+    return db
@@ -0,0 +1,88 @@
+from array import array
+from datetime import date
+
+import pytest
+
+from database.aggregate import Accumulator, aggregate_values, gather, stream_aggregate, stream_group_aggregate
+
+
+def test_aggregate_values():
+    values = array('d', [5000, 10000, 3000])
+    assert aggregate_values(values) == {'SUM': 18000.0, 'COUNT': 3, 'MAX': 10000.0, 'MIN': 3000.0, 'AVG': 6000.0}
+    assert aggregate_values(values, ("AVG",)) == {'AVG': 6000.0}
+    assert aggregate_values(values, ("COUNT", "MAX")) == {'COUNT': 3, 'MAX': 10000.0}
+
+
+def test_gather():
+    values = array('q', [10, 20, 30])
+    assert list(gather(values, [0, 2])) == [10, 30]
+    assert list(gather(values, [1])) == [20]
+
+
+def test_accumulator():
+    accumulator = Accumulator()
+    for value in (3, 1, 2):
+        accumulator.add(value)
+    assert accumulator.result(("SUM", "MIN", "MAX", "AVG")) == {'SUM': 6.0, 'MIN': 1.0, 'MAX': 3.0, 'AVG': 2.0}
+
+
+def test_stream_aggregate():
+    assert stream_aggregate(iter([1, 2]), ("COUNT",)) == {'COUNT': 2}
+    assert stream_aggregate(iter([])) is None
+    assert stream_group_aggregate(iter([(1, 10), (2, 5), (1, 20)]), ("SUM",)) == {1: {'SUM': 30.0}, 2: {'SUM': 5.0}}
+
+
+def test_aggregate_group_by(database):
+    database.insert("employees", "1 Alice 30 70000 1")
+    database.insert("employees", "2 Bob 28 60000 2")
+    database.insert("employees", "3 Carol 40 80000 1")
+    result = database.aggregate("employees", "salary", group_by="department_id", functions=("AVG", "COUNT"))
+    assert result == {1: {'AVG': 75000.0, 'COUNT': 2}, 2: {'AVG': 60000.0, 'COUNT': 1}}
+    result = database.aggregate("employees", "age", group_by="name", functions=("MAX",))
+    assert result == {'Alice': {'MAX': 30.0}, 'Bob': {'MAX': 28.0}, 'Carol': {'MAX': 40.0}}
+    result = database.aggregate("employees", "age", group_by="id", functions=("MIN",))
+    assert result == {1: {'MIN': 30.0}, 2: {'MIN': 28.0}, 3: {'MIN': 40.0}}
+
+
+def test_aggregate_group_by_date(database):
+    database.insert("bonuses", "1 1 10.02.2025 5000")
+    database.insert("bonuses", "2 2 10.02.2025 3000")
+    result = database.aggregate("bonuses", "amount", group_by="date", functions=("SUM",))
+    assert result == {date(2025, 2, 10): {'SUM': 8000.0}}
+
+
+def test_aggregate_streaming(database):
+    database.insert_many("bonuses", ["1 1 10.02.2025 5000", "2 2 11.02.2025 3000", "3 1 12.02.2025 1000"])
+    in_memory = database.aggregate("bonuses", "amount")
+    assert database.aggregate("bonuses", "amount", streaming=True) == in_memory
+    result = database.aggregate("bonuses", "amount", group_by="employee_id", functions=("SUM",), streaming=True)
+    assert result == {1: {'SUM': 6000.0}, 2: {'SUM': 3000.0}}
+
+
+def test_aggregate_streaming_reads_log(database):
+    bonus_table = database.tables["bonuses"]
+    bonus_table.STORAGE = "csv"
+    bonus_table.APPEND_ONLY = True
+    database.insert("bonuses", "1 1 10.02.2025 5000")
+    bonus_table.compact()
+    database.insert("bonuses", "2 1 11.02.2025 7000")
+    try:
+        assert database.aggregate("bonuses", "amount", functions=("SUM",), streaming=True) == {'SUM': 12000.0}
+    finally:
+        bonus_table.log.clear()
+
+
+def test_aggregate_streaming_errors(database):
+    with pytest.raises(ValueError, match="No data in table bonuses."):
+        database.aggregate("bonuses", "amount", streaming=True)
+    database.insert("employees", "1 Alice 30 70000 1")
+    with pytest.raises(ValueError, match="Field must contain numbers"):
+        database.aggregate("employees", "name", streaming=True)
+
+
+def test_aggregate_invalid_arguments(database):
+    database.insert("employees", "1 Alice 30 70000 1")
+    with pytest.raises(ValueError, match="Unknown aggregate MEDIAN."):
+        database.aggregate("employees", "age", functions=("MEDIAN",))
+    with pytest.raises(ValueError, match="Field abc does not exist."):
+        database.aggregate("employees", "age", group_by="abc")
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from database.async_database import AsyncDatabase
+from database.database import TemporaryTable
+
+
+def test_concurrent_inserts_are_coalesced(database, temp_employee_file, monkeypatch):
+    table = database.tables["employees"]
+    writes = []
+    monkeypatch.setattr(table, "write_entries", lambda entries, write=table.write_entries: (
+        writes.append(len(entries)), write(entries)))
+    db = AsyncDatabase(database)
+
+    async def main():
+        await asyncio.gather(*(db.insert("employees", f"{i} Name{i} 30 1000 1") for i in range(20)))
+        await db.insert_many("employees", ["20 Last 30 1000 1"])
+
+    asyncio.run(main())
+    assert writes == [20, 1]
+    with open(temp_employee_file) as f:
+        assert len(f.read().splitlines()) == 22
+
+
+def test_failed_insert_does_not_affect_batch(database):
+    db = AsyncDatabase(database)
+
+    async def main():
+        return await asyncio.gather(db.insert("departments", "1 Security"), db.insert("departments", "1 Sales"),
+                                    db.insert("departments", "2 Sales"), db.insert("missing", "1"),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert results[0] is None and results[2] is None
+    assert str(results[1]) == "Entry with id = 1 already exists."
+    assert str(results[3]) == "Table missing does not exist."
+    assert [entry["department_name"] for entry in database.tables["departments"].data] == ["Security", "Sales"]
+
+
+def test_failed_flush_fails_whole_batch(database, monkeypatch):
+    def fail(entries):
+        raise OSError("disk full")
+    monkeypatch.setattr(database.tables["departments"], "write_entries", fail)
+    db = AsyncDatabase(database)
+    with pytest.raises(OSError):
+        asyncio.run(db.insert("departments", "1 Security"))
+    assert len(database.tables["departments"].data) == 0
+
+
+def test_cancelled_insert_is_skipped(database):
+    db = AsyncDatabase(database)
+
+    async def main():
+        cancelled = asyncio.ensure_future(db.insert("departments", "1 Security"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await db.insert("departments", "2 Sales")
+
+    asyncio.run(main())
+    assert len(database.tables["departments"].data) == 2
+
+
+def test_async_insert_into_temporary_table(database):
+    database.register_table("temporary", TemporaryTable([{"id": "1", "name": "Alice"}]))
+    asyncio.run(AsyncDatabase(database).insert("temporary", "2 Bob"))
+    assert database.select("temporary", "name", "Bob") == [{"id": "2", "name": "Bob"}]
+
+
+def test_async_queries(database):
+    database.insert_many("departments", ["1 Security", "2 Sales"])
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 3000 2"])
+    db = AsyncDatabase(database)
+    db.SCAN_CHUNK = 1
+
+    async def main():
+        return (await db.select("departments", "Sales"),
+                await db.join("employees", "departments", "department_id"),
+                await db.aggregate("employees", "salary", functions=("SUM",)),
+                await db.sql("SELECT name FROM employees WHERE age > 35"),
+                [entry["id"] async for entry in db.scan("employees", from_file=True)])
+
+    select, join, aggregate, sql, scan = asyncio.run(main())
+    assert select == [{"id": 2, "department_name": "Sales"}]
+    assert len(join) == 2
+    assert aggregate == {"SUM": 4000.0}
+    assert sql == [{"name": "Bob"}]
+    assert scan == [1, 2]
+
+
+def test_async_load_and_save(database):
+    db = AsyncDatabase(database)
+    database.insert("departments", "1 Security")
+
+    async def main():
+        await db.save("departments")
+        await db.load("departments")
+
+    asyncio.run(main())
+    assert database.tables["departments"].find_id(1)["department_name"] == "Security"
+    with pytest.raises(ValueError, match="Table missing does not exist."):
+        asyncio.run(db.load("missing"))
+    assert AsyncDatabase().database is database
@@ -0,0 +1,66 @@
+from database.cache import QueryCache
+
+
+class FakeTable:
+    def __init__(self):
+        self.generation = 1
+
+
+def test_cache_hits_until_table_changes():
+    cache = QueryCache()
+    table = FakeTable()
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)  # noqa: E731
+    assert cache.get_or_compute(("q",), (table,), compute) == 1
+    assert cache.get_or_compute(("q",), (table,), compute) == 1
+    table.generation = 2
+    assert cache.get_or_compute(("q",), (table,), compute) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 1, "max_size": 128}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QueryCache(max_size=2)
+    table = FakeTable()
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_compute(key, (table,), lambda key=key: key)
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_unhashable_arguments_are_not_cached():
+    cache = QueryCache()
+    assert cache.get_or_compute(("q", [1]), (FakeTable(),), lambda: 5) == 5
+    assert cache.stats()["size"] == 0
+
+
+def test_database_cache_invalidated_by_insert(database):
+    database.insert_many("bonuses", ["1 1 10.02.2025 5000", "2 2 10.02.2025 1000"])
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 2"])
+    database.insert("departments", "1 Sales")
+    hits = database.cache.hits
+    first = database.aggregate("bonuses", "amount")
+    assert database.aggregate("bonuses", "amount") == first
+    join = database.join("employees", "departments", "department_id", strict=False)
+    assert database.join("employees", "departments", "department_id", strict=False) == join
+    assert database.select("employees", 1, 1) == database.select("employees", 1, 1)
+    assert database.cache.hits == hits + 3
+
+    database.insert("bonuses", "3 1 11.02.2025 500")
+    assert database.aggregate("bonuses", "amount")["SUM"] == 6500.0
+    database.insert("departments", "2 IT")
+    assert len(database.join("employees", "departments", "department_id", strict=False)) == 2
+
+
+def test_cached_results_are_copies(database):
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 2"])
+    database.insert_many("departments", ["1 Sales", "2 IT"])
+    hits = database.cache.hits
+    database.select("employees", 1, 2).append({"id": 3})
+    assert len(database.select("employees", 1, 2)) == 2
+    database.join("employees", "departments", "department_id")[0]["name"] = "HACK"
+    assert database.join("employees", "departments", "department_id")[0]["name"] == "Alice"
+    database.aggregate("employees", "salary", group_by="department_id")[1]["SUM"] = 0
+    assert database.aggregate("employees", "salary", group_by="department_id")[1]["SUM"] == 1000.0
+    assert database.cache.hits == hits + 3
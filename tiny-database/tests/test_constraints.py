@@ -0,0 +1,67 @@
+import pytest
+
+from database.database import EmployeeTable, Table
+from database.schema import DATE, INT, STR
+
+
+class AssignmentTable(Table):
+    """ Назначения сотрудников в подразделения: составной первичный ключ и уникальный код. """
+    ATTRS = ('employee_id', 'department_id', 'code', 'start')
+    PRIMARY_KEY = ('employee_id', 'department_id')
+    UNIQUE = ('code', ('department_id', 'start'))
+    FIELD_TYPES = {'employee_id': INT, 'department_id': INT, 'code': STR, 'start': DATE}
+
+    def insert(self, data):
+        entry = self.make_entry(data)
+        self.add_entry(entry)
+        self.write_entries([entry])
+
+    def select(self, code):
+        return self.select_equal('code', code)
+
+
+@pytest.fixture
+def assignment_table(tmp_path):
+    table = AssignmentTable()
+    table.FILE_PATH = str(tmp_path / "assignment_table.csv")
+    table.insert("1 1 A1 01.01.2025")
+    table.insert("1 2 A2 01.01.2025")
+    return table
+
+
+def test_composite_primary_key(assignment_table):
+    with pytest.raises(ValueError, match=r"Entry with \(employee_id, department_id\) = \(1, 2\) already exists."):
+        assignment_table.insert("1 2 A3 02.01.2025")
+    assert assignment_table.find_id((1, 2))["code"] == "A2"
+    assert assignment_table.find_id(("1", "1"))["code"] == "A1"
+    assert assignment_table.find_id((2, 1)) is None
+    assert assignment_table.find_id(("x", 1)) is None
+
+
+def test_unique_constraints(assignment_table):
+    with pytest.raises(ValueError, match="Entry with code = A1 already exists."):
+        assignment_table.insert("2 3 A1 01.01.2025")
+    with pytest.raises(ValueError, match=r"Entry with \(department_id, start\) = \(1, 01.01.2025\) already exists."):
+        assignment_table.insert("2 1 B1 01.01.2025")
+    with pytest.raises(ValueError, match="Entry with code = B1 already exists."):
+        assignment_table.insert_many(["2 3 B1 01.01.2025", "3 3 B1 02.01.2025"])
+    assert len(assignment_table.data) == 2
+    # Уникальный индекс ограничения используется для поиска по полю
+    assert assignment_table.get_index('code') is assignment_table.constraints[1].index
+    assert assignment_table.select("A2")[0]["department_id"] == 2
+
+
+def test_constraints_checked_on_load(assignment_table):
+    with open(assignment_table.FILE_PATH, 'a') as f:
+        f.write("5,5,A1,03.01.2025\n")
+    with pytest.raises(ValueError, match="Entry with code = A1 already exists."):
+        assignment_table.load()
+
+
+def test_employee_composite_key(temp_employee_file):
+    employee_table = EmployeeTable()
+    employee_table.FILE_PATH = temp_employee_file
+    employee_table.insert("1 Alice 30 1000 1")
+    assert [constraint.name for constraint in employee_table.constraints] == ["id", "(id, department_id)"]
+    with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
+        employee_table.insert("1 Alice 30 1000 2")
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from database.cursor import Cursor
+
+EMPLOYEES = [{'id': 1, 'name': 'Alice', 'salary': 70000.0, 'department_id': 1},
+             {'id': 2, 'name': 'Bob', 'salary': 60000.0, 'department_id': 2},
+             {'id': 3, 'name': 'Carol', 'salary': 80000.0, 'department_id': 1}]
+DEPARTMENTS = [{'id': 1, 'department_name': 'Security'}]
+
+
+def test_cursor_filter_project_limit():
+    cursor = Cursor(EMPLOYEES).filter(lambda entry: entry['salary'] > 65000).project('name').limit(1)
+    assert cursor.fetch() == [{'name': 'Alice'}]
+    assert Cursor(EMPLOYEES).where(department_id=2).first() == EMPLOYEES[1]
+    assert Cursor([]).first() is None
+
+
+def test_cursor_is_lazy():
+    def rows():
+        yield EMPLOYEES[0]
+        raise AssertionError("read past the first row")
+    assert Cursor(rows()).project('name').first() == {'name': 'Alice'}
+
+
+def test_cursor_join():
+    result = Cursor(EMPLOYEES).join(DEPARTMENTS, 'department_id').project('name', 'department_name').fetch()
+    assert result == [{'name': 'Alice', 'department_name': 'Security'}, {'name': 'Carol', 'department_name': 'Security'}]
+    result = Cursor(EMPLOYEES).join(DEPARTMENTS, 'department_id', how="left",
+                                    right_attrs=('id', 'department_name')).fetch()
+    assert result[1]['department_name'] is None
+    with pytest.raises(ValueError, match="Unknown join type outer."):
+        Cursor(EMPLOYEES).join(DEPARTMENTS, 'department_id', how="outer")
+
+
+def test_cursor_aggregate():
+    assert Cursor(EMPLOYEES).aggregate('salary', functions=("SUM",)) == {'SUM': 210000.0}
+    assert Cursor(EMPLOYEES).aggregate('salary', group_by='department_id', functions=("COUNT",)) == {
+        1: {'COUNT': 2}, 2: {'COUNT': 1}}
+
+
+def test_table_scan_from_memory_and_file(database):
+    database.insert_many("bonuses", ["1 1 10.02.2025 5000", "2 2 11.02.2025 3000"])
+    from_memory = database.scan("bonuses").fetch()
+    assert from_memory == database.scan("bonuses", from_file=True).fetch()
+    assert from_memory[0]['date'] == date(2025, 2, 10)
+    joined = database.scan("bonuses", from_file=True).join(database.scan("employees"), 'employee_id').fetch()
+    assert joined == []
+    with pytest.raises(ValueError, match="Table abc does not exist."):
+        database.scan("abc")
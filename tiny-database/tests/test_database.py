@@ -1,59 +1,8 @@
 import pytest
 import os
-import tempfile
-from database.database import Database, EmployeeTable, DepartmentTable, BonusTable, TemporaryTable
-
-
-@pytest.fixture
-def temp_employee_file():
-    """ Создаем временный файл для таблицы рабочих """
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-    yield temp_file.name
-    try:
-        os.remove(temp_file.name)  # Удаляем временный файл после завершения теста
-    except Exception as e:
-        print(f"Ошибка при удалении файла: {e}")
-
-
-@pytest.fixture
-def temp_department_file():
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-    yield temp_file.name
-    try:
-        os.remove(temp_file.name)  # Удаляем временный файл после завершения теста
-    except Exception as e:
-        print(f"Ошибка при удалении файла: {e}")
-
-
-@pytest.fixture
-def temp_bonus_file():
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-    yield temp_file.name
-    try:
-        os.remove(temp_file.name)  # Удаляем временный файл после завершения теста
-    except Exception as e:
-        print(f"Ошибка при удалении файла: {e}")
-
-
-# Пример, как используются фикстуры
-@pytest.fixture
-def database(temp_employee_file, temp_department_file, temp_bonus_file):
-    """ Данная фикстура задает БД и определяет таблицы. """
-    db = Database()
-
-    # Используем временные файлы для тестирования файлового ввода-вывода в EmployeeTable и DepartmentTable
-    employee_table = EmployeeTable()
-    employee_table.FILE_PATH = temp_employee_file
-    department_table = DepartmentTable()
-    department_table.FILE_PATH = temp_department_file
-    bonus_table = BonusTable()
-    bonus_table.FILE_PATH = temp_bonus_file
-
-    db.register_table("employees", employee_table)
-    db.register_table("departments", department_table)
-    db.register_table("bonuses", bonus_table)
-
-    return db
+from datetime import date
+from database.database import EmployeeTable, DepartmentTable, BonusTable, Table, TemporaryTable
+from database.schema import FLOAT, INT, STR
 
 
 def test_insert_employee(database):
@@ -64,8 +13,8 @@ def test_insert_employee(database):
     employee_data = database.select("employees", 1, 2)
     print(employee_data)
     assert len(employee_data) == 2
-    assert employee_data[0] == {'id': '1', 'name': 'Alice', 'age': '30', 'salary': '70000', "department_id": "1"}
-    assert employee_data[1] == {'id': '2', 'name': 'Bob', 'age': '28', 'salary': '60000', "department_id": "2"}
+    assert employee_data[0] == {'id': 1, 'name': 'Alice', 'age': 30, 'salary': 70000.0, "department_id": 1}
+    assert employee_data[1] == {'id': 2, 'name': 'Bob', 'age': 28, 'salary': 60000.0, "department_id": 2}
 
 
 def test_insert_department(database):
@@ -76,12 +25,12 @@ def test_insert_department(database):
     # Проверяем вставку, подгружая с CSV
     department_data = database.select("departments", "Security")
     assert len(department_data) == 2
-    assert department_data[0] == {'id': '1', 'department_name': "Security"}
-    assert department_data[1] == {'id': '3', 'department_name': "Security"}
+    assert department_data[0] == {'id': 1, 'department_name': "Security"}
+    assert department_data[1] == {'id': 3, 'department_name': "Security"}
 
     department_data = database.select("departments", "Engineering")
     assert len(department_data) == 1
-    assert department_data[0] == {'id': '2', 'department_name': "Engineering"}
+    assert department_data[0] == {'id': 2, 'department_name': "Engineering"}
     department_data = database.select("departments", "abc")
     assert len(department_data) == 0
 
@@ -96,9 +45,9 @@ def test_join_employees_departments(database):
     employee_data = database.join("employees", "departments", "department_id")
 
     assert len(employee_data) == 2
-    assert employee_data[0] == {'id': '1', 'name': 'Alice', 'age': '30', 'salary': '70000', "department_id": "1",
+    assert employee_data[0] == {'id': 1, 'name': 'Alice', 'age': 30, 'salary': 70000.0, "department_id": 1,
                                 'department_name': "Security"}
-    assert employee_data[1] == {'id': '2', 'name': 'Bob', 'age': '28', 'salary': '60000', "department_id": "2",
+    assert employee_data[1] == {'id': 2, 'name': 'Bob', 'age': 28, 'salary': 60000.0, "department_id": 2,
                                 'department_name': "Engineering"}
 
 
@@ -108,11 +57,11 @@ def test_insert_bonus(database):
 
     bonus_data = database.select("bonuses", 1)
     assert len(bonus_data) == 1
-    assert bonus_data[0] == {'id': '1', 'employee_id': '1', 'date': '10.02.2025', 'amount': '5000'}
+    assert bonus_data[0] == {'id': 1, 'employee_id': 1, 'date': date(2025, 2, 10), 'amount': 5000.0}
 
     bonus_data = database.select("bonuses", 3)
     assert len(bonus_data) == 1
-    assert bonus_data[0] == {'id': '2', 'employee_id': '3', 'date': '11.03.2024', 'amount': '10000'}
+    assert bonus_data[0] == {'id': 2, 'employee_id': 3, 'date': date(2024, 3, 11), 'amount': 10000.0}
 
     bonus_data = database.select("bonuses", 2)
     assert len(bonus_data) == 0
@@ -180,21 +129,31 @@ def test_table2_entry_nonexistent(database):
 
 
 def test_invalid_aggregate(database):
-    database.insert("employees", "1 Alice a 70000 1")
+    with pytest.raises(ValueError, match="Field age must be int."):
+        database.insert("employees", "1 Alice a 70000 1")
     database.insert("employees", "2 Bob 28 60000 2")
     with pytest.raises(ValueError, match="Field must contain numbers"):
-        database.aggregate("employees", "age")
+        database.aggregate("employees", "date")
 
 
 def test_invalid_aggregate_2(database):
     database.insert("employees", "1 Alice 30 70000 1")
-    database.insert("employees", "2 Bob b 60000 2")
+    with pytest.raises(ValueError, match="Field age must be int."):
+        database.insert("employees", "2 Bob b 60000 2")
+    assert database.aggregate("employees", "age")["COUNT"] == 1
+    database.insert("bonuses", "1 1 10.02.2025 5000")
     with pytest.raises(ValueError, match="Field must contain numbers"):
-        database.aggregate("employees", "age")
+        database.aggregate("bonuses", "date")
+
+
+def test_insert_date_of_wrong_type(database):
+    with pytest.raises(ValueError, match="Field date must be date."):
+        database.insert_many("bonuses", [(1, 2, 5, 100)])
+    assert database.tables["bonuses"].select_equal("date", 5) == []
 
 
 def test_invalid_insert(database):
-    database.insert("employees", "1 Alice a 70000 1")
+    database.insert("employees", "1 Alice 30 70000 1")
     with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
         database.insert("employees", "1 Bob 28 60000 2")
 
@@ -223,8 +182,8 @@ def test_employee_table_select_range(database):
     database.insert("employees", "7 Heidi 28 65000 1")
     selected_employees = database.select("employees", 5, 6)
     assert len(selected_employees) == 2
-    assert selected_employees[0] == {'id': '5', 'name': 'Frank', 'age': '40', 'salary': '90000', "department_id": "1"}
-    assert selected_employees[1] == {'id': '6', 'name': 'Grace', 'age': '32', 'salary': '75000', "department_id": "2"}
+    assert selected_employees[0] == {'id': 5, 'name': 'Frank', 'age': 40, 'salary': 90000.0, "department_id": 1}
+    assert selected_employees[1] == {'id': 6, 'name': 'Grace', 'age': 32, 'salary': 75000.0, "department_id": 2}
 
 
 def test_department_table_save_load(database, temp_department_file):
@@ -238,8 +197,8 @@ def test_department_table_save_load(database, temp_department_file):
     new_department_table.FILE_PATH = temp_department_file
     new_department_table.load()
     assert len(new_department_table.data) == 2
-    assert new_department_table.data[0] == {'id': '8', 'department_name': 'R&D'}
-    assert new_department_table.data[1] == {'id': '9', 'department_name': 'QA'}
+    assert new_department_table.data[0] == {'id': 8, 'department_name': 'R&D'}
+    assert new_department_table.data[1] == {'id': 9, 'department_name': 'QA'}
 
 
 def test_employee_table_save_load(database, temp_employee_file):
@@ -252,10 +211,10 @@ def test_employee_table_save_load(database, temp_employee_file):
     new_employee_table.FILE_PATH = temp_employee_file
     new_employee_table.load()
     assert len(new_employee_table.data) == 2
-    assert new_employee_table.data[0] == {'id': '8', 'name': 'John', 'age': '40', 'salary': '90000',
-                                          "department_id": "3"}
-    assert new_employee_table.data[1] == {'id': '9', 'name': 'Alex', 'age': '32', 'salary': '75000',
-                                          "department_id": "2"}
+    assert new_employee_table.data[0] == {'id': 8, 'name': 'John', 'age': 40, 'salary': 90000.0,
+                                          "department_id": 3}
+    assert new_employee_table.data[1] == {'id': 9, 'name': 'Alex', 'age': 32, 'salary': 75000.0,
+                                          "department_id": 2}
 
 
 def test_bonus_table_save_load(database, temp_bonus_file):
@@ -268,8 +227,8 @@ def test_bonus_table_save_load(database, temp_bonus_file):
     new_bonus_table.FILE_PATH = temp_bonus_file
     new_bonus_table.load()
     assert len(new_bonus_table.data) == 2
-    assert new_bonus_table.data[0] == {'id': '5', 'employee_id': '10', 'date': '15.07.2024', 'amount': '8000'}
-    assert new_bonus_table.data[1] == {'id': '6', 'employee_id': '11', 'date': '16.08.2024', 'amount': '9000'}
+    assert new_bonus_table.data[0] == {'id': 5, 'employee_id': 10, 'date': date(2024, 7, 15), 'amount': 8000.0}
+    assert new_bonus_table.data[1] == {'id': 6, 'employee_id': 11, 'date': date(2024, 8, 16), 'amount': 9000.0}
 
 
 def test_temp_employee_file_fixture(temp_employee_file):
@@ -337,6 +296,15 @@ def test_temporary_table_select():
     assert result[0] == {'id': '1', 'name': 'Alice', 'age': '30'}
 
 
+def test_temporary_table_fields_from_all_rows():
+    data = [{'id': '1', 'name': 'Alice'}, {'id': '2', 'age': '28'}, {'name': 'Carol', 'id': '3'}]
+    temp_table = TemporaryTable(data)
+    assert temp_table.ATTRS == ['id', 'name', 'age']
+    assert temp_table.data[1] == {'id': '2', 'name': None, 'age': '28'}
+    assert temp_table.select("age", None) == [{'id': '1', 'name': 'Alice', 'age': None},
+                                              {'id': '3', 'name': 'Carol', 'age': None}]
+
+
 def test_temporary_table_insert():
     temp_table = TemporaryTable([])
     temp_table.insert("1 A 25")
@@ -349,3 +317,121 @@ def test_temporary_table_insert_duplicate_id():
     temp_table = TemporaryTable(data)
     with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
         temp_table.insert("1 Anna 25")
+
+
+def test_insert_many(database, temp_bonus_file):
+    database.insert_many("bonuses", ["1 1 10.02.2025 5000", ("2", "3", "11.03.2024", 10000)])
+    assert database.select("bonuses", 3) == [{'id': 2, 'employee_id': 3, 'date': date(2024, 3, 11), 'amount': 10000.0}]
+    new_bonus_table = BonusTable()
+    new_bonus_table.FILE_PATH = temp_bonus_file
+    new_bonus_table.load()
+    assert len(new_bonus_table.data) == 2
+
+
+def test_insert_many_duplicate_in_batch(database):
+    with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
+        database.insert_many("departments", ["1 Security", "2 QA", "1 Sales"])
+    assert database.tables["departments"].data == []
+    assert database.tables["departments"].find_id("2") is None
+
+
+def test_insert_many_duplicate_existing(database):
+    database.insert("departments", "2 QA")
+    with pytest.raises(ValueError, match="Entry with id = 2 already exists."):
+        database.insert_many("departments", ["1 Security", "2 Sales"])
+    assert database.tables["departments"].data == [{'id': 2, 'department_name': 'QA'}]
+
+
+def test_insert_many_nonexistent_table(database):
+    with pytest.raises(ValueError, match="Table non_existent_table does not exist."):
+        database.insert_many("non_existent_table", ["1 John 30 50000"])
+
+
+def test_temporary_table_from_one_to_many_join(database):
+    database.insert("departments", "1 Security")
+    database.insert_many("employees", ["1 Alice 30 70000 1", "2 Bob 28 60000 1"])
+    temp_table = TemporaryTable(database.join("departments", "employees", "id", "department_id"))
+    assert [entry["name"] for entry in temp_table.select("id", 1)] == ["Alice", "Bob"]
+    assert temp_table.find_id(1)["name"] == "Alice"
+
+    temp_table = TemporaryTable([{"id": "1", "name": "Alice"}, {"id": "1", "name": "Bob"}])
+    with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
+        temp_table.insert("1 Carol")
+
+
+def test_temporary_table_without_id():
+    temp_table = TemporaryTable([{"name": "Alice"}, {"name": "Bob"}])
+    assert temp_table.pk_index is None
+    assert temp_table.select("name", "Bob") == [{"name": "Bob"}]
+
+
+def test_temporary_table_insert_many():
+    temp_table = TemporaryTable([])
+    temp_table.insert_many([("1", "A", 25), "2 B 30"])
+    assert temp_table.data == [{'id': '1', 'field1': 'A', 'field2': '25'},
+                               {'id': '2', 'field1': 'B', 'field2': '30'}]
+
+
+def test_join_does_not_modify_table(database):
+    database.insert("employees", "1 Alice 30 70000 1")
+    database.insert("departments", "1 Security")
+    database.join("employees", "departments", "department_id")
+    assert database.tables["employees"].data == [{'id': 1, 'name': 'Alice', 'age': 30, 'salary': 70000.0,
+                                                  "department_id": 1}]
+
+
+def test_left_join_on_column_pair(database):
+    database.insert("departments", "1 Security")
+    database.insert("departments", "2 Engineering")
+    database.insert("employees", "1 Alice 30 70000 1")
+    join_data = database.join("departments", "employees", "id", "department_id", how="left", algorithm="merge")
+    assert join_data == [{'id': 1, 'department_name': 'Security', 'name': 'Alice', 'age': 30, 'salary': 70000.0},
+                         {'id': 2, 'department_name': 'Engineering', 'name': None, 'age': None, 'salary': None}]
+
+
+def test_join_unknown_algorithm(database):
+    with pytest.raises(ValueError, match="Unknown join algorithm nested."):
+        database.join("employees", "departments", "department_id", algorithm="nested")
+
+
+def test_insert_wrong_number_of_values(database):
+    with pytest.raises(ValueError, match="Expected 2 values, got 3."):
+        database.insert("departments", "1 Security Extra")
+
+
+def test_typed_values_round_trip(database, temp_bonus_file):
+    database.insert_many("bonuses", [(1, 2, date(2025, 2, 10), 5000.5)])
+    with open(database.tables["bonuses"].storage.partition_path("2025-02")) as f:
+        assert f.read().splitlines() == ["id,employee_id,date,amount", "1,2,10.02.2025,5000.5"]
+    assert database.tables["bonuses"].find_id("1")["date"] == date(2025, 2, 10)
+    assert database.tables["bonuses"].data[-1]["amount"] == 5000.5
+    assert database.tables["bonuses"].data[0:1] == [database.tables["bonuses"].data[0]]
+
+
+def test_select_missing_table(database):
+    assert database.select("missing", 1) is None
+
+
+def test_schema_declared_table(tmp_path):
+    class ProjectTable(Table):
+        FILE_PATH = str(tmp_path / "projects.csv")
+        COLUMNS = {'id': INT, 'title': STR, 'budget': FLOAT}
+        INDEXES = {"title": "hash"}
+
+        def select(self, title):
+            return self.select_equal('title', title)
+
+    assert ProjectTable.ATTRS == ('id', 'title', 'budget')
+    table = ProjectTable()
+    table.insert("1 Apollo 100.5")
+    assert table.select("Apollo") == [{'id': 1, 'title': 'Apollo', 'budget': 100.5}]
+    with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
+        table.insert("1 Gemini 7")
+    table.load()
+    assert table.find_id("1")["budget"] == 100.5
+
+
+def test_temporary_table_column_store():
+    temp_table = TemporaryTable([{"id": 1, "value": "7"}, {"id": 2, "value": "3"}])
+    assert temp_table.column("value") == ["7", "3"]
+    assert temp_table.find_id(2) == {"id": 2, "value": "3"}
@@ -0,0 +1,130 @@
+import pytest
+
+from database.database import BonusTable, DepartmentTable, TemporaryTable
+from database.index import HashIndex, SortedIndex
+
+
+def test_hash_index_build_and_get():
+    index = HashIndex("id", unique=True)
+    index.build(['1', '2'])
+    assert len(index) == 2
+    assert "1" in index
+    assert index.get("2") == 1
+    assert index.get("3") is None
+    assert index.lookup("3") == []
+
+
+def test_hash_index_keeps_first_duplicate():
+    index = HashIndex("id", unique=True)
+    index.build([1, 1])
+    assert index.lookup(1) == [0]
+
+
+def test_table_index_built_on_load(tmp_path):
+    file_path = tmp_path / "department_table.csv"
+    file_path.write_text("id,department_name\n1,Security\n2,QA\n")
+    department_table = DepartmentTable()
+    department_table.FILE_PATH = str(file_path)
+    department_table.load()
+    assert department_table.find_id(2) == {'id': 2, 'department_name': 'QA'}
+    assert department_table.find_id('2') == {'id': 2, 'department_name': 'QA'}
+    assert department_table.find_id('abc') is None
+    assert len(department_table.pk_index) == 2
+
+
+def test_table_index_updated_on_insert():
+    temp_table = TemporaryTable([])
+    temp_table.insert("1 A 25")
+    temp_table.insert("2 B 30")
+    assert temp_table.find_id('2') == {'id': '2', 'field1': 'B', 'field2': '30'}
+
+
+def test_sorted_index_lookup():
+    index = SortedIndex("department_id")
+    index.build([2, 1])
+    index.add(2, 2)
+    assert index.lookup(2) == [0, 2]
+    assert index.lookup(5) == []
+    assert 1 in index
+    assert 0 not in index
+    assert 9 not in index
+    assert len(index) == 3
+
+
+def test_non_unique_hash_index():
+    index = HashIndex("department_id")
+    index.build([2, 2])
+    assert index.lookup(2) == [0, 1]
+    assert index.lookup(3) == []
+
+
+def test_create_index(database):
+    database.insert("employees", "1 Alice 30 70000 1")
+    index = database.create_index("employees", "salary", "sorted")
+    database.insert("employees", "2 Bob 28 60000 2")
+    assert index.lookup(60000.0) == [1]
+    assert database.tables["employees"].select_equal('salary', '70000')[0]['name'] == 'Alice'
+    assert database.tables["employees"].select_equal('age', '28')[0]['name'] == 'Bob'
+
+
+def test_create_index_errors(database):
+    with pytest.raises(ValueError, match="Field abc does not exist."):
+        database.create_index("employees", "abc")
+    with pytest.raises(ValueError, match="Unknown index kind btree."):
+        database.create_index("employees", "salary", "btree")
+    with pytest.raises(ValueError, match="Table abc does not exist."):
+        database.create_index("abc", "salary")
+
+
+def test_indexes_rebuilt_on_load(tmp_path):
+    file_path = tmp_path / "bonus_table.csv"
+    file_path.write_text("id,employee_id,date,amount\n1,7,10.02.2025,5000\n2,7,11.02.2025,6000\n")
+    bonus_table = BonusTable()
+    bonus_table.FILE_PATH = str(file_path)
+    bonus_table.load()
+    assert bonus_table.get_index('employee_id').lookup(7) == [0, 1]
+    assert [entry['id'] for entry in bonus_table.select(7)] == [1, 2]
+
+
+def test_join_uses_index(database):
+    database.insert("employees", "1 Alice 30 70000 1")
+    database.insert("employees", "2 Bob 28 60000 1")
+    database.insert("departments", "1 Security")
+    join_data = database.join("departments", "employees", "id", "department_id")
+    assert [entry['name'] for entry in join_data] == ['Alice', 'Bob']
+
+
+def test_sorted_index_range():
+    index = SortedIndex("id")
+    index.build([10, 9, 100])
+    index.add(50, 3)
+    assert index.range(9, 50) == [1, 0, 3]
+    assert index.range(low=11) == [3, 2]
+    assert index.range(high=9) == [1]
+    assert list(index) == [1, 0, 3, 2]
+
+
+def test_employee_select_uses_sorted_index(database):
+    database.insert("employees", "10 Alice 30 70000 1")
+    database.insert("employees", "9 Bob 28 60000 2")
+    database.insert("employees", "100 Carol 35 80000 2")
+    employee_table = database.tables["employees"]
+    assert isinstance(employee_table.get_index('department_id'), HashIndex)
+    assert [entry['name'] for entry in database.select("employees", 9, 10)] == ['Bob', 'Alice']
+    assert [entry['name'] for entry in employee_table.sorted_by('id')] == ['Bob', 'Alice', 'Carol']
+
+
+def test_select_range_without_sorted_index(database):
+    database.insert("employees", "1 Alice 30 70000 1")
+    database.insert("employees", "2 Bob 28 60000 2")
+    employee_table = database.tables["employees"]
+    assert [entry['name'] for entry in employee_table.select_range('age', '28', '29')] == ['Bob']
+    assert [entry['name'] for entry in employee_table.sorted_by('age')] == ['Bob', 'Alice']
+    assert [entry['name'] for entry in employee_table.select_equal('age', 30)] == ['Alice']
+
+
+def test_invalid_value_rejected(database):
+    with pytest.raises(ValueError, match="Field id must be int."):
+        database.insert("employees", "abc Alice 30 70000 1")
+    assert database.tables["employees"].data == []
+    assert database.tables["employees"].find_id('abc') is None
@@ -0,0 +1,74 @@
+import pytest
+
+from database.join import hash_join, merge_join
+
+EMPLOYEES = [{'id': '1', 'name': 'Alice', 'department_id': '2'},
+             {'id': '2', 'name': 'Bob', 'department_id': '1'},
+             {'id': '3', 'name': 'Carol', 'department_id': '3'}]
+DEPARTMENTS = [{'id': '1', 'department_name': 'Security'},
+               {'id': '2', 'department_name': 'Engineering'}]
+
+
+@pytest.mark.parametrize("join_rows", [hash_join, merge_join])
+def test_inner_join_drops_unmatched(join_rows):
+    result = join_rows(EMPLOYEES, DEPARTMENTS, "department_id")
+    assert sorted(entry['name'] for entry in result) == ['Alice', 'Bob']
+
+
+@pytest.mark.parametrize("join_rows", [hash_join, merge_join])
+def test_left_join_fills_none(join_rows):
+    result = join_rows(EMPLOYEES, DEPARTMENTS, "department_id", how="left",
+                       right_attrs=('id', 'department_name'))
+    carol = [entry for entry in result if entry['name'] == 'Carol'][0]
+    assert carol == {'id': '3', 'name': 'Carol', 'department_id': '3', 'department_name': None}
+
+
+@pytest.mark.parametrize("join_rows", [hash_join, merge_join])
+def test_strict_join_raises(join_rows):
+    with pytest.raises(ValueError, match="department_id = 3 does not exist."):
+        join_rows(EMPLOYEES, DEPARTMENTS, "department_id", strict=True)
+
+
+@pytest.mark.parametrize("join_rows", [hash_join, merge_join])
+def test_join_unknown_type(join_rows):
+    with pytest.raises(ValueError, match="Unknown join type outer."):
+        join_rows(EMPLOYEES, DEPARTMENTS, "department_id", how="outer")
+
+
+def test_hash_join_builds_on_smaller_left_side():
+    result = hash_join(DEPARTMENTS, EMPLOYEES, "id", "department_id")
+    assert result == [{'id': '1', 'department_name': 'Security', 'name': 'Bob'},
+                      {'id': '2', 'department_name': 'Engineering', 'name': 'Alice'}]
+    assert hash_join(DEPARTMENTS, EMPLOYEES, "id", "department_id", strict=True) == result
+    departments = DEPARTMENTS + [{'id': '4', 'department_name': 'Sales'}, {'id': '5', 'department_name': 'IT'}]
+    with pytest.raises(ValueError, match="id = 4 does not exist."):
+        hash_join(departments, EMPLOYEES + EMPLOYEES, "id", "department_id", strict=True)
+
+
+def test_hash_join_many_matches_keep_left_order():
+    bonuses = [{'id': '1', 'employee_id': '2'}, {'id': '2', 'employee_id': '1'}, {'id': '3', 'employee_id': '2'}]
+    result = hash_join(bonuses, EMPLOYEES, "employee_id")
+    assert [entry['id'] for entry in result] == ['1', '2', '3']
+    result = hash_join(EMPLOYEES[:1], bonuses, "id", "employee_id")
+    assert result == [{'id': '1', 'name': 'Alice', 'department_id': '2'}]
+
+
+def test_hash_join_lookup_does_not_read_right_side():
+    class Unreadable:
+        def __iter__(self):
+            raise AssertionError("right side must not be read")
+    lookup = {department['id']: [department] for department in DEPARTMENTS}.get
+    result = hash_join(EMPLOYEES, Unreadable(), "department_id", how="left", right_lookup=lookup)
+    assert [entry.get('department_name') for entry in result] == ['Engineering', 'Security', None]
+
+
+def test_merge_join_sorted_output():
+    result = merge_join(EMPLOYEES, DEPARTMENTS, "department_id")
+    assert [entry['department_id'] for entry in result] == ['1', '2']
+
+
+def test_join_does_not_modify_input():
+    employees = [dict(entry) for entry in EMPLOYEES]
+    hash_join(employees, DEPARTMENTS, "department_id")
+    merge_join(employees, DEPARTMENTS, "department_id")
+    assert employees == EMPLOYEES
@@ -0,0 +1,217 @@
+from array import array
+from contextlib import contextmanager
+import csv
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from database.database import Database, EmployeeTable
+from database.locks import ReadWriteLock, read_locked
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_readers_share_lock():
+    lock = ReadWriteLock()
+    inside = threading.Barrier(3, timeout=5)
+
+    def read(i):
+        with lock.read():
+            inside.wait()  # Все три читателя одновременно внутри блокировки
+
+    run_threads(read, 3)
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = ReadWriteLock()
+    events = []
+    writer_inside = threading.Event()
+
+    def write():
+        with lock.write():
+            writer_inside.set()
+            time.sleep(0.05)
+            events.append("write")
+
+    def read():
+        with lock.read():
+            events.append("read")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    writer_inside.wait()
+    others = [threading.Thread(target=read), threading.Thread(target=write)]
+    for thread in others:
+        thread.start()
+    for thread in [writer] + others:
+        thread.join()
+    assert events[0] == "write" and sorted(events[1:]) == ["read", "write"]
+
+
+def test_tables_locked_in_same_order():
+    class Table:
+        def __init__(self, name):
+            self.name = name
+
+        @contextmanager
+        def reading(self):
+            taken.append(self.name)
+            yield
+
+    a, b = Table("a"), Table("b")
+    orders = []
+    for tables in ((a, b), (b, a, b)):
+        taken = []
+        with read_locked(*tables):
+            orders.append(taken)
+    assert orders[0] == orders[1] and sorted(orders[0]) == ["a", "b"]
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = ReadWriteLock()
+    events = []
+
+    def write():
+        with lock.write():
+            events.append("write")
+
+    def read():
+        with lock.read():
+            events.append("read")
+
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not lock._waiting_writers:
+            time.sleep(0.001)
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.02)
+        assert events == []
+    writer.join()
+    reader.join()
+    assert events == ["write", "read"]
+
+
+def test_singleton_is_thread_safe():
+    Database._instances.pop(Database, None)
+    instances = []
+    run_threads(lambda i: instances.append(Database()), 8)
+    assert len({id(instance) for instance in instances}) == 1
+
+
+def test_concurrent_inserts_and_selects(database):
+    errors = []
+
+    def work(i):
+        try:
+            database.insert("employees", f"{i} Name{i} {20 + i} {1000 + i} 1")
+            assert database.select("employees", i, i)[0]["id"] == i
+            database.aggregate("employees", "salary")
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    run_threads(work, 16)
+    assert errors == []
+    employee_table = database.tables["employees"]
+    assert sorted(employee_table.column("id")) == list(range(16))
+    with open(employee_table.FILE_PATH, newline='') as f:
+        assert len(list(csv.DictReader(f))) == 16
+
+
+def test_duplicate_insert_race(database):
+    errors = []
+
+    def work(i):
+        try:
+            database.insert("employees", "1 Name 30 1000 1")
+        except ValueError as e:
+            errors.append(e)
+
+    run_threads(work, 8)
+    assert len(errors) == 7
+    assert len(database.tables["employees"].data) == 1
+
+
+def test_lazy_load_happens_once(temp_employee_file):
+    employee_table = EmployeeTable()
+    employee_table.FILE_PATH = temp_employee_file
+    loads = []
+    load = employee_table.load
+    employee_table.load = lambda: loads.append(1) or time.sleep(0.02) or load()
+    run_threads(lambda i: employee_table.data, 4)
+    assert loads == [1]
+
+
+def make_shared_table(path, append_only=False):
+    employee_table = EmployeeTable()
+    employee_table.FILE_PATH = path
+    employee_table.SHARED = True
+    employee_table.APPEND_ONLY = append_only
+    return employee_table
+
+
+def insert_from_process(path, first_id, count, append_only):
+    employee_table = make_shared_table(path, append_only)
+    for entry_id in range(first_id, first_id + count):
+        with employee_table.writing():
+            employee_table.insert(f"{entry_id} Name{entry_id} 30 1000 1")
+    employee_table.sync()
+
+
+@pytest.mark.parametrize("append_only", [False, True])
+def test_processes_do_not_lose_inserts(tmp_path, append_only):
+    path = str(tmp_path / "employee_table.csv")
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=insert_from_process, args=(path, i * 100, 20, append_only))
+                 for i in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0, 0, 0]
+    ids = make_shared_table(path).column("id")
+    assert sorted(ids) == [i * 100 + j for i in range(3) for j in range(20)]
+
+
+def test_reader_reloads_only_changed_file(tmp_path):
+    path = str(tmp_path / "employee_table.csv")
+    writer = make_shared_table(path)
+    reader = make_shared_table(path)
+    with reader.reading():
+        assert reader.select(1, 10) == []
+    assert not reader.refresh()
+
+    with writer.writing():
+        writer.insert("1 Alice 30 1000 1")
+    assert reader.changed()
+    with reader.reading():
+        assert [entry["name"] for entry in reader.select(1, 10)] == ["Alice"]
+    assert not reader.changed()
+
+    # Чтение без изменений файла не перечитывает таблицу
+    reader.load = lambda: pytest.fail("table reloaded")
+    with reader.reading():
+        reader.select(1, 10)
+
+
+def test_writer_sees_rows_of_other_writer(tmp_path):
+    path = str(tmp_path / "employee_table.csv")
+    first = make_shared_table(path)
+    second = make_shared_table(path)
+    with first.writing():
+        first.insert("1 Alice 30 1000 1")
+    with second.writing():
+        second.insert("2 Bob 40 2000 1")
+    with first.writing():
+        with pytest.raises(ValueError, match="already exists"):
+            first.insert("2 Bob 40 2000 1")
+    assert make_shared_table(path).column("id") == array('q', [1, 2])
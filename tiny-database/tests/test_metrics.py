@@ -0,0 +1,95 @@
+import pytest
+
+from database.storage import PageStorage
+from database.metrics import Histogram
+
+
+@pytest.fixture
+def metered(database):
+    events = []
+    database.enable_metrics(lambda operation, table_name, seconds: events.append((operation, table_name)))
+    yield database, events
+    database.disable_metrics()
+
+
+def test_histogram_quantiles():
+    histogram = Histogram()
+    for seconds in [0.001] * 98 + [0.2, 20]:
+        histogram.add(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["min"] == 0.001 and snapshot["max"] == 20
+    assert snapshot["p50"] == pytest.approx(0.001)
+    assert snapshot["p99"] == pytest.approx(10 ** -0.5)
+    assert histogram.quantile(1) == 20
+    assert snapshot["buckets"] == [(pytest.approx(0.001), 98), (pytest.approx(10 ** -0.5), 1), (None, 1)]
+
+
+def test_operations_are_timed_and_reported_to_callbacks(metered):
+    database, events = metered
+    database.insert("departments", "1 Security")
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 1"])
+    database.select("departments", "Security")
+    database.join("employees", "departments", "department_id")
+    database.aggregate("employees", "salary")
+    assert ("insert", "departments") in events
+    assert ("load", "employees") in events
+    assert {"insert", "insert_many", "select", "join", "aggregate", "load"} <= set(database.stats()["operations"])
+    employees = database.stats()["tables"]["employees"]
+    assert employees["rows_returned"] == 2
+
+
+def test_index_hit_rate_and_rows_scanned(metered):
+    database, _ = metered
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 2", "3 Carol 50 3000 2"])
+    table = database.tables["employees"]
+    table.select_equal("department_id", 2)
+    table.select_equal("name", "Bob")
+    table.select_range("age", 35, 60)
+    stats = database.stats()["tables"]["employees"]
+    assert stats["index_hits"] == 1 and stats["index_misses"] == 2
+    assert stats["index_hit_rate"] == pytest.approx(1 / 3)
+    assert stats["rows_scanned"] == 2 + 3 + 3
+    assert stats["rows_returned"] == 2 + 1 + 2
+
+
+def test_load_and_save_bytes(metered, temp_department_file):
+    database, _ = metered
+    database.insert("departments", "1 Security")
+    table = database.tables["departments"]
+    table.save()
+    table.compact()
+    table.load()
+    stats = database.stats()["tables"]["departments"]
+    size = len(open(temp_department_file, 'rb').read())
+    assert stats["bytes_written"] == 2 * size
+    assert stats["bytes_read"] == size  # Ленивая загрузка перед вставкой читала пустой файл
+    assert database.stats()["operations"]["save"]["count"] == 1
+    assert database.stats()["operations"]["compact"]["count"] == 1
+
+
+def test_page_storage_size(database, temp_department_file):
+    table = database.tables["departments"]
+    storage = PageStorage(table)
+    assert storage.size() == 0
+    table.insert("1 Security")
+    storage.save()
+    assert storage.size() == PageStorage.PAGE_SIZE * 2
+    storage.close()
+
+
+def test_metrics_disabled_by_default(database):
+    database.insert("departments", "1 Security")
+    assert database.tables["departments"].metrics is None
+    assert set(database.stats()) == {"cache"}
+
+
+def test_unsubscribe_and_register_table(metered):
+    database, events = metered
+    metrics = database.metrics
+    assert database.enable_metrics() is metrics
+    metrics.unsubscribe(metrics.callbacks[0])
+    database.register_table("bonuses", database.tables["bonuses"])
+    database.insert("bonuses", "1 1 10.02.2025 5000")
+    assert events == []
+    assert database.tables["bonuses"].metrics.table_name == "bonuses"
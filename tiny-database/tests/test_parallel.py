@@ -0,0 +1,79 @@
+import pytest
+
+from database.aggregate import Accumulator
+from database.parallel import aggregate_partition
+from database.storage import byte_ranges
+
+
+def fill(database, table_name="employees", count=50):
+    database.insert_many(table_name, [f"{i} Name{i} {20 + i % 30} {1000 + i * 10} {i % 4}" for i in range(count)])
+
+
+def test_accumulator_merge():
+    first, second, empty = Accumulator(), Accumulator(), Accumulator()
+    for value in (3, 1):
+        first.add(value)
+    second.add(5)
+    first.merge(second)
+    first.merge(empty)
+    empty.merge(first)
+    assert empty.result() == {"SUM": 9.0, "COUNT": 3, "MAX": 5.0, "MIN": 1.0, "AVG": 3.0}
+
+
+def test_byte_ranges_split_at_lines(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"header\n" + b"".join(b"%d,row\n" % i for i in range(100)))
+    ranges = byte_ranges(str(path), 7, 4)
+    assert len(ranges) == 4 and ranges[0][0] == 7 and ranges[-1][1] == path.stat().st_size
+    content = path.read_bytes()
+    for start, _end in ranges:
+        assert content[start - 1:start] == b"\n"
+    assert byte_ranges(str(path), 7, 1000)[-1][1] == path.stat().st_size
+
+
+def test_aggregate_partitions(database):
+    fill(database, count=10)
+    scans = database.tables["employees"].storage.split(("department_id", "salary"), 3)
+    assert len(scans) == 3
+    partials = [aggregate_partition(scan, float, True) for scan in scans]
+    assert sum(accumulator.count for accumulators in partials for accumulator in accumulators.values()) == 10
+    assert aggregate_partition(database.tables["employees"].storage.split(("age",), 1)[0], float, False).count == 10
+
+
+@pytest.mark.parametrize("storage, append_only", [("csv", False), ("csv", True), ("pages", False)])
+def test_parallel_aggregate_matches_serial(database, storage, append_only):
+    employee_table = database.tables["employees"]
+    employee_table.STORAGE = storage
+    employee_table.APPEND_ONLY = append_only
+    fill(database)
+    for group_by in (None, "department_id"):
+        expected = database.aggregate("employees", "salary", group_by=group_by)
+        assert database.aggregate("employees", "salary", group_by=group_by, workers=3) == expected
+
+
+def test_parallel_aggregate_errors(database):
+    with pytest.raises(ValueError, match="No data in table employees."):
+        database.aggregate("employees", "salary", workers=2)
+    fill(database, count=3)
+    with pytest.raises(ValueError, match="Field must contain numbers"):
+        database.aggregate("employees", "name", workers=2)
+
+
+@pytest.mark.parametrize("algorithm", ["hash", "merge"])
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_parallel_join_matches_serial(database, algorithm, how):
+    fill(database, count=40)
+    database.insert_many("departments", ["0 Sales", "2 IT", "3 HR"])
+    expected = database.join("employees", "departments", "department_id", how=how, strict=False,
+                             algorithm=algorithm)
+    assert database.join("employees", "departments", "department_id", how=how, strict=False,
+                         algorithm=algorithm, workers=3) == expected
+
+
+def test_parallel_join_errors(database):
+    assert database.join("employees", "departments", "department_id", workers=2) == []
+    fill(database, count=4)
+    with pytest.raises(ValueError, match="department_id = 0 does not exist."):
+        database.join("employees", "departments", "department_id", workers=2)
+    with pytest.raises(ValueError, match="invalid join_attr"):
+        database.join("employees", "departments", "abc", workers=2)
@@ -0,0 +1,158 @@
+import os
+from datetime import date
+
+import pytest
+
+from database.database import BonusTable, DepartmentTable
+from database.partition import DatePartitioning, PartitionIndex, RangePartitioning
+
+BONUSES = ["1 1 10.01.2025 100", "2 2 15.02.2025 200", "3 1 20.02.2025 300", "4 3 01.12.2024 400"]
+
+
+def make_partitioned_table(tmp_path):
+    bonus_table = BonusTable()
+    bonus_table.FILE_PATH = str(tmp_path / "bonus_table.csv")
+    bonus_table.STORAGE = "partitioned"
+    bonus_table.load()
+    return bonus_table
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_date_partitioning():
+    months = DatePartitioning("date")
+    assert months.key(date(2025, 2, 15).toordinal()) == "2025-02"
+    assert months.bounds("2024-12") == (date(2024, 12, 1).toordinal(), date(2025, 1, 1).toordinal())
+    assert months.overlaps("2025-02", low=date(2025, 2, 28).toordinal())
+    assert not months.overlaps("2025-02", high=date(2025, 1, 31).toordinal())
+    years = DatePartitioning("date", "year")
+    assert years.key(date(2025, 2, 15).toordinal()) == "2025"
+    assert years.bounds("2025") == (date(2025, 1, 1).toordinal(), date(2026, 1, 1).toordinal())
+    assert years.order(["2025", "2023", "2024"]) == ["2023", "2024", "2025"]
+    with pytest.raises(ValueError, match="Unknown partition period week."):
+        DatePartitioning("date", "week")
+
+
+def test_range_partitioning():
+    ranges = RangePartitioning("id", 100)
+    assert [ranges.key(value) for value in (0, 99, 100, 250)] == ["0", "0", "1", "2"]
+    assert ranges.bounds("2") == (200, 300)
+    assert ranges.order(["10", "9", "-1"]) == ["-1", "9", "10"]
+    index = PartitionIndex(ranges)
+    index.build([5, 150, 20, 310])
+    assert index.keys(100, 199) == ["1"]
+    assert index.positions(None, 199) == [0, 1, 2]
+    assert len(index) == 3
+
+
+def test_select_prunes_partitions(database):
+    database.insert_many("bonuses", BONUSES)
+    bonus_table = database.tables["bonuses"]
+    database.enable_metrics()
+    try:
+        entries = bonus_table.select_range("date", date(2025, 2, 1), date(2025, 2, 28))
+        assert [entry["id"] for entry in entries] == [2, 3]
+        assert [entry["id"] for entry in bonus_table.select_equal("date", date(2024, 12, 1))] == [4]
+        stats = database.stats()["tables"]["bonuses"]
+        assert stats["rows_scanned"] == 2 + 1
+    finally:
+        database.disable_metrics()
+
+
+def test_query_plans_partition_scan(database):
+    database.insert_many("bonuses", BONUSES)
+    query = database.query("bonuses").where("date", ">=", "01.02.2025").where("date", "<", date(2025, 3, 1))
+    assert query.explain().splitlines()[1].strip() == (
+        "PartitionScan(bonuses.date >= datetime.date(2025, 2, 1) AND date < datetime.date(2025, 3, 1), "
+        "1 of 3 partitions)")
+    assert [entry["id"] for entry in query.fetch()] == [2, 3]
+    total = database.query("bonuses").where("date", "=", "10.01.2025").select("SUM(amount)").fetch()
+    assert total == [{"SUM(amount)": 100.0}]
+    assert "PartitionScan" not in database.query("bonuses").where("date", "!=", "10.01.2025").explain()
+
+
+def test_partitioned_storage_files(tmp_path):
+    bonus_table = make_partitioned_table(tmp_path)
+    for row in BONUSES:
+        bonus_table.insert(row)
+    storage = bonus_table.storage
+    assert storage.keys() == ["2024-12", "2025-01", "2025-02"]
+    assert read_lines(storage.partition_path("2025-02")) == [
+        "id,employee_id,date,amount", "2,2,15.02.2025,200", "3,1,20.02.2025,300"]
+
+    # Вставка трогает только файл своего раздела
+    january = storage.partition_path("2025-01")
+    version = os.stat(january).st_mtime_ns
+    bonus_table.insert("5 2 03.02.2025 500")
+    assert os.stat(january).st_mtime_ns == version
+    assert storage.size() == sum(os.path.getsize(storage.partition_path(key)) for key in storage.keys())
+
+    loaded = make_partitioned_table(tmp_path)
+    assert sorted(entry["id"] for entry in loaded.data) == [1, 2, 3, 4, 5]
+    assert loaded.find_id(5)["date"] == date(2025, 2, 3)
+    assert sorted(storage.scan(("id",), low=date(2025, 2, 1).toordinal())) == [(2,), (3,), (5,)]
+
+
+def test_partitioned_storage_save_removes_empty_partitions(tmp_path):
+    bonus_table = make_partitioned_table(tmp_path)
+    bonus_table.insert_many(BONUSES)
+    path = str(tmp_path / "import.csv")
+    with open(path, 'w') as f:
+        f.write("id,employee_id,date,amount\n1,1,10.01.2025,100\n2,2,15.02.2025,200\n")
+    bonus_table.import_csv(path)
+    bonus_table.sync()
+    assert bonus_table.storage.keys() == ["2025-01", "2025-02"]
+    assert len(read_lines(bonus_table.storage.partition_path("2025-02"))) == 2
+
+
+def test_partitioned_storage_cuts_torn_line(tmp_path):
+    bonus_table = make_partitioned_table(tmp_path)
+    bonus_table.insert_many(BONUSES[:2])
+    with open(bonus_table.storage.partition_path("2025-02"), 'a') as f:
+        f.write("9,9,28.02.20")
+    with open(bonus_table.storage.partition_path("2025-01"), 'w') as f:
+        f.write("id,employee_id")
+    assert [entry["id"] for entry in make_partitioned_table(tmp_path).data] == [2]
+
+
+def test_insert_after_torn_header_writes_header(tmp_path):
+    bonus_table = make_partitioned_table(tmp_path)
+    bonus_table.insert(BONUSES[0])
+    with open(bonus_table.storage.partition_path("2025-01"), 'w') as f:
+        f.write("id,empl")
+    bonus_table = make_partitioned_table(tmp_path)
+    bonus_table.insert(BONUSES[0])
+    assert [entry["id"] for entry in make_partitioned_table(tmp_path).data] == [1]
+
+
+def test_legacy_csv_file_is_migrated(tmp_path):
+    path = tmp_path / "bonus_table.csv"
+    path.write_text("id,employee_id,date,amount\n1,1,10.01.2025,100\n2,2,15.02.2025,200\n")
+    os.makedirs(str(path) + ".parts.tmp")  # Остаток прерванного переноса
+    bonus_table = make_partitioned_table(tmp_path)
+    assert [entry["id"] for entry in bonus_table.data] == [1, 2]
+    assert bonus_table.storage.keys() == ["2025-01", "2025-02"]
+    assert not os.path.exists(str(path) + ".parts.tmp")
+    bonus_table.insert("3 1 20.02.2025 300")
+    assert path.read_text().count("\n") == 3  # Прежний файл не трогается
+    assert [entry["id"] for entry in make_partitioned_table(tmp_path).data] == [1, 2, 3]
+
+
+def test_partitioned_aggregate(database, tmp_path):
+    bonus_table = make_partitioned_table(tmp_path)
+    database.register_table("bonuses", bonus_table)
+    database.insert_many("bonuses", BONUSES)
+    assert database.aggregate("bonuses", "amount", streaming=True, functions=("SUM",)) == {"SUM": 1000.0}
+    assert database.aggregate("bonuses", "amount", group_by="employee_id", workers=2,
+                              functions=("COUNT",)) == {1: {"COUNT": 2}, 2: {"COUNT": 1}, 3: {"COUNT": 1}}
+
+
+def test_partitioned_storage_requires_partitioning(temp_department_file):
+    department_table = DepartmentTable()
+    department_table.FILE_PATH = temp_department_file
+    department_table.STORAGE = "partitioned"
+    with pytest.raises(ValueError, match="Table has no partitioning."):
+        department_table.storage
@@ -0,0 +1,142 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def filled(database):
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 2", "3 Carol 25 1500 1",
+                                       "4 Dan 50 3000 3", "5 Eve 35 2500 2"])
+    database.insert_many("departments", ["1 Sales", "2 IT"])
+    database.insert_many("bonuses", ["1 1 10.02.2025 500", "2 2 11.02.2025 700", "3 1 01.03.2025 100"])
+    return database
+
+
+def test_sql_join_with_pushdown(filled):
+    query = filled.sql("SELECT name, department_name FROM employees JOIN departments ON department_id = id "
+                       "WHERE salary > 1200 AND department_name = 'IT'")
+    assert query.fetch() == [{"name": "Bob", "department_name": "IT"}, {"name": "Eve", "department_name": "IT"}]
+    assert query.explain() == "\n".join([
+        "Project(name, department_name)",
+        "  HashJoin(department_id = departments.id, inner)",
+        "    Filter(salary > 1200.0)",
+        "      Scan(employees)",
+        "    IndexScan(departments.department_name = 'IT' via hash)",
+    ])
+
+
+def test_index_join_and_range_scan(filled):
+    query = filled.sql("select * from employees inner join departments on departments.id = employees.department_id "
+                       "where id >= 2 and id < 5;")
+    assert query.fetch()[0] == {"id": 2, "name": "Bob", "age": 40, "salary": 2000.0, "department_id": 2,
+                                "department_name": "IT"}
+    assert [entry["name"] for entry in query.fetch()] == ["Bob", "Carol"]
+    assert query.explain() == "\n".join([
+        "Project(*)",
+        "  IndexJoin(department_id = departments.id, inner)",
+        "    Filter(id < 5)",
+        "      IndexScan(employees.id >= 2 via sorted)",
+    ])
+
+
+def test_access_path_choice(filled):
+    query = filled.query("employees").where("id", "<", 3).where("department_id", "=", 1)
+    assert query.explain() == "Filter(id < 3)\n  IndexScan(employees.department_id = 1 via hash)"
+    assert [entry["name"] for entry in query.fetch()] == ["Alice"]
+
+    query = filled.query("employees").where("department_id", "=", 1).where("id", "=", "3")
+    assert query.explain() == "Filter(department_id = 1)\n  IndexScan(employees.id = 3 via hash)"
+    assert [entry["name"] for entry in query.fetch()] == ["Carol"]
+
+    query = filled.query("employees").where("id", ">", 3)
+    assert query.explain() == "IndexScan(employees.id > 3 via sorted)"
+    assert [entry["id"] for entry in query.fetch()] == [4, 5]
+
+    query = filled.query("employees").where("id", "<=", 2).where("salary", "!=", 1000).where("age", "!=", 1)
+    assert [entry["id"] for entry in query.fetch()] == [2]
+    assert filled.query("employees").where("age", ">", 45).explain() == "Filter(age > 45)\n  Scan(employees)"
+
+
+def test_merge_join_on_ordered_inputs(filled):
+    filled.create_index("departments", "id", "sorted")
+    filled.create_index("employees", "department_id", "sorted")
+    query = (filled.query("employees").join("departments", "department_id").where("department_id", ">=", 1)
+             .where("departments.id", "<=", 2).select("name"))
+    assert query.explain().splitlines()[1] == "  MergeJoin(department_id = departments.id, inner)"
+    assert query.fetch() == [{"name": "Alice"}, {"name": "Carol"}, {"name": "Bob"}, {"name": "Eve"}]
+
+
+def test_left_join_keeps_right_conditions_above_join(filled):
+    query = filled.sql("SELECT name FROM employees LEFT JOIN departments ON department_id = id "
+                       "WHERE department_name = 'Sales' LIMIT 1")
+    assert query.explain() == "\n".join([
+        "Limit(1)",
+        "  Project(name)",
+        "    Filter(department_name = 'Sales')",
+        "      IndexJoin(department_id = departments.id, left)",
+        "        Scan(employees)",
+    ])
+    assert query.fetch() == [{"name": "Alice"}]
+
+
+def test_join_keeps_fields_of_both_tables(filled):
+    query = filled.sql("SELECT name FROM employees LEFT JOIN departments ON department_id = id "
+                       "WHERE departments.id = 2")
+    assert query.fetch() == [{"name": "Bob"}, {"name": "Eve"}]
+    query = filled.sql("SELECT department_name, name FROM departments LEFT JOIN employees ON id = department_id "
+                       "WHERE employees.department_id = 1")
+    assert query.fetch() == [{"department_name": "Sales", "name": "Alice"},
+                             {"department_name": "Sales", "name": "Carol"}]
+    query = filled.sql("SELECT departments.id, employees.id, name FROM employees JOIN departments "
+                       "ON department_id = id WHERE name = 'Bob'")
+    assert query.fetch() == [{"departments.id": 2, "employees.id": 2, "name": "Bob"}]
+    query = filled.sql("SELECT department_name, COUNT(departments.id) FROM employees LEFT JOIN departments "
+                       "ON department_id = id WHERE departments.id > 0 GROUP BY department_name")
+    assert query.fetch() == [{"department_name": "Sales", "COUNT(departments.id)": 2},
+                             {"department_name": "IT", "COUNT(departments.id)": 2}]
+    assert filled.sql("SELECT COUNT(departments.id) FROM employees LEFT JOIN departments "
+                      "ON department_id = id").fetch() == [{"COUNT(departments.id)": 4}]
+
+
+def test_group_by_aggregates(filled):
+    query = filled.sql("SELECT department_name, SUM(salary), count(id) FROM employees "
+                       "JOIN departments ON department_id = id GROUP BY department_name")
+    assert query.fetch() == [{"department_name": "Sales", "SUM(salary)": 2500.0, "COUNT(id)": 2},
+                             {"department_name": "IT", "SUM(salary)": 4500.0, "COUNT(id)": 2}]
+    assert query.explain().splitlines()[0] == "Aggregate(SUM(salary), COUNT(id) GROUP BY department_name)"
+
+    query = filled.sql("SELECT MAX(amount), AVG(amount) FROM bonuses WHERE date >= '01.02.2025' AND date < '01.03.2025'")
+    assert query.fetch() == [{"MAX(amount)": 700.0, "AVG(amount)": 600.0}]
+    assert filled.sql("SELECT COUNT(id), SUM(amount) FROM bonuses WHERE amount > 10000").fetch() == [
+        {"COUNT(id)": 0, "SUM(amount)": None}]
+    assert filled.query("bonuses").where("date", "=", date(2025, 3, 1)).select("id").fetch() == [{"id": 3}]
+    assert filled.sql("SELECT employee_id FROM bonuses GROUP BY employee_id").fetch() == [
+        {"employee_id": 1}, {"employee_id": 2}]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("SELECT name employees", "expected FROM"),
+    ("SELECT name FROM employees WHERE", "expected name"),
+    ("SELECT name FROM employees WHERE age > name", "expected value"),
+    ("SELECT name FROM employees WHERE age ~ 1", "Invalid query near"),
+    ("SELECT name FROM employees LEFT departments", "expected JOIN"),
+    ("SELECT name FROM employees JOIN departments ON department_id < id", "expected ="),
+    ("SELECT SUM(salary, age) FROM employees", r"expected \)"),
+    ("SELECT name FROM employees LIMIT 1 2", "unexpected 2"),
+    ("SELECT name FROM employees LIMIT 1.5", "LIMIT must be a non-negative integer, got 1.5."),
+    ("SELECT name FROM employees LIMIT -1", "LIMIT must be a non-negative integer, got -1."),
+    ("SELECT name FROM missing", "Table missing does not exist."),
+    ("SELECT abc FROM employees", "Field abc does not exist."),
+    ("SELECT departments.abc FROM employees", "Field departments.abc does not exist."),
+    ("SELECT name FROM employees WHERE age = 'old'", "Field age must be int."),
+    ("SELECT MEDIAN(age) FROM employees", "Unknown aggregate MEDIAN."),
+    ("SELECT name, SUM(age) FROM employees", "Field name must be in GROUP BY."),
+])
+def test_sql_errors(filled, text, message):
+    with pytest.raises(ValueError, match=message):
+        filled.sql(text).fetch()
+
+
+def test_unknown_operator(filled):
+    with pytest.raises(ValueError, match="Unknown operator ~."):
+        filled.query("employees").where("age", "~", 1).fetch()
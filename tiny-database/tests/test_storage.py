@@ -0,0 +1,319 @@
+import csv
+import os
+from datetime import date
+
+import pytest
+
+from database.database import BonusTable, DepartmentTable
+from database.schema import ANY, DATE, INT
+from database.storage import AppendLog, ColumnStore, read_snapshot, throughput, write_snapshot
+
+
+def make_bonus_table(tmp_path, fsync_every=1):
+    bonus_table = BonusTable()
+    bonus_table.FILE_PATH = str(tmp_path / "bonus_table.csv")
+    bonus_table.STORAGE = "csv"
+    bonus_table.APPEND_ONLY = True
+    bonus_table.FSYNC_EVERY = fsync_every
+    bonus_table.load()
+    return bonus_table
+
+
+def test_append_only_insert_writes_log(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.insert("2 3 11.03.2024 10000")
+    assert not os.path.exists(bonus_table.FILE_PATH)
+    with open(bonus_table.log.path) as f:
+        assert f.read().splitlines() == ["1,1,10.02.2025,5000", "2,3,11.03.2024,10000"]
+
+
+def test_append_only_load_replays_log(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.compact()
+    bonus_table.insert("2 3 11.03.2024 10000")
+
+    new_bonus_table = make_bonus_table(tmp_path)
+    assert new_bonus_table.data == [{'id': 1, 'employee_id': 1, 'date': date(2025, 2, 10), 'amount': 5000.0},
+                                    {'id': 2, 'employee_id': 3, 'date': date(2024, 3, 11), 'amount': 10000.0}]
+    assert new_bonus_table.find_id(2)['amount'] == 10000.0
+
+
+def test_compact_rewrites_base_file(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.compact()
+    assert not os.path.exists(bonus_table.log.path)
+    with open(bonus_table.FILE_PATH) as f:
+        assert f.read().splitlines() == ["id,employee_id,date,amount", "1,1,10.02.2025,5000"]
+
+
+def test_append_only_save_clears_log(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.save()
+    assert not os.path.exists(bonus_table.log.path)
+    assert len(make_bonus_table(tmp_path).data) == 1
+
+
+def test_fsync_batching(tmp_path):
+    bonus_table = make_bonus_table(tmp_path, fsync_every=3)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.insert("2 1 11.02.2025 5000")
+    assert bonus_table.log.pending == 2
+    bonus_table.insert("3 1 12.02.2025 5000")
+    assert bonus_table.log.pending == 0
+    bonus_table.insert("4 1 13.02.2025 5000")
+    bonus_table.sync()
+    assert bonus_table.log.pending == 0
+
+
+def test_rewrite_mode_removes_log(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.APPEND_ONLY = False
+    bonus_table.insert("2 1 11.02.2025 5000")
+    assert not os.path.exists(bonus_table.log.path)
+    assert len(make_bonus_table(tmp_path).data) == 2
+
+
+def test_replay_drops_torn_tail(tmp_path):
+    log_path = tmp_path / "table.csv.log"
+    log_path.write_bytes(b"1,Security\r\n2,Engin")
+    log = AppendLog(str(log_path), ('id', 'department_name'))
+    assert log.replay() == [{'id': '1', 'department_name': 'Security'}]
+    assert log_path.read_bytes() == b"1,Security\r\n"
+
+
+def test_replay_missing_log(tmp_path):
+    log = AppendLog(str(tmp_path / "missing.log"), ('id',))
+    assert log.replay() == []
+    log.close()
+    log.clear()
+
+
+def test_append_only_insert_many_syncs_once(tmp_path):
+    bonus_table = make_bonus_table(tmp_path, fsync_every=2)
+    bonus_table.insert_many(["1 1 10.02.2025 5000", "2 1 11.02.2025 5000", "3 1 12.02.2025 5000"])
+    assert bonus_table.log.pending == 0
+    assert len(make_bonus_table(tmp_path).data) == 3
+
+
+def test_column_store():
+    store = ColumnStore(('id', 'date'), {'id': INT, 'date': DATE})
+    assert len(ColumnStore((), {})) == 0
+    store.extend([{'id': 1, 'date': DATE.encode('10.02.2025')}, {'id': 2, 'date': DATE.encode(date(2024, 3, 11))}])
+    assert store.column('id').typecode == 'q'
+    assert store[-1] == {'id': 2, 'date': date(2024, 3, 11)}
+    assert store[:1] == [{'id': 1, 'date': date(2025, 2, 10)}]
+    assert list(store.formatted_rows()) == [('1', '10.02.2025'), ('2', '11.03.2024')]
+    with pytest.raises(IndexError):
+        store[2]
+
+
+def test_table_loads_lazily(tmp_path):
+    file_path = tmp_path / "department_table.csv"
+    file_path.write_text("id,department_name\n1,Security\n")
+    department_table = DepartmentTable()
+    department_table.FILE_PATH = str(file_path)
+    assert not department_table.loaded
+    assert department_table.select("Security") == [{'id': 1, 'department_name': 'Security'}]
+    assert department_table.loaded
+    with pytest.raises(AttributeError):
+        department_table.missing_attribute
+
+
+def test_snapshot_used_when_fresh(tmp_path, monkeypatch):
+    file_path = tmp_path / "department_table.csv"
+    file_path.write_text("id,department_name\n1,Security\n2,QA\n")
+
+    def load_table():
+        department_table = DepartmentTable()
+        department_table.FILE_PATH = str(file_path)
+        department_table.SNAPSHOT = True
+        department_table.load()
+        return department_table
+
+    load_table()
+    assert os.path.exists(str(file_path) + ".snapshot")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV parsed although the snapshot is fresh")
+    monkeypatch.setattr(csv, "DictReader", fail)
+    assert load_table().find_id(2) == {'id': 2, 'department_name': 'QA'}
+    monkeypatch.undo()
+
+    file_path.write_text("id,department_name\n1,Security\n2,QA\n3,Sales\n")
+    assert len(load_table().data) == 3
+
+
+def test_stale_snapshot_ignored(tmp_path):
+    file_path = tmp_path / "table.csv"
+    file_path.write_text("id\n")
+    write_snapshot(str(tmp_path / "table.snapshot"), str(file_path), {'id': []})
+    assert read_snapshot(str(tmp_path / "table.snapshot"), str(file_path), ('id',)) == {'id': []}
+    assert read_snapshot(str(tmp_path / "table.snapshot"), str(file_path), ('id', 'name')) is None
+    assert read_snapshot(str(tmp_path / "missing.snapshot"), str(file_path), ('id',)) is None
+
+
+def make_page_table(tmp_path, table_class=BonusTable, fsync_every=1):
+    table = table_class()
+    table.FILE_PATH = str(tmp_path / "table")
+    table.STORAGE = "pages"
+    table.FSYNC_EVERY = fsync_every
+    return table
+
+
+def test_page_storage_insert_and_load(tmp_path):
+    bonus_table = make_page_table(tmp_path)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.insert_many(["2 3 11.03.2024 10000", "3 2 01.01.2023 1.5"])
+    assert os.path.exists(bonus_table.storage.path)
+    assert not os.path.exists(bonus_table.FILE_PATH)
+
+    new_bonus_table = make_page_table(tmp_path)
+    assert new_bonus_table.data == bonus_table.data
+    assert new_bonus_table.select(2) == [{'id': 3, 'employee_id': 2, 'date': date(2023, 1, 1), 'amount': 1.5}]
+
+
+def test_page_storage_read_by_position(tmp_path):
+    department_table = make_page_table(tmp_path, DepartmentTable)
+    # Маленькие страницы, чтобы записи легли на несколько страниц
+    department_table.storage.PAGE_SIZE = 128
+    department_table.insert_many([f"{i} dep{i}" for i in range(10)])
+    storage = department_table.storage
+    assert storage.read(7) == {'id': 7, 'department_name': 'dep7'}
+    assert storage.read(-1) == {'id': 9, 'department_name': 'dep9'}
+    with pytest.raises(IndexError):
+        storage.read(10)
+    department_table.insert("10 Продажи")
+    assert storage.read(10) == {'id': 10, 'department_name': 'Продажи'}
+    assert list(department_table.scan(from_file=True).project('id').limit(2)) == [{'id': 0}, {'id': 1}]
+    storage.close()
+
+
+def test_page_storage_widens_long_strings(tmp_path):
+    department_table = make_page_table(tmp_path, DepartmentTable)
+    department_table.insert("1 short")
+    long_name = "x" * 40
+    department_table.insert(f"2 {long_name}")
+    assert make_page_table(tmp_path, DepartmentTable).select(long_name)[0]['id'] == 2
+
+
+def test_page_storage_fsync_batching(tmp_path):
+    bonus_table = make_page_table(tmp_path, fsync_every=3)
+    bonus_table.insert("1 1 10.02.2025 5000")
+    bonus_table.insert("2 1 11.02.2025 5000")
+    assert bonus_table.storage.pending == 1
+    bonus_table.sync()
+    assert bonus_table.storage.pending == 0
+    bonus_table.save()
+    assert len(make_page_table(tmp_path).data) == 2
+
+
+def test_page_storage_streaming_aggregate(database, tmp_path):
+    bonus_table = make_page_table(tmp_path)
+    database.register_table("bonuses", bonus_table)
+    bonus_table.insert_many(["1 1 10.02.2025 5000", "2 1 11.02.2025 1000", "3 2 11.02.2025 300"])
+    assert database.aggregate('bonuses', 'amount', group_by='employee_id', functions=("SUM",),
+                              streaming=True) == {1: {"SUM": 6000.0}, 2: {"SUM": 300.0}}
+
+
+def test_page_storage_rejects_foreign_files(tmp_path):
+    bonus_table = make_page_table(tmp_path)
+    with open(bonus_table.storage.path, 'wb') as f:
+        f.write(b"id,employee_id".ljust(64, b' '))
+    with pytest.raises(ValueError, match="is not a page file"):
+        bonus_table.load()
+
+    department_table = make_page_table(tmp_path, DepartmentTable)
+    department_table.FILE_PATH = str(tmp_path / "other")
+    department_table.insert("1 Sales")
+    bonus_table.FILE_PATH = department_table.FILE_PATH
+    with pytest.raises(ValueError, match="does not match table fields"):
+        bonus_table.load()
+
+
+def test_page_storage_rejects_too_small_pages(tmp_path):
+    bonus_table = make_page_table(tmp_path)
+    bonus_table.storage.PAGE_SIZE = 32
+    with pytest.raises(ValueError, match="does not fit in a page"):
+        bonus_table.insert("1 1 10.02.2025 5000")
+
+
+def test_csv_import_export(tmp_path, temp_bonus_file):
+    with open(temp_bonus_file, 'w') as f:
+        f.write("id,employee_id,date,amount\n1,1,10.02.2025,5000\n2,3,11.03.2024,10000.5\n")
+    bonus_table = make_page_table(tmp_path)
+    bonus_table.import_csv(temp_bonus_file)
+    assert make_page_table(tmp_path).data == bonus_table.data
+
+    export_path = str(tmp_path / "export.csv")
+    bonus_table.export_csv(export_path)
+    with open(export_path) as f, open(temp_bonus_file) as original:
+        assert f.read() == original.read()
+
+
+def test_failed_import_keeps_table(tmp_path, temp_bonus_file):
+    bonus_table = make_bonus_table(tmp_path)
+    bonus_table.insert_many(["1 1 10.02.2025 5000", "3 2 11.03.2024 300"])
+    for content in ("1,1,10.02.2025,many\n", "5,1,10.02.2025,1\n5,2,11.02.2025,2\n"):
+        with open(temp_bonus_file, 'w') as f:
+            f.write("id,employee_id,date,amount\n" + content)
+        with pytest.raises(ValueError):
+            bonus_table.import_csv(temp_bonus_file)
+        assert bonus_table.find_id(3)["amount"] == 300.0
+        assert [entry["id"] for entry in bonus_table.select(1)] == [1]
+    assert len(make_bonus_table(tmp_path).data) == 2
+
+
+def test_chunked_csv_load(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    with open(bonus_table.FILE_PATH, 'w') as f:
+        f.write("amount,id,date,employee_id\n5000,1,10.02.2025,1\n10000.5,2,10.02.2025,3\n7,3,11.03.2024,3\n")
+    bonus_table.CSV_CHUNK = 2
+    bonus_table.load()
+    assert [entry["id"] for entry in bonus_table.data] == [1, 2, 3]
+    assert bonus_table.find_id(2) == {"id": 2, "employee_id": 3, "date": date(2025, 2, 10), "amount": 10000.5}
+    assert bonus_table.select(3)[1]["date"] == date(2024, 3, 11)
+    assert list(ANY.parse_column(["1", 2])) == ["1", 2]
+
+
+def test_chunked_csv_load_falls_back_to_row_parsing(tmp_path):
+    bonus_table = make_bonus_table(tmp_path)
+    with open(bonus_table.FILE_PATH, 'w') as f:
+        f.write("id,employee_id,date,amount\n1,1,10.02.2025,5000\n\n2,3,10.02.2025,1,extra\n")
+    bonus_table.load()
+    assert [entry["amount"] for entry in bonus_table.data] == [5000, 1]
+
+    with open(bonus_table.FILE_PATH, 'w') as f:
+        f.write("id,employee_id,date,amount\n1,1,10.02.2025,many\n")
+    with pytest.raises(ValueError, match="Field amount must be float."):
+        bonus_table.load()
+
+    with open(bonus_table.FILE_PATH, 'w') as f:
+        f.write("id,employee_id,date\n1,1,10.02.2025\n")
+    with pytest.raises(ValueError, match="Field amount must be float."):
+        bonus_table.load()
+
+
+def test_chunked_csv_load_quoted_fields(tmp_path):
+    department_table = DepartmentTable()
+    department_table.FILE_PATH = str(tmp_path / "department_table.csv")
+    with open(department_table.FILE_PATH, 'w') as f:
+        f.write('id,department_name\n1,Sales\n2,"Research, Development"\n3,"Multi\nline"\n4,Security')
+    department_table.CSV_CHUNK = 12
+    department_table.load()
+    assert [entry["department_name"] for entry in department_table.data] == [
+        "Sales", "Research, Development", "Multi\nline", "Security"]
+
+
+def test_import_export_report_throughput(tmp_path, temp_bonus_file):
+    with open(temp_bonus_file, 'w') as f:
+        f.write("id,employee_id,date,amount\n1,1,10.02.2025,5000\n2,3,11.03.2024,10000.5\n")
+    bonus_table = make_bonus_table(tmp_path)
+    report = bonus_table.import_csv(temp_bonus_file, chunk_size=1)
+    assert report["rows"] == 2 and report["rows_per_second"] > 0
+    assert bonus_table.export_csv(str(tmp_path / "export.csv"))["rows"] == 2
+    assert throughput(0, 0) == {"rows": 0, "seconds": 0, "rows_per_second": None}
@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+
+from database.database import DepartmentTable, TemporaryTable
+from database.storage import write_csv
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_transaction_saves_each_table_once(database, temp_employee_file, temp_department_file, monkeypatch):
+    writes = []
+    for table_name in ("employees", "departments"):
+        table = database.tables[table_name]
+        monkeypatch.setattr(table, "write_entries", lambda entries, write=table.write_entries: (
+            writes.append(len(entries)), write(entries)))
+    with database.transaction():
+        database.insert("departments", "1 Security")
+        database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 1"])
+        database.insert("employees", "3 Carol 50 3000 1")
+        # До фиксации записи не попадают ни в таблицы, ни в файлы
+        assert database.tables["employees"].find_id(1) is None
+        assert read_lines(temp_employee_file) == []
+    assert sorted(writes) == [1, 3]
+    assert len(database.select("employees", 1, 3)) == 3
+    assert len(read_lines(temp_employee_file)) == 4
+    assert read_lines(temp_department_file) == ["id,department_name", "1,Security"]
+
+
+def test_transaction_rolls_back_on_error(database, temp_employee_file):
+    database.insert("employees", "1 Alice 30 1000 1")
+    with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
+        with database.transaction():
+            database.insert("employees", "2 Bob 40 2000 2")
+            database.insert("departments", "2 Sales")
+            database.insert("employees", "1 Alice 30 1000 1")
+    assert len(read_lines(temp_employee_file)) == 2
+    assert database.tables["employees"].find_id(2) is None
+    assert database.select("departments", "Sales") == []
+    database.insert("employees", "2 Bob 40 2000 2")
+    assert database.tables["employees"].find_id(2)["name"] == "Bob"
+
+
+def test_rollback_keeps_other_threads_inserts(database, temp_department_file):
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.insert("departments", "1 Uncommitted")
+            thread = threading.Thread(target=database.insert, args=("departments", "2 Committed"))
+            thread.start()
+            thread.join()
+            raise RuntimeError("abort")
+    assert read_lines(temp_department_file) == ["id,department_name", "2,Committed"]
+    assert [entry["id"] for entry in database.tables["departments"].data] == [2]
+
+
+def test_commit_rechecks_constraints(database, temp_department_file):
+    with pytest.raises(ValueError, match="Entry with id = 1 already exists."):
+        with database.transaction():
+            database.insert_many("departments", ["1 Security", "2 Sales"])
+            thread = threading.Thread(target=database.insert, args=("departments", "1 Other"))
+            thread.start()
+            thread.join()
+    assert [entry["department_name"] for entry in database.tables["departments"].data] == ["Other"]
+    with pytest.raises(ValueError, match="Entry with id = 3 already exists."):
+        with database.transaction():
+            database.insert("departments", "3 QA")
+            database.insert_many("departments", ["4 HR", "3 QA"])
+
+
+def test_commit_keeps_rows_of_shared_table_writers(database, temp_department_file):
+    departments = database.tables["departments"]
+    departments.SHARED = True
+    other = DepartmentTable()
+    other.FILE_PATH = temp_department_file
+    other.SHARED = True
+    with database.transaction():
+        database.insert("departments", "1 Security")
+        with other.writing():
+            other.insert("2 Sales")
+    assert [entry["id"] for entry in departments.data] == [2, 1]
+    departments.compact()
+    assert len(read_lines(temp_department_file)) == 3
+
+
+def test_nested_transaction_joins_outer(database, temp_department_file):
+    with database.transaction() as outer:
+        with database.transaction() as inner:
+            database.insert("departments", "1 Security")
+        assert inner is outer
+        assert read_lines(temp_department_file) == []
+    assert len(read_lines(temp_department_file)) == 2
+
+
+def test_failed_commit_discards_unsaved_tables(database, temp_department_file, monkeypatch):
+    employees = database.tables["employees"]
+
+    def fail(entries):
+        raise OSError("disk full")
+    monkeypatch.setattr(employees, "write_entries", fail)
+    with pytest.raises(OSError):
+        with database.transaction():
+            database.insert("departments", "1 Security")
+            database.insert("employees", "1 Alice 30 1000 1")
+    assert len(read_lines(temp_department_file)) == 2
+    assert len(employees.data) == 0
+
+
+def test_transaction_on_temporary_table(database, monkeypatch):
+    temp_table = TemporaryTable([])
+    database.register_table("temporary", temp_table)
+    with database.transaction():
+        database.insert("temporary", "1 Alice")
+        assert temp_table.data == []
+    assert temp_table.select("id", "1") == [{"id": "1", "field1": "Alice"}]
+
+    def fail():
+        raise OSError("sync failed")
+    monkeypatch.setattr(temp_table, "sync", fail)
+    with pytest.raises(OSError, match="sync failed"):
+        with database.transaction():
+            database.insert("temporary", "2 Bob")
+    # Перечитывать временную таблицу неоткуда: вставка остаётся в памяти
+    assert [entry["id"] for entry in temp_table.data] == ["1", "2"]
+
+
+def test_write_csv_keeps_old_file_on_failure(tmp_path):
+    path = str(tmp_path / "table.csv")
+    write_csv(path, ["id"], [[1]])
+
+    def rows():
+        yield [2]
+        raise OSError("crash")
+    with pytest.raises(OSError):
+        write_csv(path, ["id"], rows())
+    assert read_lines(path) == ["id", "1"]
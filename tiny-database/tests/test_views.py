@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+
+from database.database import DepartmentTable, EmployeeTable, TemporaryTable
+from database.views import JoinView
+
+
+def test_aggregate_view_updates_on_insert(database):
+    database.insert("bonuses", "1 1 10.02.2025 5000")
+    view = database.create_aggregate_view("bonus_totals", "bonuses", "amount", group_by="employee_id")
+    total = database.create_aggregate_view("bonus_total", "bonuses", "amount")
+    database.insert_many("bonuses", ["2 1 11.02.2025 1000", "3 2 11.02.2025 300"])
+
+    assert view.get(1) == {"SUM": 6000.0, "COUNT": 2, "MAX": 5000.0, "MIN": 1000.0, "AVG": 3000.0}
+    assert view.get("2", functions=("SUM",)) == {"SUM": 300.0}
+    assert view.get(3) is None
+    assert total.result(("SUM", "COUNT")) == {"SUM": 6300.0, "COUNT": 3}
+    assert database.views["bonus_totals"] is view
+
+    # Database.aggregate отвечает из представления и совпадает с пересчётом по таблице
+    bonus_table = database.tables["bonuses"]
+    assert database.aggregate("bonuses", "amount", group_by="employee_id") == view.result()
+    bonus_table.views.clear()
+    database.cache.clear()
+    assert database.aggregate("bonuses", "amount", group_by="employee_id") == view.result()
+
+
+def test_aggregate_view_rebuilt_on_load(database):
+    bonus_table = database.tables["bonuses"]
+    view = database.create_aggregate_view("bonus_total", "bonuses", "amount")
+    assert view.result() is None
+    database.insert("bonuses", "1 1 10.02.2025 5000")
+    bonus_table.load()
+    assert view.result(("COUNT",)) == {"COUNT": 1}
+
+
+def test_aggregate_view_errors(database):
+    with pytest.raises(ValueError, match="Table missing does not exist."):
+        database.create_aggregate_view("v", "missing", "amount")
+    with pytest.raises(ValueError, match="Field abc does not exist."):
+        database.create_aggregate_view("v", "bonuses", "amount", group_by="abc")
+    with pytest.raises(ValueError, match="Field must contain numbers"):
+        database.create_aggregate_view("v", "bonuses", "date")
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_join_view_matches_join(database, how):
+    database.insert_many("employees", ["1 Alice 30 1000 1", "2 Bob 40 2000 2"])
+    database.insert("departments", "1 Sales")
+    view = database.create_join_view("staff", "employees", "departments", "department_id", how=how)
+    database.insert_many("employees", ["3 Carol 25 1500 1", "4 Dan 50 3000 3"])
+    database.insert_many("departments", ["2 IT", "3 HR"])
+    database.insert("employees", "5 Eve 35 2500 4")
+
+    expected = database.join("employees", "departments", "department_id", how=how, strict=False)
+    key = lambda entry: entry["id"]  # noqa: E731
+    assert sorted(view, key=key) == sorted(expected, key=key)
+    assert len(view) == len(expected)
+    assert [entry["name"] for entry in view.lookup(1)] == ["Alice", "Carol"]
+    assert view.lookup(9) == []
+
+
+def test_join_view_rebuilt_on_load(temp_employee_file, temp_department_file):
+    employee_table = EmployeeTable()
+    employee_table.FILE_PATH = temp_employee_file
+    department_table = DepartmentTable()
+    department_table.FILE_PATH = temp_department_file
+    employee_table.insert("1 Alice 30 1000 1")
+    department_table.insert("1 Sales")
+
+    reader = DepartmentTable()
+    reader.FILE_PATH = temp_department_file
+    view = JoinView(employee_table, reader, "department_id")
+    department_table.insert("2 IT")
+    employee_table.insert("2 Bob 40 2000 2")
+    assert len(view) == 1
+    reader.load()
+    assert [entry["department_name"] for entry in view] == ["Sales", "IT"]
+
+
+def test_join_view_self_join_and_errors(database):
+    table = TemporaryTable([{"id": "1", "parent": "0"}, {"id": "2", "parent": "1"}])
+    view = JoinView(table, table, "parent", "id")
+    table.insert("3 2")
+    assert sorted(entry["id"] for entry in view) == ["2", "3"]
+    assert table.views == [view]
+
+    with pytest.raises(ValueError, match="Unknown join type outer."):
+        JoinView(table, table, "parent", how="outer")
+    with pytest.raises(ValueError, match="invalid join_attr"):
+        JoinView(table, table, "abc")
+    with pytest.raises(ValueError, match="Table missing does not exist."):
+        database.create_join_view("v", "employees", "missing", "department_id")
+    with pytest.raises(ValueError, match="Table missing does not exist."):
+        database.create_join_view("v", "missing", "employees")
+
+
+def test_aggregate_view_on_dates_group(database):
+    database.insert_many("bonuses", ["1 1 10.02.2025 5000", "2 2 10.02.2025 100"])
+    view = database.create_aggregate_view("by_date", "bonuses", "amount", group_by="date")
+    assert view.result(("SUM",)) == {date(2025, 2, 10): {"SUM": 5100.0}}
+    assert view.get(date(2025, 2, 10), ("COUNT",)) == {"COUNT": 2}